@@ -0,0 +1,81 @@
+"""Benchmark 'tt gds stats': native netlist scan vs. the tt_tool.py subprocess.
+
+Usage:
+    python benchmarks/bench_gds_stats.py [--instances N] [--project-dir DIR]
+
+Generates a synthetic sky130 netlist with N instances and times the native
+statistics engine on it. If --project-dir points at a hardened project with
+tt-support-tools checked out as tt/, the 'tt_tool.py --print-stats
+--print-cell-summary' subprocess path is timed on that project as well.
+"""
+
+import argparse
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from tinytapeout.cli.context import detect_context
+from tinytapeout.cli.runner import run_tt_tool
+from tinytapeout.cli.stats import compute_design_stats
+
+_CELLS = ["and2_1", "nand2_2", "dfxtp_1", "mux2_1", "buf_4", "decap_4", "fill_1"]
+
+
+def _write_netlist(path: Path, instances: int) -> None:
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        f.write("module tt_um_bench (VGND, VPWR);\n")
+        for i in range(instances):
+            cell = rng.choice(_CELLS)
+            f.write(
+                f" sky130_fd_sc_hd__{cell} _{i}_ (.VGND(VGND),\n"
+                "    .VNB(VGND),\n    .VPB(VPWR),\n    .VPWR(VPWR));\n"
+            )
+        f.write("endmodule\n")
+
+
+def _timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{label:<24} {elapsed:8.3f} s   (peak RSS so far {peak:.0f} MiB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=1_000_000)
+    parser.add_argument("--project-dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        pnl_dir = project / "runs" / "wokwi" / "final" / "pnl"
+        pnl_dir.mkdir(parents=True)
+        _write_netlist(pnl_dir / "tt_um_bench.pnl.v", args.instances)
+        _timed(
+            f"native ({args.instances:,} inst)",
+            lambda: compute_design_stats(project, "sky130A", "tt_um_bench"),
+        )
+
+    if args.project_dir:
+        ctx = detect_context(str(args.project_dir))
+        ctx.require_tt_tools()
+        _timed(
+            "native (project)",
+            lambda: compute_design_stats(
+                ctx.project_dir, ctx.tech, tt_tools_dir=ctx.tt_tools_dir
+            ),
+        )
+        _timed(
+            "tt_tool.py subprocess",
+            lambda: run_tt_tool(
+                ctx, "--print-stats", "--print-cell-summary", capture=True
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
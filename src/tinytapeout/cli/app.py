@@ -1,13 +1,27 @@
 import click
 
 from tinytapeout import __version__
+from tinytapeout.cli.tracing import enable_tracing, trace_step
 from tinytapeout.cli.update_checker import check_for_updates
 
 
 @click.group()
 @click.version_option(version=__version__, prog_name="tt")
-def cli():
+@click.option(
+    "--trace",
+    "trace_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Record the time, CPU and memory of every external command to a "
+    "Chrome trace (open in https://ui.perfetto.dev).",
+)
+@click.pass_context
+def cli(ctx, trace_path):
     """Tiny Tapeout CLI - Design, test, and harden ASIC projects."""
+    if trace_path:
+        tracer = enable_tracing()
+        # Closed in reverse order: the command's span ends before the write
+        ctx.call_on_close(lambda: tracer.write(trace_path))
+        ctx.with_resource(trace_step(f"tt {ctx.invoked_subcommand}"))
     check_for_updates()
 
 
@@ -17,9 +31,11 @@ from tinytapeout.cli.commands.doctor import doctor  # noqa: E402
 from tinytapeout.cli.commands.gds import gds  # noqa: E402
 from tinytapeout.cli.commands.init import init  # noqa: E402
 from tinytapeout.cli.commands.test import test  # noqa: E402
+from tinytapeout.cli.commands.worker import worker  # noqa: E402
 
 cli.add_command(doctor)
 cli.add_command(init)
 cli.add_command(check)
 cli.add_command(test)
 cli.add_command(gds)
+cli.add_command(worker)
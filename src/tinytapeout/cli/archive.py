@@ -0,0 +1,337 @@
+"""Content-addressed archive of build outputs ('tt gds archive' / 'restore').
+
+Files are split into fixed-size chunks that are stored once, zlib-compressed,
+under their BLAKE2b hash, so consecutive builds that share most of their
+intermediate files only add the chunks that changed. A snapshot is a JSON
+listing of the archived files and their chunk hashes, named after the commit
+the build was made from (runs/wokwi/final/commit_id.json).
+
+The store has a size budget: when it is exceeded, the least recently archived
+or restored snapshots are dropped and chunks no longer referenced by any
+snapshot are deleted.
+
+The store is shared by every project of the user, so it is guarded by a lock
+file: archiving (from the first chunk written until the snapshot that
+references it) and restoring hold it shared, eviction and garbage collection
+exclusively. Otherwise another process could collect the chunks of a snapshot
+that is still being written.
+"""
+
+import contextlib
+import json
+import os
+import re
+import shutil
+import time
+import zlib
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from tinytapeout.cli.cache import cache_root
+from tinytapeout.cli.fsutil import write_atomic
+from tinytapeout.cli.hashing import hash_bytes
+
+CHUNK_SIZE = 4 << 20
+DEFAULT_MAX_BYTES = 5 << 30
+# Paths (relative to the project) that make up an archived build
+ARCHIVE_PATHS = ["runs/wokwi", "tt_submission"]
+_NAME_RE = re.compile(r"^[\w.-]+$")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+@dataclass
+class ArchiveResult:
+    snapshot: str
+    files: int
+    size: int  # total size of the archived files
+    new_chunks: int
+    new_bytes: int  # bytes added to the store (compressed)
+    evicted: list[str]
+
+
+@dataclass
+class SnapshotInfo:
+    project: str
+    commit: str
+    created: float
+    files: int
+    size: int
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as '500M' or '5G' into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    scale = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    return int(float(match.group(1)) * scale[match.group(2).upper()])
+
+
+def build_commit(project_dir: Path) -> str:
+    """The commit the current build was made from."""
+    path = project_dir / "runs" / "wokwi" / "final" / "commit_id.json"
+    try:
+        with open(path) as f:
+            commit = json.load(f).get("commit")
+    except (OSError, ValueError):
+        commit = None
+    if not commit or commit == "unknown":
+        raise ArchiveError(f"No commit recorded in {path}. Run 'tt gds build' first.")
+    return commit
+
+
+class ArtifactStore:
+    def __init__(self, root: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root or cache_root() / "archive"
+        self.max_bytes = max_bytes
+        self.chunks_dir = self.root / "chunks"
+        self.snapshots_dir = self.root / "snapshots"
+
+    def archive(self, project_dir: Path, project: str, commit: str) -> ArchiveResult:
+        """Store the build outputs of project_dir as snapshot project/commit."""
+        for name in (project, commit):
+            if not _NAME_RE.match(name):
+                raise ArchiveError(f"Invalid snapshot name: {name!r}")
+        with self._locked(exclusive=False):
+            path, result = self._write_snapshot(project_dir, project, commit)
+        result.evicted = self.evict(keep=path)
+        return result
+
+    def _write_snapshot(
+        self, project_dir: Path, project: str, commit: str
+    ) -> tuple[Path, ArchiveResult]:
+        """Store the chunks, then the snapshot that references them."""
+        files: dict[str, dict] = {}
+        total = new_chunks = new_bytes = 0
+        for rel, path in _walk(project_dir, ARCHIVE_PATHS):
+            if path.is_symlink():
+                files[rel] = {"link": os.readlink(path)}
+                continue
+            chunks = []
+            with open(path, "rb") as f:
+                while data := f.read(CHUNK_SIZE):
+                    digest, added = self._put_chunk(data)
+                    chunks.append(digest)
+                    new_chunks += added > 0
+                    new_bytes += added
+                    total += len(data)
+            st = path.stat()
+            files[rel] = {
+                "size": st.st_size,
+                "mode": st.st_mode & 0o777,
+                "chunks": chunks,
+            }
+
+        if not files:
+            raise ArchiveError("Nothing to archive. Run 'tt gds build' first.")
+        snapshot = {
+            "project": project,
+            "commit": commit,
+            "created": time.time(),
+            "files": files,
+        }
+        path = self._snapshot_path(project, commit)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(snapshot).encode())
+        return path, ArchiveResult(
+            snapshot=f"{project}/{commit}",
+            files=len(files),
+            size=total,
+            new_chunks=new_chunks,
+            new_bytes=new_bytes,
+            evicted=[],
+        )
+
+    def restore(self, project_dir: Path, project: str, commit: str) -> SnapshotInfo:
+        """Replace the build outputs of project_dir with a snapshot.
+
+        The commit may be abbreviated, as long as it is unambiguous.
+        """
+        with self._locked(exclusive=False):
+            return self._restore(project_dir, self.find(project, commit))
+
+    def _restore(self, project_dir: Path, path: Path) -> SnapshotInfo:
+        snapshot = json.loads(path.read_text())
+        missing = [
+            digest
+            for entry in snapshot["files"].values()
+            for digest in entry.get("chunks", [])
+            if not self._chunk_path(digest).exists()
+        ]
+        if missing:
+            raise ArchiveError(
+                f"Snapshot {snapshot['commit']} is damaged "
+                f"({len(missing)} chunks missing)"
+            )
+
+        for rel in ARCHIVE_PATHS:
+            target = project_dir / rel
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target)
+            elif target.exists() or target.is_symlink():
+                target.unlink()
+        for rel, entry in snapshot["files"].items():
+            dest = project_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if "link" in entry:
+                os.symlink(entry["link"], dest)
+                continue
+            with open(dest, "wb") as f:
+                for digest in entry["chunks"]:
+                    f.write(zlib.decompress(self._chunk_path(digest).read_bytes()))
+            os.chmod(dest, entry["mode"])
+
+        os.utime(path)  # most recently used
+        return _info(snapshot)
+
+    def find(self, project: str, commit: str) -> Path:
+        if not (_NAME_RE.match(project) and _NAME_RE.match(commit)):
+            raise ArchiveError(f"Invalid commit: {commit!r}")
+        matches = sorted((self.snapshots_dir / project).glob(f"{commit}*.json"))
+        if not matches:
+            raise ArchiveError(f"No archived build of {project} for commit {commit}")
+        exact = [p for p in matches if p.stem == commit]
+        if exact:
+            return exact[0]
+        if len(matches) > 1:
+            raise ArchiveError(f"Commit {commit} is ambiguous")
+        return matches[0]
+
+    def snapshots(self, project: str | None = None) -> list[SnapshotInfo]:
+        pattern = f"{project}/*.json" if project else "*/*.json"
+        infos = [
+            _info(json.loads(p.read_text())) for p in self.snapshots_dir.glob(pattern)
+        ]
+        return sorted(infos, key=lambda info: info.created)
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.chunks_dir.glob("*/*"))
+
+    def evict(self, keep: Path | None = None) -> list[str]:
+        """Drop least recently used snapshots until the store fits its budget.
+
+        Unreferenced chunks are collected first. Every snapshot is read once,
+        and the chunks that lose their last reference are deleted as their
+        snapshots go. Returns the evicted snapshots as 'project/commit'.
+        """
+        evicted: list[str] = []
+        with self._locked(exclusive=True):
+            sizes = self._chunk_sizes()
+            if sum(sizes.values()) <= self.max_bytes:
+                return evicted
+            refs = self._snapshot_chunks()
+            counts = Counter(digest for chunks in refs.values() for digest in chunks)
+            self._delete_chunks([d for d in sizes if d not in counts], sizes)
+            total = sum(sizes.values())
+            for path in sorted(refs, key=lambda p: p.stat().st_mtime):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink()
+                evicted.append(f"{path.parent.name}/{path.stem}")
+                counts.subtract(refs[path])
+                dead = [digest for digest in refs[path] if counts[digest] <= 0]
+                total -= self._delete_chunks(dead, sizes)
+        return evicted
+
+    def collect_garbage(self) -> int:
+        """Delete chunks not referenced by any snapshot. Returns bytes freed."""
+        with self._locked(exclusive=True):
+            sizes = self._chunk_sizes()
+            live = set().union(*self._snapshot_chunks().values())
+            return self._delete_chunks([d for d in sizes if d not in live], sizes)
+
+    def _chunk_sizes(self) -> dict[str, int]:
+        sizes = {}
+        for chunk in self.chunks_dir.glob("*/*"):
+            if not chunk.name.startswith(".tmp-"):
+                sizes[chunk.name] = chunk.stat().st_size
+        return sizes
+
+    def _snapshot_chunks(self) -> dict[Path, set[str]]:
+        """The chunks referenced by each snapshot."""
+        refs = {}
+        for path in self.snapshots_dir.glob("*/*.json"):
+            files = json.loads(path.read_text())["files"].values()
+            refs[path] = {
+                digest for entry in files for digest in entry.get("chunks", [])
+            }
+        return refs
+
+    def _delete_chunks(self, digests: list[str], sizes: dict[str, int]) -> int:
+        """Delete chunks (dropping them from sizes). Returns bytes freed."""
+        freed = 0
+        for digest in digests:
+            self._chunk_path(digest).unlink(missing_ok=True)
+            freed += sizes.pop(digest, 0)
+        return freed
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the store's lock file (shared or exclusive)."""
+        try:
+            import fcntl
+        except ImportError:  # Windows: no cross-process locking
+            yield
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _put_chunk(self, data: bytes) -> tuple[str, int]:
+        """Store a chunk if new. Returns (digest, bytes added)."""
+        digest = hash_bytes(data)
+        path = self._chunk_path(digest)
+        if path.exists():
+            return digest, 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zlib.compress(data, 3)
+        write_atomic(path, compressed)
+        return digest, len(compressed)
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _snapshot_path(self, project: str, commit: str) -> Path:
+        return self.snapshots_dir / project / f"{commit}.json"
+
+
+def _info(snapshot: dict) -> SnapshotInfo:
+    files = snapshot["files"].values()
+    return SnapshotInfo(
+        project=snapshot["project"],
+        commit=snapshot["commit"],
+        created=snapshot["created"],
+        files=len(snapshot["files"]),
+        size=sum(entry.get("size", 0) for entry in files),
+    )
+
+
+def _walk(project_dir: Path, paths: list[str]):
+    """Yield (relative path, path) of all files below the given paths."""
+    for rel in paths:
+        root = project_dir / rel
+        if root.is_file() or root.is_symlink():
+            yield rel, root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            base = Path(dirpath)
+            # Directory symlinks are not followed; archive them as links
+            for name in list(dirnames):
+                if (base / name).is_symlink():
+                    dirnames.remove(name)
+                    filenames.append(name)
+            for name in sorted(filenames):
+                path = base / name
+                yield path.relative_to(project_dir).as_posix(), path
@@ -0,0 +1,115 @@
+"""User-level cache of derived artifacts (rendered images, reports, ...).
+
+Entries live under $TT_CACHE_DIR (default: $XDG_CACHE_HOME/tinytapeout or
+~/.cache/tinytapeout), one subdirectory per cache. Keys are content hashes of
+everything an artifact depends on, so entries never need to be invalidated,
+only evicted: reading an entry refreshes its mtime, and once a cache grows
+beyond its size budget the least recently used entries are removed.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from tinytapeout.cli.hashing import hash_bytes
+
+
+def cache_root() -> Path:
+    if os.environ.get("TT_CACHE_DIR"):
+        return Path(os.environ["TT_CACHE_DIR"])
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "tinytapeout"
+
+
+def cache_key(*parts) -> str:
+    """Hash JSON-serializable key parts into a cache key."""
+    return hash_bytes(json.dumps(parts, sort_keys=True, default=str).encode())
+
+
+class ArtifactCache:
+    def __init__(self, name: str, max_bytes: int, root: Path | None = None):
+        self.dir = (root or cache_root()) / name
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, suffix: str = "") -> Path:
+        return self.dir / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = "") -> Path | None:
+        """Return the cached file for key, or None on a miss."""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, src: Path, suffix: str = "") -> Path:
+        """Copy src into the cache under key and evict old entries."""
+        return self._store(key, suffix, lambda tmp: shutil.copyfile(src, tmp))
+
+    def put_bytes(self, key: str, data: bytes, suffix: str = "") -> Path:
+        """Store an in-memory artifact under key and evict old entries."""
+        return self._store(key, suffix, lambda tmp: Path(tmp).write_bytes(data))
+
+    def put_files(self, key: str, files: list[Path]) -> None:
+        """Store files together under key, by name (see get_files)."""
+        for src in files:
+            self.put(key, src, f"-{src.name}")
+        # Written last, so readers never see part of the group
+        names = sorted(src.name for src in files)
+        self.put_bytes(key, json.dumps(names).encode(), ".files")
+
+    def get_files(self, key: str) -> dict[str, Path] | None:
+        """The files stored with put_files, by name; None unless all are cached."""
+        manifest = self.get(key, ".files")
+        if manifest is None:
+            return None
+        files = {
+            name: self.get(key, f"-{name}") for name in json.loads(manifest.read_text())
+        }
+        if any(path is None for path in files.values()):
+            return None
+        return files
+
+    def _store(self, key: str, suffix: str, write) -> Path:
+        path = self.path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Path | None = None) -> int:
+        """Remove least recently used entries beyond the size budget.
+
+        Returns the number of bytes freed.
+        """
+        entries = []
+        for path in self.dir.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total - freed <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            freed += size
+        return freed
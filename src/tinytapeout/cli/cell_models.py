@@ -0,0 +1,223 @@
+"""Standard-cell simulation models for 'tt test --gl', reduced and cached.
+
+The GL simulation compiles the PDK's standard-cell Verilog (for sky130,
+primitives.v and sky130_fd_sc_hd.v: every cell of the library in several
+variants) before it gets to the design. Icarus has no separately compiled
+libraries, so instead the model files are reduced to the modules and UDPs the
+netlist actually instantiates (and those they use in turn). Everything else,
+including the `ifdef structure around definitions, is kept as is, so the
+Makefile's defines (FUNCTIONAL, USE_POWER_PINS, ...) still select the variant.
+
+The reduced files are cached per PDK version (read from the PDK's SOURCES
+file) and set of cells. The simulation sees them through a per-project
+PDK_ROOT mirror in the user cache that links to the real PDK for everything
+else, so the project's Makefile needs no changes. It lives outside test/ so
+that 'make clean' cannot remove it.
+"""
+
+import os
+import re
+import shutil
+from pathlib import Path
+
+from tinytapeout.cli.cache import ArtifactCache, cache_key, cache_root
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.tech import TechName, tech_map
+
+CELL_MODEL_CACHE_BYTES = 256 << 20
+
+# Standard-cell library simulated for each tech (under libs.ref/)
+STD_CELL_LIBRARIES: dict[str, str] = {
+    "sky130A": "sky130_fd_sc_hd",
+    "ihp-sg13g2": "sg13g2_stdcell",
+    "gf180mcuD": "gf180mcu_fd_sc_mcu7t5v0",
+}
+
+_DEFINITION_RE = re.compile(
+    r"^\s*(?:module|macromodule|primitive)\s+(?P<name>[A-Za-z_][\w$]*)"
+)
+_END_RE = re.compile(r"^\s*(?:endmodule|endprimitive)\b")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][\w$]*")
+_INSTANCE_RE = re.compile(r"^\s*(?P<type>[A-Za-z_][\w$]*)\s")
+
+
+class ModelFile:
+    """A Verilog file split into definitions and the lines between them."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        # (name, lines); name is None for text outside definitions
+        self.chunks: list[tuple[str | None, list[str]]] = []
+        with open(path, errors="surrogateescape") as f:
+            current: list[str] | None = None
+            for line in f:
+                if current is None:
+                    match = _DEFINITION_RE.match(line)
+                    if match:
+                        current = [line]
+                        self.chunks.append((match["name"], current))
+                        if ";" in line and _END_RE.match(line.split(";", 1)[1]):
+                            current = None  # definition on a single line
+                        continue
+                    if not self.chunks or self.chunks[-1][0] is not None:
+                        self.chunks.append((None, []))
+                    self.chunks[-1][1].append(line)
+                else:
+                    current.append(line)
+                    if _END_RE.match(line):
+                        current = None
+
+    def definitions(self) -> dict[str, list[list[str]]]:
+        defs: dict[str, list[list[str]]] = {}
+        for name, lines in self.chunks:
+            if name is not None:
+                defs.setdefault(name, []).append(lines)
+        return defs
+
+    def reduced(self, keep: set[str]) -> str:
+        return "".join(
+            "".join(lines)
+            for name, lines in self.chunks
+            if name is None or name in keep
+        )
+
+
+def pdk_mirror_dir(test_dir: Path, pdk_root: str) -> Path:
+    key = cache_key(os.path.abspath(test_dir), os.path.abspath(pdk_root))
+    return cache_root() / "pdk-mirrors" / key[:16]
+
+
+def model_dir(pdk_root: str | Path, tech: TechName) -> Path | None:
+    """The Verilog directory of the tech's standard-cell library, if present."""
+    library = STD_CELL_LIBRARIES.get(tech)
+    if library is None:
+        return None
+    path = Path(pdk_root) / tech / "libs.ref" / library / "verilog"
+    return path if path.is_dir() else None
+
+
+def netlist_cell_types(netlist: Path) -> set[str]:
+    """Module names instantiated in a (flat) gate-level netlist."""
+    types = set()
+    with open(netlist, errors="surrogateescape") as f:
+        for line in f:
+            match = _INSTANCE_RE.match(line)
+            if match:
+                types.add(match["type"])
+    return types
+
+
+def required_definitions(files: list[ModelFile], roots: set[str]) -> set[str]:
+    """The definitions reachable from roots through instantiations."""
+    defs: dict[str, list[list[str]]] = {}
+    for model in files:
+        for name, bodies in model.definitions().items():
+            defs.setdefault(name, []).extend(bodies)
+    keep: set[str] = set()
+    pending = [name for name in roots if name in defs]
+    while pending:
+        name = pending.pop()
+        if name in keep:
+            continue
+        keep.add(name)
+        for body in defs[name]:
+            for line in body[1:]:
+                for ident in _IDENTIFIER_RE.findall(line):
+                    if ident in defs and ident not in keep:
+                        pending.append(ident)
+    return keep
+
+
+def _pdk_version_key(pdk_root: str, tech: TechName, files: list[Path]) -> list:
+    try:
+        version = tech_map[tech].read_pdk_version(pdk_root)
+        return [version["source"], version["version"]]
+    except (OSError, ValueError, AssertionError, NotImplementedError):
+        # No usable SOURCES file: fall back to the content of the models
+        return [hash_file(path) for path in files]
+
+
+def prepare_cell_models(
+    netlist: Path,
+    tech: TechName,
+    pdk_root: str,
+    mirror: Path,
+    cache: ArtifactCache | None = None,
+) -> Path | None:
+    """Build a PDK_ROOT mirror with reduced cell models for netlist.
+
+    Returns the mirror's path, or None if the tech's models are not found.
+    """
+    pdk_root = os.path.abspath(pdk_root)  # the mirror links to it
+    verilog_dir = model_dir(pdk_root, tech)
+    if verilog_dir is None:
+        return None
+    sources = sorted(verilog_dir.glob("*.v"))
+    if not sources:
+        return None
+    cache = cache or ArtifactCache("cell-models", CELL_MODEL_CACHE_BYTES)
+    cells = sorted(netlist_cell_types(netlist))
+    version = _pdk_version_key(pdk_root, tech, sources)
+    keys = {
+        path: cache_key("cell-models", tech, version, path.name, cells)
+        for path in sources
+    }
+
+    reduced: dict[Path, Path] = {}
+    if all(cache.get(key, ".v") for key in keys.values()):
+        reduced = {path: cache.path(key, ".v") for path, key in keys.items()}
+    else:
+        models = [ModelFile(path) for path in sources]
+        keep = required_definitions(models, set(cells))
+        for model in models:
+            data = model.reduced(keep).encode(errors="surrogateescape")
+            reduced[model.path] = cache.put_bytes(keys[model.path], data, ".v")
+
+    _build_mirror(Path(pdk_root), mirror, verilog_dir.relative_to(pdk_root))
+    mirror_dir = mirror / verilog_dir.relative_to(pdk_root)
+    for source, cached in reduced.items():
+        _copy_if_changed(cached, mirror_dir / source.name)
+    return mirror
+
+
+def _build_mirror(pdk_root: Path, mirror: Path, real: Path) -> None:
+    """Mirror pdk_root with symlinks, except for the directories down to real.
+
+    The .v files in real itself are left for the reduced copies.
+    """
+    parts = real.parts
+    for depth in range(len(parts) + 1):
+        src = pdk_root.joinpath(*parts[:depth])
+        dst = mirror.joinpath(*parts[:depth])
+        if dst.is_symlink():
+            dst.unlink()
+        dst.mkdir(parents=True, exist_ok=True)
+        inner = parts[depth] if depth < len(parts) else None
+        for entry in src.iterdir():
+            if entry.name == inner or (inner is None and entry.suffix == ".v"):
+                continue
+            _symlink(entry, dst / entry.name)
+
+
+def _symlink(target: Path, link: Path) -> None:
+    if link.is_symlink():
+        if os.readlink(link) == str(target):
+            return
+        link.unlink()
+    elif link.is_dir():
+        shutil.rmtree(link)
+    elif link.exists():
+        link.unlink()
+    link.symlink_to(target)
+
+
+def _copy_if_changed(src: Path, dest: Path) -> None:
+    """Copy src to dest unless identical, so make sees an unchanged mtime."""
+    if dest.is_file() and not dest.is_symlink():
+        if hash_file(dest) == hash_file(src):
+            return
+    if dest.is_symlink():
+        dest.unlink()
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
@@ -9,6 +9,7 @@ from tinytapeout.cli.environment import (
     check_iverilog,
     check_pdk,
     check_python,
+    check_verilator,
 )
 
 
@@ -62,6 +63,11 @@ def doctor(project_dir: str):
             "WARN", "iverilog not found (needed for simulation)", style="yellow"
         )
 
+    # Verilator (optional, for 'tt test --sim verilator')
+    verilator = check_verilator()
+    if verilator.available:
+        print_status("OK", f"Verilator {verilator.version}")
+
     # PDK
     pdk = check_pdk()
     if pdk.available:
@@ -1,14 +1,32 @@
+import contextvars
+import functools
+import json
+import os
 import subprocess
 import sys
+import threading
+import time
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
 from pathlib import Path
 
 import click
+from rich.table import Table
 
-from tinytapeout.cli.console import console, is_ci, write_step_summary
+from tinytapeout.cli.console import console, is_ci, print_status, write_step_summary
 from tinytapeout.cli.context import detect_context
-from tinytapeout.cli.harden import run_harden
-from tinytapeout.cli.runner import run_precheck, run_tt_tool
+from tinytapeout.cli.harden import create_merged_config, run_harden
+from tinytapeout.cli.pipeline import Step, StepResult, run_pipeline
+from tinytapeout.cli.precheck_output import PrecheckReport
+from tinytapeout.cli.runner import (
+    isolated_precheck_dir,
+    prepare_precheck_env,
+    run_precheck,
+    run_tt_tool,
+)
+from tinytapeout.cli.tracing import trace_step
+from tinytapeout.tech import load_tile_sizes, tech_map
 
 
 def _ensure_git_remote(project_dir: Path):
@@ -47,7 +65,30 @@ def gds():
 @gds.command()
 @click.option("--project-dir", default=".", help="Project directory.")
 @click.option("--no-docker", is_flag=True, help="Do not use Docker for LibreLane.")
-def build(project_dir: str, no_docker: bool):
+@click.option(
+    "--remote",
+    metavar="URL",
+    default=None,
+    help="Build on a remote worker started with 'tt worker serve'.",
+)
+@click.option(
+    "--remote-token",
+    envvar="TT_WORKER_TOKEN",
+    default=None,
+    help="Token for the remote worker (see 'tt worker serve --token').",
+)
+@click.option(
+    "--prerender",
+    is_flag=True,
+    help="Render the 2D view into the cache while the reports run.",
+)
+def build(
+    project_dir: str,
+    no_docker: bool,
+    remote: str | None,
+    remote_token: str | None,
+    prerender: bool,
+):
     """Harden the project (generate GDS).
 
     To validate the output, run 'tt gds validate' separately.
@@ -60,6 +101,10 @@ def build(project_dir: str, no_docker: bool):
         )
         sys.exit(2)
 
+    if remote:
+        _build_remote(ctx, remote, no_docker, remote_token)
+        return
+
     console.print("[bold]Building GDS...[/bold]\n")
 
     # Ensure git remote exists (tt-support-tools crashes without one)
@@ -82,45 +127,219 @@ def build(project_dir: str, no_docker: bool):
 
     console.print("[green]Hardening complete.[/green]\n")
 
-    # Step 3: Print warnings and stats
-    run_tt_tool(ctx, "--print-warnings")
-    result = run_tt_tool(ctx, "--print-stats", "--print-cell-category", capture=True)
-    if result.stdout:
-        console.print(result.stdout)
-        if is_ci():
-            write_step_summary(f"## GDS Build Stats\n\n{result.stdout}")
-
-    # Step 4: Create submission
-    console.print("Creating submission...")
-    result = run_tt_tool(ctx, "--create-tt-submission")
-    if result.returncode != 0:
+    # Steps 3-4: Print warnings and stats, create submission. The reports only
+    # read the run directory, so all three run concurrently.
+    steps = [
+        Step("warnings", lambda: _tt_tool_step(ctx, "--print-warnings")),
+        Step(
+            "stats",
+            lambda: _tt_tool_step(ctx, "--print-stats", "--print-cell-category"),
+        ),
+        Step("submission", lambda: _submission_step(ctx)),
+    ]
+    if prerender:
+        steps.append(Step("prerender", lambda: _prerender_step(ctx)))
+    results = run_pipeline(steps, report=_report_build_step)
+    if results["submission"].returncode != 0:
         console.print("[red]Failed to create submission.[/red]")
         sys.exit(1)
 
     console.print("\n[green bold]GDS build complete![/green bold]")
 
 
+def _tt_tool_step(ctx, *args: str) -> StepResult:
+    """Run tt_tool.py as a pipeline step, buffering its output."""
+    result = run_tt_tool(ctx, *args, capture=True)
+    return StepResult(result.returncode, (result.stdout or "") + (result.stderr or ""))
+
+
+def _submission_step(ctx) -> StepResult:
+    """Assemble tt_submission/, reusing unchanged files from the last build."""
+    from tinytapeout.cli.submission import SubmissionError, assemble_submission
+
+    if ctx.info is None:
+        return StepResult(1, "Cannot create submission: info.yaml is invalid.\n")
+    try:
+        result = assemble_submission(ctx.project_dir, ctx.tech, ctx.info.top_module)
+    except SubmissionError as e:
+        return StepResult(1, f"{e}\n")
+    return StepResult(0, f"Submission: {result.summary()}\n")
+
+
+def _prerender_step(ctx) -> StepResult:
+    """Render the default 2D view into the render cache."""
+    from tinytapeout.cli.layout import has_gds_deps
+    from tinytapeout.cli.render import cached_render_png
+
+    gds_files = _final_gds_files(ctx)
+    if not gds_files or not has_gds_deps() or not tech_map[ctx.tech].layer_colors:
+        return StepResult(0, skipped=True)
+    top_cell = ctx.info.top_module if ctx.info else None
+    gds_path = gds_files[0]
+    cached_render_png(
+        gds_path, gds_path.with_suffix(".png"), ctx.tech, top_cell=top_cell
+    )
+    return StepResult(0, "Pre-rendered 2D view for 'tt gds view'.\n")
+
+
+def _report_build_step(step: Step, result: StepResult):
+    if step.name == "submission":
+        console.print("Creating submission...")
+    if step.name == "prerender" and result.returncode != 0:
+        console.print(f"[yellow]Pre-rendering failed: {result.output}[/yellow]")
+        return
+    if result.output:
+        console.out(result.output, end="")
+    if step.name == "stats" and result.output and is_ci():
+        write_step_summary(f"## GDS Build Stats\n\n{result.output}")
+
+
+def _build_remote(ctx, url: str, no_docker: bool, token: str | None = None):
+    """Send the project inputs to a remote worker and fetch the results."""
+    from tinytapeout.cli.remote import run_remote_build
+
+    console.print(f"[bold]Building GDS on {url}...[/bold]\n")
+
+    # Refresh the merged config if the user config has already been generated
+    if (ctx.project_dir / "src" / "user_config.json").exists():
+        create_merged_config(ctx.project_dir)
+
+    run_remote_build(ctx, url, no_docker=no_docker, token=token)
+
+    console.print("\n[green bold]GDS build complete![/green bold]")
+
+
 @gds.command()
 @click.option("--project-dir", default=".", help="Project directory.")
 @click.option("--json", "json_output", is_flag=True, help="Output as JSON.")
-def stats(project_dir: str, json_output: bool):
+@click.option("--top", "top_n", default=20, help="Number of cell types to list.")
+def stats(project_dir: str, json_output: bool, top_n: int):
     """Print design statistics."""
+    from tinytapeout.cli.stats import compute_design_stats
+
     ctx = detect_context(project_dir)
 
     if not ctx.has_gds:
         console.print("[red]No GDS file found. Run 'tt gds build' first.[/red]")
         sys.exit(2)
 
-    result = run_tt_tool(
-        ctx, "--print-stats", "--print-cell-summary", capture=json_output
+    design_stats = compute_design_stats(
+        ctx.project_dir,
+        ctx.tech,
+        top_module=ctx.info.top_module if ctx.info else None,
+        tt_tools_dir=ctx.tt_tools_dir,
     )
 
-    if json_output and result.stdout:
-        console.print(result.stdout)
+    if json_output:
+        click.echo(json.dumps(design_stats.to_dict(), indent=2))
+        return
+
+    if design_stats.netlist is None:
+        console.print("[yellow]No gate-level netlist found in the run.[/yellow]")
+
+    summary = Table(title=f"Design statistics: {design_stats.top_module}")
+    summary.add_column("Metric")
+    summary.add_column("Value", justify="right")
+    summary.add_row("Cells", str(design_stats.total_cells))
+    for name, value in design_stats.area.items():
+        summary.add_row(f"{name.capitalize()} area (um^2)", f"{value:,.2f}")
+    if design_stats.utilization is not None:
+        summary.add_row("Utilization", f"{design_stats.utilization:.2%}")
+    if "wire_length" in design_stats.metrics:
+        summary.add_row("Wire length (um)", f"{design_stats.metrics['wire_length']:,}")
+    console.print(summary)
+
+    if design_stats.categories:
+        categories = Table(title="Cell categories")
+        categories.add_column("Category")
+        categories.add_column("Count", justify="right")
+        for name, count in design_stats.categories.items():
+            categories.add_row(name, str(count))
+        console.print(categories)
+
+    if design_stats.cells:
+        cells = Table(title=f"Top {min(top_n, len(design_stats.cells))} cells")
+        cells.add_column("Cell")
+        cells.add_column("Count", justify="right")
+        for name, count in list(design_stats.cells.items())[:top_n]:
+            cells.add_row(name, str(count))
+        console.print(cells)
 
-    if result.returncode != 0:
-        console.print("[red]Failed to get stats.[/red]")
-        sys.exit(1)
+
+@gds.command()
+@click.option("--project-dir", default=".", help="Project directory.")
+@click.option("--json", "json_output", is_flag=True, help="Output as JSON.")
+@click.option(
+    "--gds",
+    "gds_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="GDS file to inspect (default: the hardened design).",
+)
+def inspect(project_dir: str, json_output: bool, gds_path: str | None):
+    """Summarize GDS geometry: die size, per-layer polygons and area."""
+    from tinytapeout.cli.gds_inspect import layer_spec, summarize_gds
+    from tinytapeout.cli.layout import require_gds_deps
+
+    require_gds_deps()
+    ctx = detect_context(project_dir)
+
+    if gds_path is None:
+        gds_files = _final_gds_files(ctx)
+        if not gds_files:
+            console.print("[red]No GDS file found. Run 'tt gds build' first.[/red]")
+            sys.exit(2)
+        gds_path = str(gds_files[0])
+
+    start = time.perf_counter()
+    top_cell = ctx.info.top_module if ctx.info else None
+    summary = summarize_gds(gds_path, ctx.tech, top_cell)
+    elapsed = time.perf_counter() - start
+
+    if json_output:
+        click.echo(json.dumps({"gds": gds_path, **summary.to_dict()}, indent=2))
+        return
+
+    console.print(f"[bold]{summary.top_cell}[/bold] ({gds_path})")
+    if summary.die_size:
+        width, height = summary.die_size
+        console.print(
+            f"Die: {width:.2f} x {height:.2f} um, {summary.polygons} polygons"
+        )
+
+    table = Table(caption=f"Inspected in {elapsed:.2f} s")
+    table.add_column("Layer")
+    table.add_column("Name")
+    table.add_column("Polygons", justify="right")
+    table.add_column("Area (um^2)", justify="right")
+    for layer in summary.layers:
+        table.add_row(
+            layer_spec((layer.layer, layer.datatype)),
+            layer.name or "",
+            str(layer.polygons),
+            f"{layer.area:,.2f}",
+        )
+    console.print(table)
+
+    tech = tech_map[ctx.tech]
+    _print_populated("prBoundary", tech.prboundary_layer, summary.prboundary_populated)
+    _print_populated("Logo layer", tech.logo_layer, summary.logo_populated)
+    for layer in tech.label_layers:
+        count = summary.label_counts.get(layer_spec(layer), 0)
+        print_status("INFO", f"Labels on {layer_spec(layer)}: {count}", style="blue")
+
+
+def _print_populated(what: str, layer: tuple[int, int], populated: bool):
+    spec = f"{layer[0]}/{layer[1]}"
+    if populated:
+        print_status("OK", f"{what} ({spec}) populated")
+    else:
+        print_status("WARN", f"{what} ({spec}) empty", style="yellow")
+
+
+def _final_gds_files(ctx) -> list[Path]:
+    """GDS files in the hardened run's final/gds directory."""
+    return sorted(ctx.gds_dir.glob("*.gds")) if ctx.gds_dir.exists() else []
 
 
 @gds.command()
@@ -132,39 +351,335 @@ def stats(project_dir: str, json_output: bool):
     default="auto",
     help="How to run precheck tools (default: auto-detect).",
 )
-def validate(project_dir: str, json_output: bool, runner: str):
+@click.option(
+    "--force", is_flag=True, help="Re-run precheck even if a cached result exists."
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=None,
+    help=(
+        "Checks to run in parallel, split between layouts "
+        "(default: one per CPU; 1 runs precheck serially)."
+    ),
+)
+@click.option(
+    "--skip-preflight",
+    is_flag=True,
+    help="Go straight to precheck without the quick GDS pre-flight checks.",
+)
+@click.option(
+    "--stop-container",
+    is_flag=True,
+    help="Remove the Docker containers kept for precheck, then exit.",
+)
+def validate(
+    project_dir: str,
+    json_output: bool,
+    runner: str,
+    force: bool,
+    jobs: int | None,
+    skip_preflight: bool,
+    stop_container: bool,
+):
     """Run DRC precheck on the hardened design."""
+    if stop_container:
+        _stop_precheck_containers()
+        return
     ctx = detect_context(project_dir)
 
-    # Find the GDS file — prefer tt_submission/ (has GL netlist alongside GDS)
+    # Find the GDS files — prefer tt_submission/ (has GL netlist alongside GDS)
     submission_dir = ctx.project_dir / "tt_submission"
     if submission_dir.exists():
-        gds_files = list(submission_dir.glob("*.gds"))
+        gds_files = sorted(submission_dir.glob("*.gds"))
     else:
-        gds_files = list(ctx.gds_dir.glob("*.gds")) if ctx.gds_dir.exists() else []
+        gds_files = _final_gds_files(ctx)
     if not gds_files:
         console.print("[red]No GDS file found. Run 'tt gds build' first.[/red]")
         sys.exit(2)
 
-    console.print("[bold]Running precheck validation...[/bold]\n")
-
-    result = run_precheck(ctx, str(gds_files[0]), runner=runner, capture=json_output)
-
-    if json_output and result.stdout:
-        console.print(result.stdout)
+    if not skip_preflight and not _preflight(ctx, gds_files, json_output):
+        if not json_output:
+            console.print(
+                "[red]Pre-flight checks failed; fix these before running precheck "
+                "(or pass --skip-preflight).[/red]"
+            )
+        sys.exit(1)
 
-    if is_ci():
-        summary = result.stdout or result.stderr or ""
-        if summary:
-            write_step_summary(f"## Precheck Results\n\n```\n{summary}\n```")
+    if len(gds_files) > 1:
+        passed = _validate_layouts(
+            ctx,
+            gds_files,
+            runner=runner,
+            force=force,
+            jobs=jobs,
+            json_output=json_output,
+        )
+    else:
+        passed = _validate_layout(
+            ctx,
+            gds_files[0],
+            runner=runner,
+            force=force,
+            jobs=jobs,
+            json_output=json_output,
+        )
 
-    if result.returncode != 0:
+    if json_output:
+        sys.exit(0 if passed else 1)
+    if not passed:
         console.print("[red]Precheck validation failed.[/red]")
         sys.exit(1)
     else:
         console.print("[green]Precheck validation passed.[/green]")
 
 
+def _stop_precheck_containers():
+    from tinytapeout.cli.docker_runner import DockerError, stop_containers
+
+    try:
+        names = stop_containers()
+    except (DockerError, FileNotFoundError) as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(2)
+    for name in names:
+        print_status("OK", f"Removed {name}")
+    if not names:
+        console.print("No precheck containers running.")
+
+
+def _preflight(ctx, gds_files: list[Path], json_output: bool) -> bool:
+    """Run the quick GDS checks on all layouts. Returns True if all pass."""
+    from tinytapeout.cli.layout import has_gds_deps
+
+    if not has_gds_deps() or tech_map[ctx.tech].is_fpga:
+        return True
+    from tinytapeout.cli.preflight import expected_pins, parse_die_area, preflight_gds
+
+    top_module = ctx.info.top_module if ctx.info else None
+    die_area = None
+    tiles = getattr(ctx.info, "tiles", None)
+    if tiles:
+        try:
+            tile_sizes = load_tile_sizes(ctx.tech, ctx.require_tt_tools())
+            die_area = parse_die_area(tile_sizes[tiles])
+        except (OSError, KeyError, ValueError):
+            pass  # precheck reports an unknown tile size itself
+
+    passed = True
+    summary = []
+    for gds_path in gds_files:
+        start = time.perf_counter()
+        own = gds_path.stem == top_module
+        findings = preflight_gds(
+            gds_path,
+            ctx.tech,
+            die_area=die_area if own else None,
+            pins=expected_pins(ctx.info.analog_pins) if own else None,
+        )
+        elapsed = time.perf_counter() - start
+        passed = passed and not findings
+        if json_output:
+            event = {
+                "event": "preflight",
+                "gds": gds_path.name,
+                "status": "fail" if findings else "pass",
+                "duration": round(elapsed, 3),
+                "findings": [asdict(finding) for finding in findings],
+            }
+            click.echo(json.dumps(event))
+        elif not findings:
+            print_status(
+                "OK", f"Pre-flight checks: {gds_path.name} ({elapsed * 1000:.0f} ms)"
+            )
+        for finding in findings:
+            if not json_output:
+                print_status(
+                    "FAIL",
+                    f"{gds_path.name}: {finding.check}: {finding.message}",
+                    "red",
+                )
+            summary.append(f"| {gds_path.name} | {finding.check} | {finding.message} |")
+    if summary and is_ci():
+        write_step_summary(
+            "## Pre-flight Check Failures\n\n| Layout | Check | Problem |\n|---|---|---|\n"
+            + "\n".join(summary)
+        )
+    return passed
+
+
+def _validate_layout(ctx, gds_path: Path, *, runner, force, jobs, json_output) -> bool:
+    report = None
+    if json_output or is_ci():
+        report = PrecheckReport(
+            json_output=json_output, step_summary=is_ci(), echo=not json_output
+        )
+    if not json_output:
+        console.print("[bold]Running precheck validation...[/bold]\n")
+
+    result = run_precheck(
+        ctx,
+        str(gds_path),
+        runner=runner,
+        force=force,
+        jobs=jobs,
+        on_line=report.line if report else None,
+    )
+    if report:
+        report.finish(result.returncode, ctx.tt_tools_dir / "precheck" / "reports")
+    return result.returncode == 0
+
+
+def _validate_layouts(
+    ctx, gds_files: list[Path], *, runner, force, jobs, json_output
+) -> bool:
+    """Run precheck on all layouts at once, each in its own precheck directory."""
+    names = [path.name for path in gds_files]
+    report = PrecheckReport(
+        json_output=json_output, step_summary=is_ci(), echo=False, layouts=names
+    )
+    if not json_output:
+        console.print(
+            f"[bold]Running precheck validation of {len(gds_files)} layouts...[/bold]\n"
+        )
+    tt_dir = ctx.require_tt_tools()
+    # Split the job budget (default: the CPUs) between the layouts, which run
+    # concurrently; a share of 1 means serial precheck
+    layout_jobs = max(1, (jobs or os.cpu_count() or 1) // len(gds_files))
+
+    # The environment is only set up (once) if some layout misses the cache
+    env_lock = threading.Lock()
+    env_info = []
+
+    def get_env():
+        with env_lock:
+            if not env_info:
+                env_info.append(prepare_precheck_env(ctx, runner))
+            return env_info[0]
+
+    def validate_one(index: int) -> tuple[int, list, Path]:
+        workdir = isolated_precheck_dir(tt_dir, str(index))
+        with trace_step(f"precheck {names[index]}"):
+            result = run_precheck(
+                ctx,
+                str(gds_files[index]),
+                runner=runner,
+                force=force,
+                jobs=layout_jobs,
+                on_line=functools.partial(report.line, layout=names[index]),
+                get_env=get_env,
+                precheck_dir=workdir,
+            )
+        reports_dir = workdir / "reports"
+        checks = report.finish(result.returncode, reports_dir, layout=names[index])
+        return result.returncode, checks, reports_dir
+
+    passed = True
+    with ThreadPoolExecutor(max_workers=len(gds_files)) as pool:
+        futures = {
+            pool.submit(contextvars.copy_context().run, validate_one, i): i
+            for i in range(len(gds_files))
+        }
+        for future in as_completed(futures):
+            name = names[futures[future]]
+            returncode, checks, reports_dir = future.result()
+            failed = [check.check for check in checks if not check.passed]
+            if returncode == 0:
+                if not json_output:
+                    print_status("OK", f"{name}: {len(checks)} checks passed")
+                continue
+            passed = False
+            if not json_output:
+                detail = ", ".join(failed) if failed else f"exit status {returncode}"
+                print_status("FAIL", f"{name}: {detail}", style="red")
+                console.print(f"       Reports: {reports_dir}")
+    return passed
+
+
+@gds.command()
+@click.option("--project-dir", default=".", help="Project directory.")
+@click.option(
+    "--commit",
+    default=None,
+    help="Snapshot name (default: the commit recorded by 'tt gds build').",
+)
+@click.option(
+    "--max-size",
+    envvar="TT_ARCHIVE_MAX_SIZE",
+    default="5G",
+    show_default=True,
+    help="Archive size budget; least recently used builds are evicted.",
+)
+def archive(project_dir: str, commit: str | None, max_size: str):
+    """Archive the build outputs in the content-addressed store."""
+    from tinytapeout.cli.archive import (
+        ArchiveError,
+        ArtifactStore,
+        build_commit,
+        parse_size,
+    )
+
+    ctx = detect_context(project_dir)
+    try:
+        store = ArtifactStore(max_bytes=parse_size(max_size))
+        commit = commit or build_commit(ctx.project_dir)
+        result = store.archive(ctx.project_dir, _archive_project(ctx), commit)
+    except (ArchiveError, ValueError) as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(2)
+
+    console.print(
+        f"Archived {result.snapshot}: {result.files} files, "
+        f"{result.size / 1e6:.1f} MB ({result.new_chunks} new chunks, "
+        f"{result.new_bytes / 1e6:.1f} MB added to the store)"
+    )
+    for name in result.evicted:
+        console.print(f"[yellow]Evicted {name} (store over budget)[/yellow]")
+
+
+@gds.command()
+@click.argument("commit", required=False)
+@click.option("--project-dir", default=".", help="Project directory.")
+@click.option("--list", "list_only", is_flag=True, help="List archived builds.")
+def restore(commit: str | None, project_dir: str, list_only: bool):
+    """Restore the build outputs archived for COMMIT."""
+    from tinytapeout.cli.archive import ArchiveError, ArtifactStore
+
+    ctx = detect_context(project_dir)
+    store = ArtifactStore()
+    project = _archive_project(ctx)
+
+    if list_only or commit is None:
+        snapshots = store.snapshots(project)
+        if not snapshots:
+            console.print(f"No archived builds of {project}.")
+            return
+        table = Table(title=f"Archived builds of {project}")
+        table.add_column("Commit")
+        table.add_column("Archived")
+        table.add_column("Files", justify="right")
+        table.add_column("Size", justify="right")
+        for info in snapshots:
+            archived = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.created))
+            table.add_row(
+                info.commit, archived, str(info.files), f"{info.size / 1e6:.1f} MB"
+            )
+        console.print(table)
+        return
+
+    try:
+        info = store.restore(ctx.project_dir, project, commit)
+    except ArchiveError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(2)
+    console.print(f"Restored {info.files} files from {project}/{info.commit}")
+
+
+def _archive_project(ctx) -> str:
+    return ctx.info.top_module if ctx.info else ctx.project_dir.name
+
+
 @gds.group(invoke_without_command=True)
 @click.option("--project-dir", default=".", help="Project directory.")
 @click.pass_context
@@ -179,48 +694,160 @@ def view(click_ctx: click.Context, project_dir: str):
 
 @view.command(name="2d")
 @click.option("--project-dir", default=".", help="Project directory.")
-def view_2d(project_dir: str):
+@click.option(
+    "--size", default=2048, show_default=True, help="Longer image side in pixels."
+)
+@click.option(
+    "--layers",
+    default=None,
+    help="Comma-separated layer names to draw (default: all colored layers).",
+)
+@click.option(
+    "--jobs", "-j", type=int, default=None, help="Render processes (default: CPUs)."
+)
+def view_2d(project_dir: str, size: int, layers: str | None, jobs: int | None):
     """Open a 2D PNG render of the layout."""
+    from tinytapeout.cli.layout import has_gds_deps
+
     ctx = detect_context(project_dir)
 
     if not ctx.has_gds:
         console.print("[red]No GDS file found. Run 'tt gds build' first.[/red]")
         sys.exit(2)
 
-    console.print("Rendering 2D PNG...")
-    result = run_tt_tool(ctx, "--create-png")
-    if result.returncode != 0:
-        console.print("[red]Failed to render PNG.[/red]")
-        sys.exit(1)
-
-    # Try to find and open the PNG
-    png_files = list(ctx.project_dir.glob("runs/wokwi/final/gds/*.png"))
-    if png_files:
-        import subprocess
+    if has_gds_deps() and tech_map[ctx.tech].layer_colors:
+        png_file = _render_png(ctx, size, layers, jobs)
+    else:
+        _render_png_with_tt_tool(ctx)
+        png_files = list(ctx.gds_dir.glob("*.png"))
+        png_file = png_files[0] if png_files else None
 
-        subprocess.run(["xdg-open", str(png_files[0])], check=False)
-        console.print(f"Opened: {png_files[0]}")
+    if png_file is not None:
+        subprocess.run(["xdg-open", str(png_file)], check=False)
+        console.print(f"Opened: {png_file}")
     else:
         console.print("[yellow]PNG rendered but file not found for display.[/yellow]")
 
 
+def _render_png_with_tt_tool(ctx):
+    """Fall back to tt_tool's SVG based renderer (without gdstk/numpy).
+
+    Its outputs (PNG, SVG and any thumbnails) are cached together, keyed on
+    the GDS and the tt-support-tools revision.
+    """
+    from tinytapeout.cli.hashing import hash_file
+    from tinytapeout.cli.precheck_cache import tt_tools_revision
+    from tinytapeout.cli.render import cached_render_files
+
+    def render():
+        console.print("Rendering 2D PNG...")
+        result = run_tt_tool(ctx, "--create-png")
+        if result.returncode != 0:
+            console.print("[red]Failed to render PNG.[/red]")
+            sys.exit(1)
+
+    gds_files = _final_gds_files(ctx)
+    revision = tt_tools_revision(ctx.require_tt_tools())
+    if not gds_files or revision is None:
+        render()
+        return
+    key_parts = ("tt_tool", revision, hash_file(gds_files[0]), ctx.tech)
+    if cached_render_files(key_parts, ctx.gds_dir, render):
+        console.print("Using cached 2D render (GDS unchanged)")
+
+
+def _render_png(ctx, size: int, layers: str | None, jobs: int | None) -> Path:
+    from tinytapeout.cli.render import cached_render_png
+
+    gds_path = _final_gds_files(ctx)[0]
+    png_path = gds_path.with_suffix(".png")
+    layer_names = [name.strip() for name in layers.split(",")] if layers else None
+    top_cell = ctx.info.top_module if ctx.info else None
+
+    start = time.perf_counter()
+    try:
+        cached = cached_render_png(
+            gds_path,
+            png_path,
+            ctx.tech,
+            size=size,
+            layers=layer_names,
+            top_cell=top_cell,
+            jobs=jobs,
+        )
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(2)
+    if cached:
+        console.print("Using cached 2D render (GDS unchanged)")
+    else:
+        elapsed = time.perf_counter() - start
+        console.print(f"Rendered 2D PNG in {elapsed:.1f}s")
+    return png_path
+
+
 @view.command(name="3d")
 @click.option("--project-dir", default=".", help="Project directory.")
-def view_3d(project_dir: str):
+@click.option(
+    "--local",
+    is_flag=True,
+    help="Serve the layout from a local viewer instead of the hosted one "
+    "(the page still loads three.js from the unpkg CDN).",
+)
+@click.option(
+    "--port", default=0, type=int, help="Port for --local (default: any free port)."
+)
+@click.option("--no-browser", is_flag=True, help="With --local, only print the URL.")
+def view_3d(project_dir: str, local: bool, port: int, no_browser: bool):
     """Open the 3D GDS viewer in your browser."""
     ctx = detect_context(project_dir)
 
     # Look for the GDS file to construct the viewer URL
-    gds_files = list(ctx.gds_dir.glob("*.gds")) if ctx.gds_dir.exists() else []
+    gds_files = _final_gds_files(ctx)
     if not gds_files:
         console.print("[red]No GDS file found. Run 'tt gds build' first.[/red]")
         sys.exit(2)
 
+    if local:
+        _serve_3d(ctx, gds_files[0], port, open_browser=not no_browser)
+        return
+
     viewer_url = "https://gds-viewer.tinytapeout.com/"
     console.print(f"Opening 3D viewer: {viewer_url}")
     webbrowser.open(viewer_url)
 
 
+def _serve_3d(ctx, gds_path: Path, port: int, open_browser: bool):
+    from tinytapeout.cli.layout import require_gds_deps
+    from tinytapeout.cli.viewer3d import create_server, load_mesh
+
+    require_gds_deps()
+    if not tech_map[ctx.tech].layer_colors:
+        console.print(f"[red]No layer stack defined for {ctx.tech}.[/red]")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    top_cell = ctx.info.top_module if ctx.info else None
+    mesh, cached = load_mesh(gds_path, ctx.tech, top_cell)
+    if cached:
+        console.print("Using cached 3D mesh (GDS unchanged)")
+    else:
+        elapsed = time.perf_counter() - start
+        console.print(f"Built 3D mesh in {elapsed:.1f}s")
+
+    server = create_server(mesh, port)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    console.print(f"Serving 3D viewer at {url} (Ctrl+C to stop)")
+    if open_browser:
+        webbrowser.open(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("Shutting down.")
+    finally:
+        server.server_close()
+
+
 @view.command(name="klayout")
 @click.option("--project-dir", default=".", help="Project directory.")
 def view_klayout(project_dir: str):
@@ -1,23 +1,165 @@
+import json
+import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 
 import click
+from rich.markup import escape
+from rich.table import Table
 
-from tinytapeout.cli.console import console
+from tinytapeout.cli.cell_models import pdk_mirror_dir, prepare_cell_models
+from tinytapeout.cli.console import console, print_status
 from tinytapeout.cli.context import detect_context
-from tinytapeout.cli.environment import IVERILOG_MIN_VERSION, check_iverilog
+from tinytapeout.cli.durations import DurationDB, durations_path
+from tinytapeout.cli.environment import (
+    IVERILOG_MIN_VERSION,
+    check_iverilog,
+    check_verilator,
+)
+from tinytapeout.cli.gl_netlist import write_gl_netlist
 from tinytapeout.cli.runner import run_make
+from tinytapeout.cli.sim_build import (
+    GL_NETLIST,
+    build_is_current,
+    hdl_inputs,
+    inputs_fingerprint,
+    record_build,
+)
+from tinytapeout.cli.sim_results import (
+    ResultsError,
+    ResultsSummary,
+    iter_testcases,
+    summarize_results,
+)
+from tinytapeout.cli.testcases import (
+    CocotbRun,
+    find_testcases,
+    merge_results,
+    run_testcases,
+    select_testcases,
+)
+from tinytapeout.cli.verilator import (
+    default_threads,
+    restore_model,
+    sim_build_dir,
+    store_model,
+    verilator_args,
+    verilator_model_cache,
+)
+from tinytapeout.tech import tech_map
+
+
+@dataclass
+class SimOptions:
+    jobs: int = 1
+    clean: bool = False
+    slowest: int = 5
+    results_json: Path | None = None
+    full_netlist: bool = False
+    sim: str = "icarus"
+    sim_threads: int | None = None
+    shard: tuple[int, int] | None = None
+    durations: Path | None = None
 
 
-@click.command()
+def _parse_shard(click_ctx, param, value: str | None) -> tuple[int, int] | None:
+    if value is None:
+        return None
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise click.BadParameter("expected i/n, e.g. 1/4") from None
+    if not 1 <= index <= count:
+        raise click.BadParameter("expected 1 <= i <= n")
+    return index, count
+
+
+@click.group(invoke_without_command=True)
 @click.option("--project-dir", default=".", help="Project directory.")
 @click.option(
     "--gl",
     is_flag=True,
     help="Run gate-level simulation (requires hardened design).",
 )
-def test(project_dir: str, gl: bool):
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=1,
+    help="Testcases to run in parallel, each in its own simulator process "
+    "(default: 1, all testcases in one simulator run).",
+)
+@click.option(
+    "--clean",
+    is_flag=True,
+    help="Rebuild the simulation even if the HDL sources are unchanged.",
+)
+@click.option(
+    "--slowest",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Number of slowest testcases to list (0 to hide).",
+)
+@click.option(
+    "--results-json",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Also write the results summary as JSON to this file.",
+)
+@click.option(
+    "--full-netlist",
+    is_flag=True,
+    help="Keep fill, decap, tap and antenna cells in the gate-level netlist.",
+)
+@click.option(
+    "--sim",
+    type=click.Choice(["icarus", "verilator"]),
+    default="icarus",
+    show_default=True,
+    help="Simulator for the cocotb tests (verilator: RTL only).",
+)
+@click.option(
+    "--sim-threads",
+    type=int,
+    default=None,
+    help="Threads of the Verilator model (default: several for large designs "
+    "when testcases do not run in parallel).",
+)
+@click.option(
+    "--shard",
+    metavar="I/N",
+    callback=_parse_shard,
+    help="Run only the I-th of N shards of the testcases, balanced by their "
+    "recorded durations. Combine the results with 'tt test merge-results'.",
+)
+@click.option(
+    "--durations",
+    "durations_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Testcase durations file to schedule and shard by "
+    "(default: test/tt-durations.json, which can be committed). All shards of "
+    "a run must use the same durations file, or they may not cover every "
+    "testcase.",
+)
+@click.pass_context
+def test(
+    click_ctx: click.Context,
+    project_dir: str,
+    gl: bool,
+    jobs: int,
+    clean: bool,
+    slowest: int,
+    results_json: Path | None,
+    full_netlist: bool,
+    sim: str,
+    sim_threads: int | None,
+    shard: tuple[int, int] | None,
+    durations_file: Path | None,
+):
     """Run project tests."""
+    if click_ctx.invoked_subcommand is not None:
+        return
     ctx = detect_context(project_dir)
     test_dir = ctx.project_dir / "test"
 
@@ -25,12 +167,41 @@ def test(project_dir: str, gl: bool):
         console.print("[red]No test/ directory found.[/red]")
         sys.exit(2)
 
-    _check_iverilog(gl)
+    if sim == "verilator":
+        _check_verilator(gl)
+    else:
+        _check_iverilog(gl)
 
+    options = SimOptions(
+        jobs=jobs,
+        clean=clean,
+        slowest=slowest,
+        results_json=results_json,
+        full_netlist=full_netlist,
+        sim=sim,
+        sim_threads=sim_threads,
+        shard=shard,
+        durations=durations_file,
+    )
     if gl:
-        _run_gl_test(ctx, test_dir)
+        _run_gl_test(ctx, test_dir, options)
     else:
-        _run_rtl_test(test_dir)
+        _run_rtl_test(ctx, test_dir, options)
+
+
+def _check_verilator(gl: bool):
+    if gl:
+        console.print(
+            "[red]Gate-level tests need Icarus Verilog: Verilator does not "
+            "support the UDP tables of the PDK's cell models.[/red]"
+        )
+        sys.exit(2)
+    if not check_verilator().available:
+        console.print(
+            "[red]verilator not found. Install it with:[/red]\n"
+            "  sudo apt-get install verilator"
+        )
+        sys.exit(2)
 
 
 def _check_iverilog(gl: bool):
@@ -56,28 +227,13 @@ def _check_iverilog(gl: bool):
             pass
 
 
-def _run_rtl_test(test_dir: Path):
+def _run_rtl_test(ctx, test_dir: Path, options: SimOptions):
     """Run RTL simulation tests."""
     console.print("[bold]Running RTL tests...[/bold]\n")
-
-    result = run_make(str(test_dir), "clean")
-    if result.returncode != 0:
-        console.print("[red]make clean failed.[/red]")
-        sys.exit(1)
-
-    result = run_make(str(test_dir))
-    if result.returncode != 0:
-        console.print("[red]RTL tests failed.[/red]")
-        sys.exit(1)
-
-    if _has_failures(test_dir):
-        console.print("[red]RTL tests reported failures.[/red]")
-        sys.exit(1)
-
-    console.print("[green]RTL tests passed.[/green]")
+    _run_tests(ctx, test_dir, "RTL", options)
 
 
-def _run_gl_test(ctx, test_dir: Path):
+def _run_gl_test(ctx, test_dir: Path, options: SimOptions):
     """Run gate-level simulation tests."""
     # Copy gate-level netlist into test directory
     submission_dir = ctx.project_dir / "tt_submission"
@@ -87,7 +243,7 @@ def _run_gl_test(ctx, test_dir: Path):
         )
         sys.exit(2)
 
-    netlists = list(submission_dir.glob("*.v"))
+    netlists = sorted(submission_dir.glob("*.v"))
     if not netlists:
         console.print(
             "[red]No gate-level netlist found in tt_submission/. "
@@ -97,38 +253,286 @@ def _run_gl_test(ctx, test_dir: Path):
 
     console.print("[bold]Running gate-level tests...[/bold]\n")
 
-    dest = test_dir / "gate_level_netlist.v"
-    # Concatenate all .v files into one netlist
-    with open(dest, "w") as out:
-        for v_file in netlists:
-            out.write(v_file.read_text())
+    # Concatenate all .v files into one netlist (rewritten only on change)
+    netlist = write_gl_netlist(
+        netlists,
+        test_dir / GL_NETLIST,
+        None if options.full_netlist else tech_map[ctx.tech].cell_regexp,
+    )
+    if netlist.removed:
+        console.print(
+            f"Left out {netlist.removed} fill, decap, tap and antenna cell "
+            "instances from the netlist.\n"
+        )
+
+    env = {"GATES": "yes"}
+    # Compile only the cell models the netlist uses (cached per PDK version)
+    pdk_root = os.environ.get("PDK_ROOT")
+    if pdk_root:
+        mirror = prepare_cell_models(
+            netlist.path, ctx.tech, pdk_root, pdk_mirror_dir(test_dir, pdk_root)
+        )
+        if mirror is not None:
+            env["PDK_ROOT"] = str(mirror)
+
+    _run_tests(ctx, test_dir, "Gate-level", options, env=env)
+
+
+def _run_tests(
+    ctx,
+    test_dir: Path,
+    label: str,
+    options: SimOptions,
+    env: dict[str, str] | None = None,
+):
+    """Run the tests (in parallel with jobs > 1) and check the results.
 
-    # Clean previous results
+    The simulation is cleaned first only if its HDL inputs changed since the
+    last run (or with options.clean).
+    """
+    jobs = options.jobs
+    env = dict(env or {})
+    gl = env.get("GATES") == "yes"
+    mode = "gl" if gl else "rtl"
+    inputs = hdl_inputs(ctx.project_dir, test_dir, ctx.info, gl)
+    make_args: list[str] = []
+    worker_make_args: list[str] = []
+    if options.sim == "verilator":
+        build_dir = sim_build_dir(mode)
+        env["SIM"] = "verilator"
+        env["EXTRA_ARGS"] = _verilator_extra_args(options, inputs)
+        make_args = [f"SIM_BUILD={build_dir}"]
+        worker_make_args = [f"SIM_BUILD={test_dir.absolute() / build_dir}"]
+        mode = f"{mode}-verilator"
+    fingerprint = inputs_fingerprint(inputs, mode, env.get("EXTRA_ARGS"))
+    rebuild = options.clean or not build_is_current(test_dir, mode, fingerprint)
+    durations = DurationDB(options.durations or durations_path(test_dir), mode)
+    if rebuild:
+        result = run_make(str(test_dir), "clean", *make_args, env=env)
+        if result.returncode != 0:
+            console.print("[red]make clean failed.[/red]")
+            sys.exit(1)
+    else:
+        console.print("HDL sources unchanged, reusing the compiled simulation.\n")
+
+    if options.sim == "verilator":
+        _build_verilator_model(
+            test_dir, build_dir, make_args, env, fingerprint, not options.clean
+        )
+
+    # Clean previous results (make would consider an existing one up to date)
     results_xml = test_dir / "results.xml"
     if results_xml.exists():
         results_xml.unlink()
 
-    result = run_make(str(test_dir), "clean")
-    if result.returncode != 0:
-        console.print("[red]make clean failed.[/red]")
-        sys.exit(1)
+    testcases = find_testcases(test_dir) if jobs > 1 or options.shard else []
+    if options.shard:
+        testcases = _shard_testcases(durations, testcases, *options.shard)
+        if testcases:
+            env.update(select_testcases(testcases, env))
+    if jobs > 1 and len(testcases) < 2:
+        console.print(
+            "[yellow]Found fewer than two cocotb testcases; "
+            "running them in one simulator process.[/yellow]"
+        )
+    returncode = 0
+    if options.shard and not testcases:
+        # Still leave a results.xml for 'tt test merge-results'
+        merge_results([], results_xml)
+    elif jobs > 1 and len(testcases) > 1:
+        testcases = durations.schedule(testcases)
+        _run_parallel(test_dir, testcases, jobs, env, rebuild, worker_make_args)
+    else:
+        returncode = run_make(str(test_dir), *make_args, env=env).returncode
+    record_build(test_dir, mode, fingerprint)
+    _record_durations(durations, results_xml)
 
-    result = run_make(str(test_dir), env={"GATES": "yes"})
-    if result.returncode != 0:
-        console.print("[red]Gate-level tests failed.[/red]")
+    summary = _report_results(results_xml, options.slowest, options.results_json)
+    if returncode != 0:
+        console.print(f"[red]{label} tests failed.[/red]")
         sys.exit(1)
 
-    if _has_failures(test_dir):
-        console.print("[red]Gate-level tests reported failures.[/red]")
+    if summary is None or summary.failed:
+        console.print(f"[red]{label} tests reported failures.[/red]")
         sys.exit(1)
 
-    console.print("[green]Gate-level tests passed.[/green]")
+    console.print(f"[green]{label} tests passed.[/green]")
 
 
-def _has_failures(test_dir: Path) -> bool:
-    """Check results.xml for test failures."""
-    results_xml = test_dir / "results.xml"
+def _shard_testcases(
+    durations: DurationDB, testcases: list[str], index: int, count: int
+) -> list[str]:
+    if not testcases:
+        console.print("[red]No cocotb testcases found to shard.[/red]")
+        sys.exit(2)
+    shard = durations.shards(testcases, count)[index - 1]
+    console.print(
+        f"Shard {index}/{count}: {len(shard)} of {len(testcases)} testcases\n"
+    )
+    return shard
+
+
+def _record_durations(durations: DurationDB, results_xml: Path):
+    """Remember how long each testcase took, for scheduling later runs."""
+    if not results_xml.exists():
+        return
+    try:
+        durations.record(iter_testcases(results_xml))
+    except ResultsError:
+        return
+    durations.save()
+
+
+def _report_results(
+    results_xml: Path, slowest: int, results_json: Path | None
+) -> ResultsSummary | None:
+    """Print (and optionally save) the results.xml summary.
+
+    Returns None if results.xml is unreadable, an empty summary if there is
+    none.
+    """
     if not results_xml.exists():
-        return False
-    content = results_xml.read_text()
-    return "failure" in content
+        return ResultsSummary()
+    try:
+        summary = summarize_results(results_xml, slowest=slowest)
+    except ResultsError as e:
+        console.print(f"[red]{escape(str(e))}[/red]")
+        return None
+
+    console.print(
+        f"\n[bold]{summary.total} tests:[/bold] [green]{summary.passed} passed[/green], "
+        f"[red]{summary.failed} failed[/red], {summary.skipped} skipped "
+        f"({summary.duration:.1f}s)"
+    )
+    for case in summary.failures:
+        print_status("FAIL", escape(case.name), style="red")
+        if case.message:
+            console.print(f"       {case.message}", markup=False, highlight=False)
+    if summary.failed > len(summary.failures):
+        console.print(f"       ... and {summary.failed - len(summary.failures)} more")
+    if summary.slowest:
+        table = Table(title="Slowest tests", title_justify="left")
+        table.add_column("Test")
+        table.add_column("Time", justify="right")
+        for case in summary.slowest:
+            table.add_row(escape(case.name), f"{case.duration:.2f}s")
+        console.print(table)
+
+    if results_json:
+        results_json.write_text(json.dumps(summary.to_json(), indent=2) + "\n")
+    return summary
+
+
+def _verilator_extra_args(options: SimOptions, inputs: list[Path]) -> str:
+    """EXTRA_ARGS for the Makefile: the caller's, then ours."""
+    threads = options.sim_threads or default_threads(options.jobs, inputs)
+    args = verilator_args(check_verilator().version, threads)
+    inherited = os.environ.get("EXTRA_ARGS")
+    return f"{inherited} {args}" if inherited else args
+
+
+def _build_verilator_model(
+    test_dir: Path,
+    build_dir: str,
+    make_args: list[str],
+    env: dict[str, str],
+    fingerprint: str,
+    use_cache: bool,
+):
+    """Build (or restore from the cache) the Verilator model before the tests."""
+    cache = verilator_model_cache()
+    path = test_dir / build_dir
+    if (
+        use_cache
+        and not (path / "Vtop").exists()
+        and restore_model(cache, fingerprint, path)
+    ):
+        console.print("Restored the compiled Verilator model from the cache.\n")
+        return
+    built_before = (path / "Vtop").exists()
+    result = run_make(str(test_dir), *make_args, f"{build_dir}/Vtop", env=env)
+    if result.returncode != 0:
+        console.print("[red]Building the Verilator model failed.[/red]")
+        sys.exit(1)
+    if not built_before:
+        store_model(cache, fingerprint, path)
+
+
+def _run_parallel(
+    test_dir: Path,
+    testcases: list[str],
+    jobs: int,
+    env: dict[str, str] | None,
+    rebuild: bool,
+    make_args: list[str] | None = None,
+):
+    """Run each testcase in its own simulator and merge the results.xml files."""
+    workers = min(jobs, len(testcases))
+    console.print(f"Running {len(testcases)} testcases on {workers} workers\n")
+
+    def report(run: CocotbRun):
+        if run.passed:
+            print_status("PASS", f"{run.name} ({run.duration:.1f}s)")
+        else:
+            print_status("FAIL", f"{run.name} ({run.duration:.1f}s)", style="red")
+            console.print(f"       Log: {run.log}")
+
+    runs = run_testcases(
+        test_dir,
+        testcases,
+        jobs,
+        env=env,
+        on_done=report,
+        clean=rebuild,
+        make_args=make_args,
+    )
+    merge_results([run.results for run in runs], test_dir / "results.xml")
+    console.print()
+
+
+@test.command(name="merge-results")
+@click.argument(
+    "results",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default="results.xml",
+    show_default=True,
+    help="Merged results file.",
+)
+@click.option(
+    "--slowest",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Number of slowest testcases to list (0 to hide).",
+)
+@click.option(
+    "--results-json",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Also write the results summary as JSON to this file.",
+)
+def merge_results_command(
+    results: tuple[Path, ...],
+    output: Path,
+    slowest: int,
+    results_json: Path | None,
+):
+    """Merge the results.xml files of 'tt test --shard' runs into one."""
+    try:
+        count = merge_results(list(results), output)
+    except ResultsError as e:
+        console.print(f"[red]{escape(str(e))}[/red]")
+        sys.exit(1)
+    console.print(f"Merged {count} testcases from {len(results)} files into {output}")
+
+    summary = _report_results(output, slowest, results_json)
+    if summary is None or summary.failed:
+        console.print("[red]Tests reported failures.[/red]")
+        sys.exit(1)
+    console.print("[green]Tests passed.[/green]")
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import click
+
+from tinytapeout.cli.console import console
+
+
+@click.group()
+def worker():
+    """Remote build worker for 'tt gds build --remote'."""
+    pass
+
+
+@worker.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", default=8765, type=int, help="Port to listen on.")
+@click.option(
+    "--workdir",
+    default=str(Path.home() / ".cache" / "tinytapeout" / "worker"),
+    help="Directory for the blob store and project workspaces.",
+)
+@click.option(
+    "--tt-tools-dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Shared tt-support-tools checkout (default: clone one per project).",
+)
+@click.option("--jobs", default=1, type=int, help="Number of concurrent builds.")
+@click.option(
+    "--token",
+    envvar="TT_WORKER_TOKEN",
+    default=None,
+    help="Shared token clients must send (required unless --host is loopback).",
+)
+@click.option(
+    "--max-blob-size",
+    envvar="TT_WORKER_MAX_BLOB_SIZE",
+    default="20G",
+    show_default=True,
+    help="Blob store size budget; least recently used blobs are evicted.",
+)
+def serve(
+    host: str,
+    port: int,
+    workdir: str,
+    tt_tools_dir: str | None,
+    jobs: int,
+    token: str | None,
+    max_blob_size: str,
+):
+    """Serve remote builds over HTTP."""
+    from tinytapeout.cli.archive import parse_size
+    from tinytapeout.cli.worker import BuildWorker, create_server
+
+    try:
+        max_blob_bytes = parse_size(max_blob_size)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--max-blob-size") from None
+    build_worker = BuildWorker(
+        Path(workdir),
+        tt_tools_dir=Path(tt_tools_dir) if tt_tools_dir else None,
+        max_jobs=jobs,
+        max_blob_bytes=max_blob_bytes,
+    )
+    try:
+        server = create_server(build_worker, host, port, token)
+    except ValueError as e:
+        raise click.UsageError(f"{e} Pass --token or set TT_WORKER_TOKEN.") from None
+    bound_host, bound_port = server.server_address[:2]
+    console.print(f"Worker listening on http://{bound_host}:{bound_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("Shutting down.")
+    finally:
+        server.server_close()
@@ -1,6 +1,6 @@
 import os
-import subprocess
 import sys
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -11,6 +11,9 @@ from tinytapeout.tech import TechName, load_tile_sizes
 
 TT_SUPPORT_TOOLS_REPO = "https://github.com/TinyTapeout/tt-support-tools"
 
+# Held while require_tt_tools checks and prepares the checkout
+_TT_TOOLS_LOCK = threading.Lock()
+
 
 @dataclass
 class ProjectContext:
@@ -20,6 +23,7 @@ class ProjectContext:
     tech: TechName
     has_gds: bool
     info_errors: list[str] | None = None
+    tt_tools_ready: bool = False
 
     @property
     def info_yaml_path(self) -> Path:
@@ -30,24 +34,32 @@ class ProjectContext:
         return self.project_dir / "runs" / "wokwi" / "final" / "gds"
 
     def require_tt_tools(self) -> Path:
-        """Return tt_tools_dir, cloning or updating tt-support-tools as needed."""
-        if self.tt_tools_dir is not None:
-            _update_tt_tools(self.tt_tools_dir)
-            _install_tt_tools_deps(self.tt_tools_dir)
+        """Return tt_tools_dir, cloning or updating tt-support-tools as needed.
+
+        The checkout is updated at most once per CLI invocation, so steps that
+        run tt_tool.py concurrently never race on git or pip.
+        """
+        with _TT_TOOLS_LOCK:
+            if self.tt_tools_ready and self.tt_tools_dir is not None:
+                return self.tt_tools_dir
+            if self.tt_tools_dir is not None:
+                _update_tt_tools(self.tt_tools_dir)
+                _install_tt_tools_deps(self.tt_tools_dir)
+            else:
+                self.tt_tools_dir = _clone_tt_tools(self.project_dir)
+                _install_tt_tools_deps(self.tt_tools_dir)
+            self.tt_tools_ready = True
             return self.tt_tools_dir
-        tt_dir = _clone_tt_tools(self.project_dir)
-        _install_tt_tools_deps(tt_dir)
-        self.tt_tools_dir = tt_dir
-        return tt_dir
 
 
 def _clone_tt_tools(project_dir: Path) -> Path:
     """Clone tt-support-tools into project_dir/tt/."""
     from tinytapeout.cli.console import console
+    from tinytapeout.cli.runner import run_command
 
     tt_dir = project_dir / "tt"
     console.print(f"Cloning tt-support-tools into {tt_dir} ...")
-    result = subprocess.run(
+    result = run_command(
         ["git", "clone", "--depth=1", TT_SUPPORT_TOOLS_REPO, str(tt_dir)],
         capture_output=True,
         text=True,
@@ -62,9 +74,10 @@ def _clone_tt_tools(project_dir: Path) -> Path:
 def _update_tt_tools(tt_dir: Path) -> None:
     """Pull latest main in an existing tt-support-tools checkout."""
     from tinytapeout.cli.console import console
+    from tinytapeout.cli.runner import run_command
 
     console.print("Updating tt-support-tools ...")
-    result = subprocess.run(
+    result = run_command(
         ["git", "-C", str(tt_dir), "pull", "--ff-only", "--depth=1"],
         capture_output=True,
         text=True,
@@ -88,6 +101,7 @@ def _tt_tools_python(tt_dir: Path) -> str:
 def _install_tt_tools_deps(tt_dir: Path) -> None:
     """Create a venv and install tt-support-tools dependencies if needed."""
     from tinytapeout.cli.console import console
+    from tinytapeout.cli.runner import run_command
 
     req_file = tt_dir / "requirements.txt"
     if not req_file.exists():
@@ -98,7 +112,7 @@ def _install_tt_tools_deps(tt_dir: Path) -> None:
 
     # Check if existing venv is broken (e.g. Python version changed)
     if venv_python.exists():
-        result = subprocess.run(
+        result = run_command(
             [str(venv_python), "-c", "import sys"],
             capture_output=True,
         )
@@ -111,7 +125,7 @@ def _install_tt_tools_deps(tt_dir: Path) -> None:
     # Create venv if it doesn't exist
     if not venv_python.exists():
         console.print("Creating tt-support-tools venv ...")
-        result = subprocess.run(
+        result = run_command(
             [sys.executable, "-m", "venv", str(venv_dir)],
             capture_output=True,
             text=True,
@@ -121,7 +135,7 @@ def _install_tt_tools_deps(tt_dir: Path) -> None:
             raise SystemExit(2)
 
     # Check if deps are already satisfied (fast path)
-    result = subprocess.run(
+    result = run_command(
         [str(venv_python), "-m", "pip", "install", "--dry-run", "-r", str(req_file)],
         capture_output=True,
         text=True,
@@ -130,7 +144,7 @@ def _install_tt_tools_deps(tt_dir: Path) -> None:
         return
 
     console.print("Installing tt-support-tools dependencies ...")
-    result = subprocess.run(
+    result = run_command(
         [str(venv_python), "-m", "pip", "install", "-r", str(req_file)],
         capture_output=True,
         text=True,
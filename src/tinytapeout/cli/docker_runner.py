@@ -0,0 +1,242 @@
+"""Warm Docker container for running precheck.
+
+Starting a container (and installing precheck's Python requirements in it)
+costs more than most checks, so running containers are shared: 'docker run
+-d ... sleep' starts one per image, requirements file and time window, and
+every validation in that window is a 'docker exec'. Containers are started
+with --rm and sleep for CONTAINER_LIFETIME, so an idle one goes away on its
+own; 'tt gds validate --stop-container' removes them right away.
+
+The mounts must not depend on the project, or every project would get a
+container of its own. Only a staging directory in the user cache (writable),
+PDK_ROOT and the directory of the precheck driver are mounted, at their host
+paths; tt-support-tools and the GDS files are synced into the staging
+directory before each validation. The container runs as the calling user, so
+the reports it writes stay owned by them.
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+from tinytapeout.cli.cache import cache_key, cache_root
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.cli.runner import run_command
+
+IMAGE_ENV = "TT_PRECHECK_IMAGE"
+DEFAULT_IMAGE = "ghcr.io/librelane/librelane:latest"
+CONTAINER_LABEL = "tt.precheck"
+STAGING_NAME = "precheck-docker"
+
+# A container exits (and is removed) this long after it was started. New
+# validations move to a fresh container every CONTAINER_WINDOW seconds, so
+# one that starts in a container has at least the difference left to finish.
+CONTAINER_LIFETIME = 8 * 3600
+CONTAINER_WINDOW = 4 * 3600
+
+# Not synced into the staging directory
+_SKIP = {".git", ".venv", "venv", "__pycache__", "reports", "precheck.log"}
+
+
+class DockerError(Exception):
+    pass
+
+
+def precheck_image() -> str:
+    return os.environ.get(IMAGE_ENV) or DEFAULT_IMAGE
+
+
+def staging_dir() -> Path:
+    """Directory shared with the precheck containers."""
+    return cache_root() / STAGING_NAME
+
+
+def container_name(
+    image: str,
+    mounts: list[tuple[Path, bool]],
+    requirements: Path | None,
+    now: float | None = None,
+) -> str:
+    """Name of the container for this image, mounts, requirements and time."""
+    req_hash = (
+        hash_file(requirements) if requirements and requirements.exists() else None
+    )
+    key = cache_key(image, sorted((str(p), rw) for p, rw in mounts), req_hash)
+    window = int((time.time() if now is None else now) // CONTAINER_WINDOW)
+    return f"tt-precheck-{key[:16]}-{window}"
+
+
+def precheck_mounts(staging: Path, pdk_root: str | None) -> list[tuple[Path, bool]]:
+    """Directories to bind-mount, as (path, writable)."""
+    # Absolute but not resolved, to match the paths on the command line
+    mounts = [
+        (Path(os.path.abspath(staging)), True),
+        (Path(os.path.abspath(__file__)).parent, False),  # precheck_driver.py
+    ]
+    if pdk_root:
+        mounts.append((Path(os.path.abspath(pdk_root)), False))
+    # Drop mounts nested in another mount that grants at least as much access
+    unique = []
+    for path, writable in sorted(mounts, key=lambda m: len(m[0].parts)):
+        if not any(path.is_relative_to(p) and (rw or not writable) for p, rw in unique):
+            unique.append((path, writable))
+    return unique
+
+
+def stage_tt_tools(tt_dir: Path, staging: Path) -> Path:
+    """Sync tt-support-tools into the staging directory; returns the copy.
+
+    Each checkout gets its own copy, updated in place, so repeated validations
+    only re-link the files that changed.
+    """
+    dest = staging / "tt" / cache_key(os.path.abspath(tt_dir))[:16]
+    _sync_tree(tt_dir, dest, skip=lambda name: name.startswith(".precheck-"))
+    return dest
+
+
+def stage_precheck_run(
+    staged_tt: Path, tt_dir: Path, precheck_dir: Path, gds_path: str
+) -> tuple[Path, str]:
+    """Stage one precheck run; returns its directory and GDS path in staging.
+
+    precheck_dir (tt/precheck or an isolated_precheck_dir) is synced to the
+    same place in the staged checkout, and the GDS next to it.
+    """
+    run_dir = staged_tt / precheck_dir.relative_to(tt_dir)
+    _sync_tree(precheck_dir, run_dir)
+    shutil.rmtree(run_dir / "reports", ignore_errors=True)
+    gds = staged_tt.parent / f"{staged_tt.name}-gds" / precheck_dir.name
+    gds = gds / Path(gds_path).name
+    _sync_file(Path(gds_path), gds)
+    return run_dir, str(gds)
+
+
+def ensure_container(
+    image: str,
+    mounts: list[tuple[Path, bool]],
+    requirements: Path | None,
+    now: float | None = None,
+) -> str:
+    """Start (or reuse) the precheck container and return its name.
+
+    requirements must be inside a mount, as they are installed in the
+    container.
+    """
+    name = container_name(image, mounts, requirements, now)
+    state = run_command(
+        ["docker", "inspect", "--format", "{{.State.Running}}", name],
+        capture_output=True,
+        text=True,
+    )
+    if state.returncode == 0:
+        if state.stdout.strip() != "true":
+            _docker("start", name)
+        return name
+
+    cmd = ["run", "--detach", "--rm", "--init", "--name", name]
+    cmd.extend(["--label", CONTAINER_LABEL])
+    if hasattr(os, "getuid"):
+        cmd.extend(["--user", f"{os.getuid()}:{os.getgid()}", "--env", "HOME=/tmp"])
+    for path, writable in mounts:
+        cmd.extend(["--volume", f"{path}:{path}:{'rw' if writable else 'ro'}"])
+    cmd.extend(["--entrypoint", "sleep", image, str(CONTAINER_LIFETIME)])
+    _docker(*cmd)
+
+    if requirements and requirements.exists():
+        install = run_command(
+            ["docker", "exec", name, "python3", "-m", "pip", "install", "--user"]
+            + ["-r", os.path.abspath(requirements)],
+            capture_output=True,
+            text=True,
+        )
+        if install.returncode != 0:
+            run_command(["docker", "rm", "--force", name], capture_output=True)
+            raise DockerError(
+                f"Installing precheck requirements in {image} failed:\n"
+                f"{install.stderr.strip()}"
+            )
+    return name
+
+
+def stop_containers() -> list[str]:
+    """Remove all precheck containers; returns their names."""
+    listing = run_command(
+        ["docker", "ps", "--all", "--filter", f"label={CONTAINER_LABEL}"]
+        + ["--format", "{{.Names}}"],
+        capture_output=True,
+        text=True,
+    )
+    if listing.returncode != 0:
+        raise DockerError(f"docker ps failed: {listing.stderr.strip()}")
+    names = listing.stdout.split()
+    if names:
+        _docker("rm", "--force", *names)
+    return names
+
+
+def exec_command(container: str, workdir: Path, cmd: list[str]) -> list[str]:
+    """Command running cmd (a host Python command line) in the container."""
+    return [
+        "docker",
+        "exec",
+        "--workdir",
+        str(workdir),
+        # Take these from the environment of 'docker exec'
+        "--env",
+        "PDK",
+        "--env",
+        "PDK_ROOT",
+        container,
+        "python3",  # the host venv's interpreter does not exist in the image
+        *cmd[1:],
+    ]
+
+
+def _docker(*args: str) -> None:
+    result = run_command(["docker", *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise DockerError(f"docker {args[0]} failed: {result.stderr.strip()}")
+
+
+def _sync_tree(src: Path, dest: Path, skip=lambda name: False) -> None:
+    """Make dest a copy of src (following symlinks), skipping _SKIP entries."""
+    dest.mkdir(parents=True, exist_ok=True)
+    wanted = set()
+    for entry in os.scandir(src):
+        if entry.name in _SKIP or skip(entry.name):
+            continue
+        wanted.add(entry.name)
+        target = dest / entry.name
+        if entry.is_dir():
+            if target.is_file() or target.is_symlink():
+                target.unlink()
+            _sync_tree(Path(entry.path), target, skip)
+        elif entry.is_file():
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target)
+            _sync_file(Path(entry.path), target)
+    for entry in os.scandir(dest):
+        if entry.name in wanted or entry.name in _SKIP or skip(entry.name):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+
+def _sync_file(src: Path, dest: Path) -> None:
+    from tinytapeout.cli.submission import link_or_copy
+
+    st = src.stat()
+    try:
+        current = dest.stat()
+    except FileNotFoundError:
+        current = None
+    if current and (current.st_size, current.st_mtime_ns) == (
+        st.st_size,
+        st.st_mtime_ns,
+    ):
+        return
+    link_or_copy(src.resolve(), dest)  # a link to a symlink would dangle
+    os.utime(dest, ns=(st.st_atime_ns, st.st_mtime_ns))
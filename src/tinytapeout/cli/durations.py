@@ -0,0 +1,102 @@
+"""Recorded testcase durations, used to schedule 'tt test' runs.
+
+After every run, the duration of each testcase in results.xml is folded into
+test/tt-durations.json (an exponential moving average per testcase, kept
+separately per simulation mode, e.g. "rtl" and "gl"). It lives outside
+SIM_BUILD, so the history survives the 'make clean' of a rebuild. Parallel
+runs then hand out the testcases longest first (LPT scheduling), so one long
+testcase picked up last does not keep a single worker busy after the others
+are done.
+Testcases without history are estimated at the median of the known ones.
+
+The same estimates split the testcases into shards for 'tt test --shard i/n'.
+The split depends only on the testcase names and the database, so CI jobs
+that share a durations file (or all start without one) agree on it.
+"""
+
+import json
+import statistics
+from collections.abc import Iterable
+from pathlib import Path
+
+from tinytapeout.cli.fsutil import write_atomic
+from tinytapeout.cli.sim_results import CaseResult
+
+# Weight of the newest measurement in the moving average
+SMOOTHING = 0.5
+# Estimate when nothing has been recorded yet (only the order matters)
+DEFAULT_ESTIMATE = 1.0
+
+
+def durations_path(test_dir: Path) -> Path:
+    return test_dir / "tt-durations.json"
+
+
+class DurationDB:
+    """Per-testcase durations of one simulation mode."""
+
+    def __init__(self, path: Path, mode: str):
+        self.path = path
+        self.mode = mode
+        try:
+            self._data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self._data = {}
+        self.durations: dict[str, float] = dict(self._data.get(mode, {}))
+
+    def default_estimate(self) -> float:
+        if not self.durations:
+            return DEFAULT_ESTIMATE
+        return statistics.median(self.durations.values())
+
+    def estimate(self, name: str) -> float:
+        if name in self.durations:
+            return self.durations[name]
+        return self.default_estimate()
+
+    def schedule(self, names: list[str]) -> list[str]:
+        """Order names longest first (ties keep their order)."""
+        default = self.default_estimate()
+        return sorted(names, key=lambda n: -self.durations.get(n, default))
+
+    def shards(self, names: list[str], count: int) -> list[list[str]]:
+        """Split names into count shards of about equal estimated duration.
+
+        Greedy: longest first (ties by name), each to the least loaded shard
+        (ties to the lowest index). Each shard is returned longest first.
+        """
+        default = self.default_estimate()
+        shards: list[list[str]] = [[] for _ in range(count)]
+        loads = [0.0] * count
+        for name in sorted(
+            set(names), key=lambda n: (-self.durations.get(n, default), n)
+        ):
+            index = min(range(count), key=lambda i: (loads[i], i))
+            shards[index].append(name)
+            loads[index] += self.durations.get(name, default)
+        return shards
+
+    def record(self, cases: Iterable[CaseResult]) -> int:
+        """Fold the durations of run (not skipped) testcases in."""
+        count = 0
+        for case in cases:
+            if case.status == "skip" or case.duration is None:
+                continue
+            previous = self.durations.get(case.name)
+            if previous is None:
+                self.durations[case.name] = case.duration
+            else:
+                self.durations[case.name] = (
+                    SMOOTHING * case.duration + (1 - SMOOTHING) * previous
+                )
+            count += 1
+        return count
+
+    def save(self) -> None:
+        self._data[self.mode] = {
+            name: round(duration, 3)
+            for name, duration in sorted(self.durations.items())
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(self._data, indent=1, sort_keys=True) + "\n"
+        write_atomic(self.path, data.encode())
@@ -174,5 +174,26 @@ def check_iverilog() -> ToolInfo:
 IVERILOG_MIN_VERSION = "13.0"
 
 
+def check_verilator() -> ToolInfo:
+    path = shutil.which("verilator")
+    if not path:
+        return ToolInfo(name="verilator", available=False)
+    try:
+        result = subprocess.run(
+            ["verilator", "--version"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        # "Verilator 5.030 2024-10-27 rev v5.030"
+        import re
+
+        match = re.search(r"Verilator\s+(\d+\.\d+)", result.stdout)
+        version = match.group(1) if match else "unknown"
+        return ToolInfo(name="verilator", available=True, version=version, path=path)
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return ToolInfo(name="verilator", available=False, path=path)
+
+
 def is_ci() -> bool:
     return os.environ.get("CI") == "true" or os.environ.get("GITHUB_ACTIONS") == "true"
@@ -0,0 +1,21 @@
+"""Small filesystem helpers shared by the CLI's stores and output writers."""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write data to path, so readers see either the old or the new contents.
+
+    The data goes to a temporary file in the same directory, which then
+    replaces path; the temporary file is removed if anything fails.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,192 @@
+"""Per-layer geometry summary of a GDS file ('tt gds inspect').
+
+The design is summarized hierarchically: each cell's own polygons are reduced
+per layer once, then instance counts, areas and bounding boxes are propagated
+through the references with vectorized transforms. A standard cell placed
+thousands of times is therefore only measured once, and nothing is flattened.
+"""
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from tinytapeout.cli.layout import (
+    LayoutGeometry,
+    geometry_from_polygons,
+    group_references,
+    pick_top_cell,
+    placements,
+    read_library,
+    topological_order,
+)
+from tinytapeout.tech import TechName, tech_map
+
+
+@dataclass
+class LayerSummary:
+    layer: int
+    datatype: int
+    name: str | None
+    polygons: int
+    area: float  # sum of polygon areas in um^2 (overlaps counted twice)
+    bbox: tuple[float, float, float, float]
+
+
+@dataclass
+class LayoutSummary:
+    top_cell: str
+    polygons: int
+    die_bbox: tuple[float, float, float, float] | None
+    layers: list[LayerSummary] = field(default_factory=list)
+    prboundary_populated: bool = False
+    logo_populated: bool = False
+    label_counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def die_size(self) -> tuple[float, float] | None:
+        if self.die_bbox is None:
+            return None
+        x0, y0, x1, y1 = self.die_bbox
+        return (x1 - x0, y1 - y0)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["die_size"] = self.die_size
+        return data
+
+
+def layer_spec(layer: tuple[int, int]) -> str:
+    return f"{layer[0]}/{layer[1]}"
+
+
+def layer_stats(geom: LayoutGeometry) -> dict[int, tuple[int, float, list[float]]]:
+    """Polygon count, total area and bbox per layer key of a geometry."""
+    import numpy as np
+
+    if not geom.polygon_count:
+        return {}
+    keys = geom.layer_keys()
+    areas = np.abs(geom.polygon_areas())
+    bboxes = geom.polygon_bboxes()
+
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique))
+    area_sums = np.bincount(inverse, weights=areas, minlength=len(unique))
+
+    # Group polygons by layer to reduce their bounding boxes per layer
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(len(unique)))
+    sorted_boxes = bboxes[order]
+    mins = np.minimum.reduceat(sorted_boxes[:, :2], starts)
+    maxs = np.maximum.reduceat(sorted_boxes[:, 2:], starts)
+    return {
+        key: (int(counts[i]), float(area_sums[i]), [*mins[i], *maxs[i]])
+        for i, key in enumerate(unique.tolist())
+    }
+
+
+def summarize_gds(
+    gds_path: str | Path, tech: TechName, top_cell: str | None = None
+) -> LayoutSummary:
+    """Compute per-layer polygon counts, areas and bounding boxes of a GDS."""
+    top = pick_top_cell(read_library(gds_path), top_cell)
+    cells = topological_order(top)
+    local = {
+        cell.name: layer_stats(
+            geometry_from_polygons(cell.name, cell.get_polygons(depth=0), [])
+        )
+        for cell in cells
+    }
+
+    # Flattened instance count (and magnification-weighted count for areas)
+    count_weight: dict[str, float] = defaultdict(float, {top.name: 1})
+    area_weight: dict[str, float] = defaultdict(float, {top.name: 1.0})
+    for cell in cells:
+        for ref in cell.references:
+            if isinstance(ref.cell, str):
+                continue  # reference to a cell missing from the library
+            reps = max(ref.repetition.size, 1)
+            count_weight[ref.cell.name] += count_weight[cell.name] * reps
+            area_weight[ref.cell.name] += (
+                area_weight[cell.name] * reps * ref.magnification**2
+            )
+
+    counts: dict[int, float] = defaultdict(float)
+    areas: dict[int, float] = defaultdict(float)
+    for cell in cells:
+        for key, (count, area, _) in local[cell.name].items():
+            counts[key] += count_weight[cell.name] * count
+            areas[key] += area_weight[cell.name] * area
+    boxes = _deep_bboxes(cells, local)[top.name]
+
+    tech_info = tech_map[tech]
+    names = {layer: name for name, layer in tech_info.drawing_layers.items()}
+    summary = LayoutSummary(
+        top_cell=top.name, polygons=int(sum(counts.values())), die_bbox=None
+    )
+    for key in sorted(counts):
+        layer = (key // 65536, key % 65536)
+        summary.layers.append(
+            LayerSummary(
+                layer=layer[0],
+                datatype=layer[1],
+                name=names.get(layer),
+                polygons=int(counts[key]),
+                area=areas[key],
+                bbox=tuple(float(v) for v in boxes[key]),
+            )
+        )
+    if boxes:
+        summary.die_bbox = (
+            min(b[0] for b in boxes.values()),
+            min(b[1] for b in boxes.values()),
+            max(b[2] for b in boxes.values()),
+            max(b[3] for b in boxes.values()),
+        )
+
+    by_layer = {(s.layer, s.datatype): s for s in summary.layers}
+    boundary = by_layer.get(tech_info.prboundary_layer)
+    summary.prboundary_populated = boundary is not None
+    if boundary is not None:
+        summary.die_bbox = boundary.bbox
+    summary.logo_populated = tech_info.logo_layer in by_layer
+
+    label_layers = set(tech_info.label_layers)
+    for label in top.get_labels(depth=0):
+        layer = (label.layer, label.texttype)
+        if layer in label_layers:
+            spec = layer_spec(layer)
+            summary.label_counts[spec] = summary.label_counts.get(spec, 0) + 1
+    return summary
+
+
+def _deep_bboxes(cells: list, local: dict) -> dict[str, dict[int, list[float]]]:
+    """Per-layer bboxes of each cell including its instances, bottom-up."""
+    import numpy as np
+
+    deep: dict[str, dict[int, list[float]]] = {}
+    for cell in reversed(cells):
+        boxes = {key: list(stats[2]) for key, stats in local[cell.name].items()}
+        for child, refs in group_references(cell).items():
+            if not deep[child]:
+                continue
+            origins, rotation, magnification, flip = placements(refs)
+            cos = (np.cos(rotation) * magnification)[:, None]
+            sin = (np.sin(rotation) * magnification)[:, None]
+            for key, (x0, y0, x1, y1) in deep[child].items():
+                cx = np.array([[x0, x1, x0, x1]])
+                cy = np.array([[y0, y0, y1, y1]]) * flip[:, None]
+                x = cx * cos - cy * sin + origins[:, :1]
+                y = cx * sin + cy * cos + origins[:, 1:]
+                box = [x.min(), y.min(), x.max(), y.max()]
+                if key in boxes:
+                    old = boxes[key]
+                    box = [
+                        min(old[0], box[0]),
+                        min(old[1], box[1]),
+                        max(old[2], box[2]),
+                        max(old[3], box[3]),
+                    ]
+                boxes[key] = box
+        deep[cell.name] = boxes
+    return deep
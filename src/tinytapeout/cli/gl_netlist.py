@@ -0,0 +1,72 @@
+"""Gate-level netlist for 'tt test --gl', assembled from tt_submission/.
+
+The netlists are streamed line by line into test/gate_level_netlist.v, which
+is only replaced when its content changes: rewriting an identical file would
+make cocotb's Makefile recompile the simulation anyway.
+
+Physical-only cells (fill, decap, tap, endcap and antenna diode instances)
+make up a large part of a placed netlist but do nothing in simulation. Unless
+disabled, their instances are left out; they are recognized by the cell name
+that the tech's cell_regexp extracts.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from tinytapeout.cli.hashing import hash_file
+
+PHYSICAL_CELL_RE = re.compile(r"^(fill|decap|tap|endcap|diode|antenna)\w*$")
+
+
+@dataclass
+class GLNetlist:
+    path: Path
+    changed: bool
+    removed: int  # physical-only instances left out
+
+
+def write_gl_netlist(
+    netlists: list[Path], dest: Path, cell_regexp: str | None = None
+) -> GLNetlist:
+    """Concatenate netlists into dest, leaving out physical-only instances.
+
+    cell_regexp (the tech's, with a cell_name group) enables the filtering.
+    dest is left untouched if the result is identical to it.
+    """
+    pattern = re.compile(cell_regexp) if cell_regexp else None
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    removed = 0
+    with open(tmp, "w") as out:
+        for netlist in netlists:
+            skipping = False
+            with open(netlist) as f:
+                for line in f:
+                    if skipping:
+                        # An instance statement ends at the first ';'
+                        skipping = ";" not in line
+                        continue
+                    match = pattern.match(line) if pattern else None
+                    if match and PHYSICAL_CELL_RE.match(match["cell_name"]):
+                        removed += 1
+                        skipping = ";" not in line
+                        continue
+                    out.write(line)
+            if not _ends_with_newline(netlist):
+                out.write("\n")
+
+    if dest.exists() and hash_file(dest) == hash_file(tmp):
+        tmp.unlink()
+        return GLNetlist(path=dest, changed=False, removed=removed)
+    os.replace(tmp, dest)
+    return GLNetlist(path=dest, changed=True, removed=removed)
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, "rb") as f:
+        try:
+            f.seek(-1, os.SEEK_END)
+        except OSError:
+            return True  # empty file
+        return f.read(1) == b"\n"
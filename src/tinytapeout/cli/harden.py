@@ -3,11 +3,10 @@
 import json
 import os
 import shutil
-import subprocess
 from pathlib import Path
 
 from tinytapeout.cli.context import ProjectContext, _tt_tools_python
-from tinytapeout.cli.runner import _tt_tools_env
+from tinytapeout.cli.runner import _tt_tools_env, run_command
 from tinytapeout.tech import tech_map
 
 
@@ -18,13 +17,13 @@ def run_harden(ctx: ProjectContext, *, no_docker: bool = False) -> None:
     tech = tech_map[ctx.tech]
 
     # Collect git metadata (for commit_id.json — does not affect the design)
-    repo_url = _get_git_remote_url(project_dir)
-    commit_hash = _get_git_commit_hash(project_dir)
+    repo_url = git_remote_url(project_dir)
+    commit_hash = git_commit_hash(project_dir)
     tt_version = _get_tt_tools_version(tt_dir)
     workflow_url = _get_workflow_url()
 
     # Merge configs
-    _create_merged_config(project_dir)
+    create_merged_config(project_dir)
 
     # Clean and create run directory
     run_dir = project_dir / "runs" / "wokwi"
@@ -59,7 +58,7 @@ def run_harden(ctx: ProjectContext, *, no_docker: bool = False) -> None:
 
     # Run LibreLane
     env = _tt_tools_env(tt_dir)
-    result = subprocess.run(cmd, env=env)
+    result = run_command(cmd, env=env)
     if result.returncode != 0:
         raise SystemExit(1)
 
@@ -92,13 +91,18 @@ def run_harden(ctx: ProjectContext, *, no_docker: bool = False) -> None:
 
 
 # ---------------------------------------------------------------------------
-# Git metadata helpers (plain subprocess, no GitPython dependency)
+# Git metadata helpers (git through run_command, no GitPython dependency)
 # ---------------------------------------------------------------------------
 
 
-def _get_git_remote_url(project_dir: Path) -> str:
-    """Get the origin remote URL, falling back to 'unknown'."""
-    result = subprocess.run(
+def git_remote_url(project_dir: Path) -> str:
+    """Get the origin remote URL, falling back to 'unknown'.
+
+    Remote build workers pass the client's remote via TT_GIT_REMOTE_URL.
+    """
+    if os.environ.get("TT_GIT_REMOTE_URL"):
+        return os.environ["TT_GIT_REMOTE_URL"]
+    result = run_command(
         ["git", "-C", str(project_dir), "remote", "get-url", "origin"],
         capture_output=True,
         text=True,
@@ -106,9 +110,11 @@ def _get_git_remote_url(project_dir: Path) -> str:
     return result.stdout.strip() if result.returncode == 0 else "unknown"
 
 
-def _get_git_commit_hash(project_dir: Path) -> str:
-    """Get the current HEAD commit hash."""
-    result = subprocess.run(
+def git_commit_hash(project_dir: Path) -> str:
+    """Get the current HEAD commit hash (or TT_GIT_COMMIT on a remote worker)."""
+    if os.environ.get("TT_GIT_COMMIT"):
+        return os.environ["TT_GIT_COMMIT"]
+    result = run_command(
         ["git", "-C", str(project_dir), "rev-parse", "HEAD"],
         capture_output=True,
         text=True,
@@ -119,7 +125,7 @@ def _get_git_commit_hash(project_dir: Path) -> str:
 def _get_tt_tools_version(tt_tools_dir: Path) -> str:
     """Get the tt-support-tools version string (branch/tag + short hash)."""
     # Get branch name
-    result = subprocess.run(
+    result = run_command(
         ["git", "-C", str(tt_tools_dir), "rev-parse", "--abbrev-ref", "HEAD"],
         capture_output=True,
         text=True,
@@ -127,7 +133,7 @@ def _get_tt_tools_version(tt_tools_dir: Path) -> str:
     ref = result.stdout.strip() if result.returncode == 0 else "unknown"
     if ref == "HEAD":
         # Detached HEAD — try describe
-        result = subprocess.run(
+        result = run_command(
             ["git", "-C", str(tt_tools_dir), "describe", "--tags", "--always"],
             capture_output=True,
             text=True,
@@ -135,7 +141,7 @@ def _get_tt_tools_version(tt_tools_dir: Path) -> str:
         ref = result.stdout.strip() if result.returncode == 0 else "(detached)"
 
     # Get short hash
-    result = subprocess.run(
+    result = run_command(
         ["git", "-C", str(tt_tools_dir), "rev-parse", "--short=8", "HEAD"],
         capture_output=True,
         text=True,
@@ -160,7 +166,7 @@ def _get_workflow_url() -> str | None:
 # ---------------------------------------------------------------------------
 
 
-def _create_merged_config(project_dir: Path) -> None:
+def create_merged_config(project_dir: Path) -> None:
     """Merge src/config.json and src/user_config.json into src/config_merged.json."""
     src_dir = project_dir / "src"
 
@@ -0,0 +1,31 @@
+"""Content hashing shared by the CLI's caches and content-addressed stores."""
+
+import hashlib
+import re
+from pathlib import Path
+
+# Hex digest of a 32-byte BLAKE2b hash
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def new_hash():
+    """A hash object for incremental hashing (e.g. of a stream)."""
+    return hashlib.blake2b(digest_size=32)
+
+
+def hash_file(path: str | Path) -> str:
+    """Return the content hash of a file, read in chunks."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, new_hash).hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the content hash of an in-memory buffer."""
+    h = new_hash()
+    h.update(data)
+    return h.hexdigest()
+
+
+def is_digest(value: str) -> bool:
+    """Check whether a string looks like a digest produced by this module."""
+    return bool(DIGEST_RE.match(value))
@@ -0,0 +1,333 @@
+"""GDS geometry packed into NumPy arrays.
+
+Requires the optional 'gds' extra (gdstk, numpy). Polygons are packed into a
+single vertex array with per-polygon offsets, so that areas and bounding boxes
+for many polygons are computed with vectorized NumPy reductions instead of
+per-polygon Python calls.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def require_gds_deps() -> None:
+    """Exit with a hint if the optional gdstk/numpy dependencies are missing."""
+    try:
+        import gdstk  # noqa: F401
+        import numpy  # noqa: F401
+    except ImportError:
+        from tinytapeout.cli.console import console
+
+        console.print(
+            "[red]This command needs gdstk and numpy.[/red]\n"
+            "Install them with: pip install 'tinytapeout-cli[gds]'"
+        )
+        raise SystemExit(2) from None
+
+
+def has_gds_deps() -> bool:
+    try:
+        import gdstk  # noqa: F401
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class Label:
+    text: str
+    layer: int
+    texttype: int
+    x: float
+    y: float
+
+
+@dataclass
+class LayoutGeometry:
+    top_cell: str
+    points: "np.ndarray"  # (P, 2) vertices of all polygons, concatenated
+    offsets: "np.ndarray"  # (N + 1,) start of each polygon in points
+    layers: "np.ndarray"  # (N,) GDS layer per polygon
+    datatypes: "np.ndarray"  # (N,) GDS datatype per polygon
+    labels: list[Label]  # top-level labels only
+
+    @property
+    def polygon_count(self) -> int:
+        return len(self.layers)
+
+    def layer_keys(self) -> "np.ndarray":
+        """One integer per polygon identifying its (layer, datatype) pair."""
+        return self.layers.astype("int64") * 65536 + self.datatypes
+
+    def polygon_areas(self) -> "np.ndarray":
+        """Signed shoelace area of each polygon."""
+        import numpy as np
+
+        if not self.polygon_count:
+            return np.zeros(0)
+        x, y = self.points[:, 0], self.points[:, 1]
+        nxt = np.arange(1, len(x) + 1)
+        nxt[self.offsets[1:] - 1] = self.offsets[:-1]
+        cross = x * y[nxt] - x[nxt] * y
+        return 0.5 * np.add.reduceat(cross, self.offsets[:-1])
+
+    def polygon_bboxes(self) -> "np.ndarray":
+        """(N, 4) array of x0, y0, x1, y1 for each polygon."""
+        import numpy as np
+
+        if not self.polygon_count:
+            return np.zeros((0, 4))
+        starts = self.offsets[:-1]
+        x, y = self.points[:, 0], self.points[:, 1]
+        return np.stack(
+            [
+                np.minimum.reduceat(x, starts),
+                np.minimum.reduceat(y, starts),
+                np.maximum.reduceat(x, starts),
+                np.maximum.reduceat(y, starts),
+            ],
+            axis=1,
+        )
+
+    def polygon_rectangles(self) -> tuple["np.ndarray", "np.ndarray"]:
+        """Decompose the polygons into axis-aligned rectangles.
+
+        Returns an (M, 4) array of x0, y0, x1, y1 and the (M,) index of the
+        polygon each rectangle belongs to. Rectangles are passed through;
+        other polygons are cut into horizontal slabs at their vertices, which
+        is exact for Manhattan shapes (L, T, U, ...) and a staircase
+        approximation of diagonal edges.
+        """
+        import numpy as np
+
+        boxes = self.polygon_bboxes()
+        sizes = np.diff(self.offsets)
+        box_areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        is_rect = (sizes == 4) & np.isclose(np.abs(self.polygon_areas()), box_areas)
+        rects = [boxes[is_rect]]
+        index = [np.flatnonzero(is_rect)]
+        for i in np.flatnonzero(~is_rect):
+            points = self.points[self.offsets[i] : self.offsets[i + 1]]
+            slabs = _slab_rectangles(points)
+            rects.append(slabs)
+            index.append(np.full(len(slabs), i))
+        return np.concatenate(rects), np.concatenate(index)
+
+    def bbox(self) -> tuple[float, float, float, float] | None:
+        if not self.polygon_count:
+            return None
+        x, y = self.points[:, 0], self.points[:, 1]
+        return (float(x.min()), float(y.min()), float(x.max()), float(y.max()))
+
+
+def _slab_rectangles(points: "np.ndarray") -> "np.ndarray":
+    """Rectangles covering one polygon: between each pair of consecutive
+    vertex y coordinates, the even-odd intervals at the middle of the slab.
+    Slabs with the same interval as the one below are merged into it."""
+    import numpy as np
+
+    x0, y0 = points[:, 0], points[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    sloped = y0 != y1
+    x0, y0, x1, y1 = x0[sloped], y0[sloped], x1[sloped], y1[sloped]
+    rects: list[list[float]] = []
+    open_rects: dict[tuple[float, float], int] = {}
+    ys = np.unique(points[:, 1])
+    for bottom, top in zip(ys[:-1], ys[1:], strict=True):
+        mid = (bottom + top) / 2
+        crossing = (np.minimum(y0, y1) < mid) & (np.maximum(y0, y1) > mid)
+        t = (mid - y0[crossing]) / (y1[crossing] - y0[crossing])
+        xs = np.sort(x0[crossing] + t * (x1[crossing] - x0[crossing]))
+        current = {}
+        for left, right in zip(xs[0::2], xs[1::2], strict=False):
+            interval = (float(left), float(right))
+            if interval in open_rects:
+                rects[open_rects[interval]][3] = top
+                current[interval] = open_rects[interval]
+            else:
+                current[interval] = len(rects)
+                rects.append([interval[0], bottom, interval[1], top])
+        open_rects = current
+    return np.array(rects, dtype=float).reshape(-1, 4)
+
+
+def read_library(gds_path: str | Path):
+    import gdstk
+
+    return gdstk.read_gds(str(gds_path))
+
+
+def pick_top_cell(library, name: str | None = None):
+    """Return the named cell, else the tt_um_* top cell, else the first top cell."""
+    if name:
+        for cell in library.cells:
+            if cell.name == name:
+                return cell
+    top_cells = library.top_level()
+    for cell in top_cells:
+        if cell.name.startswith("tt_um_"):
+            return cell
+    if not top_cells:
+        raise ValueError("GDS file contains no cells")
+    return top_cells[0]
+
+
+def geometry_from_polygons(name: str, polygons: list, labels: list) -> LayoutGeometry:
+    """Pack gdstk polygons and labels into flat arrays."""
+    import numpy as np
+
+    count = len(polygons)
+    if polygons:
+        points = np.concatenate([p.points for p in polygons])
+        sizes = np.fromiter((len(p.points) for p in polygons), np.int64, count)
+        layers = np.fromiter((p.layer for p in polygons), np.int64, count)
+        datatypes = np.fromiter((p.datatype for p in polygons), np.int64, count)
+    else:
+        points = np.zeros((0, 2))
+        sizes = layers = datatypes = np.zeros(0, np.int64)
+    offsets = np.zeros(count + 1, np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return LayoutGeometry(
+        top_cell=name,
+        points=points,
+        offsets=offsets,
+        layers=layers,
+        datatypes=datatypes,
+        labels=[
+            Label(lbl.text, lbl.layer, lbl.texttype, *lbl.origin) for lbl in labels
+        ],
+    )
+
+
+def load_layout(gds_path: str | Path, top_cell: str | None = None) -> LayoutGeometry:
+    """Read a GDS file and flatten all polygons of the top cell."""
+    cell = pick_top_cell(read_library(gds_path), top_cell)
+    geom = flatten_cell(cell)
+    geom.labels = [
+        Label(lbl.text, lbl.layer, lbl.texttype, *lbl.origin)
+        for lbl in cell.get_labels(depth=0)
+    ]
+    return geom
+
+
+def flatten_cell(top) -> LayoutGeometry:
+    """Flatten a cell hierarchy into one geometry.
+
+    Each cell's own polygons are packed once; instances are then expanded by
+    transforming the packed vertex arrays of their cell for all placements at
+    once, instead of materializing one gdstk polygon per instance.
+    """
+    import numpy as np
+
+    flat: dict[str, LayoutGeometry] = {}
+    for cell in reversed(topological_order(top)):
+        parts = [geometry_from_polygons(cell.name, cell.get_polygons(depth=0), [])]
+        for child, refs in group_references(cell).items():
+            geom = flat[child]
+            if not geom.polygon_count:
+                continue
+            origins, rotation, magnification, flip = placements(refs)
+            cos = (np.cos(rotation) * magnification)[:, None]
+            sin = (np.sin(rotation) * magnification)[:, None]
+            x = geom.points[None, :, 0]
+            y = geom.points[None, :, 1] * flip[:, None]
+            count = len(origins)
+            points = np.stack(
+                [
+                    x * cos - y * sin + origins[:, :1],
+                    x * sin + y * cos + origins[:, 1:],
+                ],
+                axis=2,
+            ).reshape(-1, 2)
+            starts = geom.offsets[:-1][None, :] + (
+                np.arange(count)[:, None] * len(geom.points)
+            )
+            offsets = np.append(starts.ravel(), len(points))
+            parts.append(
+                LayoutGeometry(
+                    top_cell=child,
+                    points=points,
+                    offsets=offsets,
+                    layers=np.tile(geom.layers, count),
+                    datatypes=np.tile(geom.datatypes, count),
+                    labels=[],
+                )
+            )
+        flat[cell.name] = _concatenate(cell.name, parts)
+    return flat[top.name]
+
+
+def _concatenate(name: str, parts: list[LayoutGeometry]) -> LayoutGeometry:
+    import numpy as np
+
+    if len(parts) == 1:
+        return parts[0]
+    shifts = np.cumsum([0] + [len(p.points) for p in parts[:-1]])
+    offsets = [p.offsets[:-1] + shift for p, shift in zip(parts, shifts, strict=True)]
+    total = sum(len(p.points) for p in parts)
+    return LayoutGeometry(
+        top_cell=name,
+        points=np.concatenate([p.points for p in parts]),
+        offsets=np.append(np.concatenate(offsets), total),
+        layers=np.concatenate([p.layers for p in parts]),
+        datatypes=np.concatenate([p.datatypes for p in parts]),
+        labels=[],
+    )
+
+
+def topological_order(top) -> list:
+    """Cells reachable from top, parents before children."""
+    order: list = []
+    seen: set[str] = set()
+
+    def visit(cell):
+        seen.add(cell.name)
+        for child in cell.dependencies(False):
+            if not isinstance(child, str) and child.name not in seen:
+                visit(child)
+        order.append(cell)
+
+    visit(top)
+    return order[::-1]
+
+
+def group_references(cell) -> dict[str, list]:
+    """References of a cell grouped by referenced cell name.
+
+    References to cells missing from the library are skipped.
+    """
+    groups: dict[str, list] = {}
+    for ref in cell.references:
+        if not isinstance(ref.cell, str):
+            groups.setdefault(ref.cell.name, []).append(ref)
+    return groups
+
+
+def placements(refs: list):
+    """Origins, rotations, magnifications and y-flips of references, with
+    repetitions expanded into one row per instance."""
+    import numpy as np
+
+    origins, rotation, magnification, flip = [], [], [], []
+    for ref in refs:
+        origin = np.asarray(ref.origin)
+        if ref.repetition.size:
+            placed = origin + ref.repetition.get_offsets()
+        else:
+            placed = origin[None, :]
+        n = len(placed)
+        origins.append(placed)
+        rotation.append(np.full(n, ref.rotation))
+        magnification.append(np.full(n, ref.magnification))
+        flip.append(np.full(n, -1.0 if ref.x_reflection else 1.0))
+    return (
+        np.concatenate(origins),
+        np.concatenate(rotation),
+        np.concatenate(magnification),
+        np.concatenate(flip),
+    )
@@ -0,0 +1,131 @@
+"""Cached realization of the precheck nix-shell environment.
+
+Entering nix-shell evaluates precheck/default.nix and sets up the shell
+environment on every run, which takes tens of seconds before precheck even
+starts. Instead, the environment is captured once ('env -0' inside the shell)
+and stored in the user cache, keyed on the hash of default.nix. Later runs
+execute precheck directly with the captured variables.
+
+Only variables that nix-shell changed are stored; PATH is stored as the list
+of entries nix-shell prepended, so the caller's PATH still applies after them.
+The store paths on PATH are registered as indirect GC roots, and a captured
+environment whose store paths have disappeared anyway is captured again.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from tinytapeout.cli.cache import ArtifactCache, cache_key
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.cli.runner import run_command
+
+NIX_ENV_CACHE_BYTES = 16 << 20
+# Variables describing the capturing shell session rather than the environment
+_SESSION_VARS = {
+    "_",
+    "OLDPWD",
+    "PWD",
+    "SHLVL",
+    "NIX_BUILD_TOP",
+    "TMPDIR",
+    "TMP",
+    "TEMP",
+    "TEMPDIR",
+}
+
+
+@dataclass
+class NixShellEnv:
+    variables: dict[str, str]
+    path: list[str]  # entries prepended to PATH
+
+    def apply(self, env: dict[str, str]) -> dict[str, str]:
+        """Return env with the shell environment applied on top."""
+        merged = {**env, **self.variables}
+        merged["PATH"] = os.pathsep.join([*self.path, env.get("PATH", "")])
+        return merged
+
+    def store_paths(self) -> list[str]:
+        roots = set()
+        for entry in self.path:
+            if entry.startswith("/nix/store/"):
+                roots.add("/".join(entry.split("/")[:4]))
+        return sorted(roots)
+
+    def is_valid(self) -> bool:
+        return all(os.path.exists(p) for p in self.store_paths())
+
+
+def nix_env_key(nix_file: Path) -> str:
+    return cache_key("nix-env", hash_file(nix_file))
+
+
+def capture_nix_env(nix_file: Path) -> NixShellEnv | None:
+    """Enter nix-shell once and record the environment it sets up."""
+    base = os.environ.copy()
+    result = run_command(
+        ["nix-shell", str(nix_file), "--run", "env -0"],
+        cwd=str(nix_file.parent),
+        env=base,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+
+    variables = {}
+    for item in result.stdout.split(b"\0"):
+        name, sep, value = item.decode(errors="surrogateescape").partition("=")
+        if sep and name not in _SESSION_VARS and base.get(name) != value:
+            variables[name] = value
+
+    path = variables.pop("PATH", "").split(os.pathsep) if "PATH" in variables else []
+    inherited = base.get("PATH", "").split(os.pathsep)
+    if inherited and path[-len(inherited) :] == inherited:
+        path = path[: -len(inherited)]
+    return NixShellEnv(variables=variables, path=[p for p in path if p])
+
+
+def load_nix_env(
+    nix_file: Path, cache: ArtifactCache | None = None
+) -> NixShellEnv | None:
+    """The shell environment of nix_file, captured on first use.
+
+    Returns None if nix-shell fails; the caller then runs through nix-shell.
+    """
+    cache = cache or ArtifactCache("nix-env", NIX_ENV_CACHE_BYTES)
+    key = nix_env_key(nix_file)
+    path = cache.get(key, ".json")
+    if path is not None:
+        try:
+            data = json.loads(path.read_text())
+            shell_env = NixShellEnv(variables=data["variables"], path=data["path"])
+        except (OSError, ValueError, KeyError):
+            shell_env = None
+        if shell_env is not None and shell_env.is_valid():
+            return shell_env
+
+    shell_env = capture_nix_env(nix_file)
+    if shell_env is None:
+        return None
+    data = {"variables": shell_env.variables, "path": shell_env.path}
+    cache.put_bytes(key, json.dumps(data).encode(), ".json")
+    _add_gc_roots(shell_env, cache.dir.parent / "nix-gcroots" / key)
+    return shell_env
+
+
+def _add_gc_roots(shell_env: NixShellEnv, root: Path) -> None:
+    """Keep the environment's store paths alive across nix garbage collection."""
+    store_paths = shell_env.store_paths()
+    if not store_paths:
+        return
+    root.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        run_command(
+            ["nix-store", "--realise", "--add-root", str(root), "--indirect"]
+            + store_paths,
+            capture_output=True,
+        )
+    except OSError:
+        pass  # roots are an optimization; is_valid() catches collected paths
@@ -0,0 +1,85 @@
+"""Run build steps as a small dependency graph.
+
+Steps whose dependencies have finished run concurrently on a thread pool (each
+step mostly waits on a subprocess). Output is buffered per step and reported in
+declaration order, so the console log is the same regardless of which step
+finishes first. Each step runs inside trace_step(), so 'tt --trace' attributes
+its commands to it.
+"""
+
+import contextvars
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from tinytapeout.cli.tracing import trace_step
+
+
+@dataclass
+class StepResult:
+    returncode: int
+    output: str = ""
+    skipped: bool = False
+
+
+@dataclass
+class Step:
+    name: str
+    run: Callable[[], StepResult]
+    deps: tuple[str, ...] = ()
+
+
+def run_pipeline(
+    steps: list[Step],
+    report: Callable[[Step, StepResult], None],
+    max_workers: int | None = None,
+) -> dict[str, StepResult]:
+    """Run steps, calling report(step, result) for each in declaration order.
+
+    A step runs once all of its deps have succeeded; if any dep fails, the step
+    is skipped. Deps must name steps declared earlier in the list.
+    """
+    seen: set[str] = set()
+    for step in steps:
+        for dep in step.deps:
+            if dep not in seen:
+                raise ValueError(f"Step {step.name!r} depends on unknown step {dep!r}")
+        seen.add(step.name)
+
+    results: dict[str, StepResult] = {}
+    pending = list(steps)
+    running: dict[Future, Step] = {}
+    reported = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for step in list(pending):
+                if any(dep not in results for dep in step.deps):
+                    continue
+                pending.remove(step)
+                if any(results[dep].returncode != 0 for dep in step.deps):
+                    results[step.name] = StepResult(returncode=1, skipped=True)
+                else:
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, _run_step, step)] = step
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        results[step.name] = future.result()
+                    except Exception as e:
+                        results[step.name] = StepResult(returncode=1, output=f"{e}\n")
+
+            while reported < len(steps) and steps[reported].name in results:
+                step = steps[reported]
+                report(step, results[step.name])
+                reported += 1
+
+    return results
+
+
+def _run_step(step: Step) -> StepResult:
+    with trace_step(step.name):
+        return step.run()
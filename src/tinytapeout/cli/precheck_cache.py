@@ -0,0 +1,152 @@
+"""Cache of precheck results, keyed by everything a precheck run depends on.
+
+The key combines the GDS content hash, the tech, the tt-support-tools revision,
+the contents of precheck/tool-versions.json, any extra precheck arguments and
+the environment the checks run in (runner, serial or parallel driver, PDK,
+container image and the installed tools). An entry is a tarball of the
+precheck reports directory plus the log of the run and its exit status, so a
+cache hit replays the original report.
+
+Only conclusive runs are cached: passes, and failures whose report lists a
+failed check. Any other failure (a missing tool, a broken PDK or container, a
+killed klayout) says more about the environment than about the GDS, and is run
+again next time.
+"""
+
+import io
+import json
+import os
+import shutil
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from tinytapeout.cli.cache import ArtifactCache, cache_key
+from tinytapeout.cli.docker_runner import precheck_image
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.cli.precheck_output import parse_results_markdown
+from tinytapeout.cli.runner import run_command
+
+PRECHECK_CACHE_BYTES = 1 << 30
+LOG_NAME = "precheck.log"
+_STATUS_NAME = "status.json"
+
+
+@dataclass
+class CachedPrecheck:
+    returncode: int
+    log_path: Path
+
+
+def tt_tools_revision(tt_dir: Path) -> str | None:
+    result = run_command(
+        ["git", "-C", str(tt_dir), "rev-parse", "HEAD"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def driver_enabled() -> bool:
+    """Whether checks may run through precheck_driver.py (see DRIVER_ENV)."""
+    from tinytapeout.cli import precheck_driver
+
+    return os.environ.get(precheck_driver.DRIVER_ENV) != "0"
+
+
+def precheck_environment(runner: str, driver: bool) -> dict:
+    """Identity of the environment a precheck run would use.
+
+    runner is the requested runner (auto resolves by what is installed, so
+    the tools it could pick are part of the identity), driver whether the
+    checks run through precheck_driver.py.
+    """
+    tools = {}
+    for tool in ("klayout", "magic", "nix-shell", "docker"):
+        path = shutil.which(tool)
+        try:
+            tools[tool] = [path, os.stat(path).st_mtime_ns] if path else None
+        except OSError:
+            tools[tool] = [path, None]
+    return {
+        "runner": runner,
+        "driver": driver,
+        "pdk_root": os.environ.get("PDK_ROOT"),
+        "image": precheck_image(),
+        "tools": tools,
+    }
+
+
+def precheck_key(
+    gds_path: str | Path,
+    tech: str,
+    tt_dir: Path,
+    args: tuple[str, ...] = (),
+    environment: dict | None = None,
+) -> str | None:
+    """Cache key for a precheck run, or None if it cannot be keyed reliably."""
+    revision = tt_tools_revision(tt_dir)
+    if revision is None:
+        return None
+    versions_file = tt_dir / "precheck" / "tool-versions.json"
+    versions = versions_file.read_text() if versions_file.exists() else None
+    return cache_key(
+        "precheck",
+        hash_file(gds_path),
+        tech,
+        revision,
+        versions,
+        list(args),
+        environment,
+    )
+
+
+def is_conclusive(returncode: int, reports_dir: Path) -> bool:
+    """Whether a finished run's result belongs to the GDS (and can be cached):
+    it passed, or its report lists a failed check."""
+    if returncode == 0:
+        return True
+    if returncode < 0:
+        return False
+    results = parse_results_markdown(reports_dir / "results.md")
+    return any(not result.passed for result in results)
+
+
+class PrecheckCache:
+    def __init__(self, cache: ArtifactCache | None = None):
+        self.cache = cache or ArtifactCache("precheck", PRECHECK_CACHE_BYTES)
+
+    def load(self, key: str, reports_dir: Path) -> CachedPrecheck | None:
+        """Restore a cached run into reports_dir."""
+        path = self.cache.get(key, ".tar.gz")
+        if path is None:
+            return None
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(path, "r:gz") as tar:
+            status = json.load(tar.extractfile(_STATUS_NAME))
+            for member in tar.getmembers():
+                name = Path(member.name)
+                if member.name == _STATUS_NAME or not member.isfile():
+                    continue
+                if name.is_absolute() or ".." in name.parts:
+                    continue
+                dest = reports_dir / name
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(tar.extractfile(member).read())
+        return CachedPrecheck(status["returncode"], reports_dir / LOG_NAME)
+
+    def store(
+        self, key: str, returncode: int, reports_dir: Path, log_path: Path
+    ) -> None:
+        """Cache the reports and log of a finished run."""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            status = json.dumps({"returncode": returncode}).encode()
+            info = tarfile.TarInfo(_STATUS_NAME)
+            info.size = len(status)
+            tar.addfile(info, io.BytesIO(status))
+            tar.add(log_path, LOG_NAME)
+            for path in sorted(reports_dir.rglob("*")):
+                if path.is_file() and path.name != LOG_NAME:
+                    tar.add(path, path.relative_to(reports_dir).as_posix())
+        self.cache.put_bytes(key, buffer.getvalue(), ".tar.gz")
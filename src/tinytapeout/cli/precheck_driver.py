@@ -0,0 +1,323 @@
+"""Run the checks of tt-support-tools' precheck.py in parallel.
+
+This script is executed with the tt-support-tools Python (inside the precheck
+environment, e.g. nix-shell), so it must only use the standard library.
+
+precheck.py builds a list of checks in main() and runs them one after another:
+
+    checks = [["Magic DRC", lambda: magic_drc(...)], ...]
+    for name, check in checks:
+        check(...)
+
+Instead of copying that list, the driver reads precheck.py's AST: it runs the
+statements of main() that come before the list (argument parsing, preparing
+the GDS, ...), evaluates each check entry in that scope, and runs the checks on
+a pool of forked worker processes. KLayout invocations get '-rd thr=N' so the
+tiled DRC decks use the cores of the --threads budget (not of the machine,
+which may be shared with other layouts) left over per worker. Results are
+merged into the same reports/results.md and reports/results.xml that
+precheck.py writes.
+
+If precheck.py does not have the expected shape, the driver exits with
+EXIT_UNSUPPORTED before running anything, and the caller falls back to running
+precheck.py directly. Setting DRIVER_ENV to 0 makes the caller skip the driver
+altogether.
+"""
+
+import argparse
+import ast
+import importlib.util
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+EXIT_UNSUPPORTED = 3
+
+# Set to 0 to always run precheck.py serially
+DRIVER_ENV = "TT_PRECHECK_DRIVER"
+
+# Filled in before the worker pool forks
+_CHECKS: list = []
+_CALL = None
+_THREADS = 1
+_REPORTS: Path = Path("reports")
+
+
+class Unsupported(Exception):
+    pass
+
+
+def find_checks(tree: ast.Module):
+    """Locate main(), the checks list and the loop that runs the checks.
+
+    Returns (main, index of the checks assignment in main's body, list of
+    (name, entry expression), call node inside the loop).
+    """
+    main = next(
+        (n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "main"),
+        None,
+    )
+    if main is None:
+        raise Unsupported("no main() function")
+
+    index = next(
+        (
+            i
+            for i, stmt in enumerate(main.body)
+            if isinstance(stmt, ast.Assign)
+            and len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Name)
+            and stmt.targets[0].id == "checks"
+            and isinstance(stmt.value, ast.List)
+        ),
+        None,
+    )
+    if index is None:
+        raise Unsupported("no 'checks = [...]' list in main()")
+    stmt = main.body[index]
+
+    entries = []
+    for element in stmt.value.elts:
+        if not (
+            isinstance(element, ast.List | ast.Tuple)
+            and len(element.elts) == 2
+            and isinstance(element.elts[0], ast.Constant)
+            and isinstance(element.elts[0].value, str)
+        ):
+            raise Unsupported("unexpected entry in checks list")
+        entries.append((element.elts[0].value, element.elts[1]))
+
+    call = _find_check_call(main.body[index + 1 :])
+    return main, index, entries, call
+
+
+def _find_check_call(body: list[ast.stmt]) -> ast.Call:
+    for stmt in body:
+        if not (isinstance(stmt, ast.For) and isinstance(stmt.iter, ast.Name)):
+            continue
+        if stmt.iter.id != "checks":
+            continue
+        target = stmt.target
+        if not (isinstance(target, ast.Tuple | ast.List) and len(target.elts) == 2):
+            raise Unsupported("unexpected loop over checks")
+        check_var = target.elts[1]
+        if not isinstance(check_var, ast.Name):
+            raise Unsupported("unexpected loop over checks")
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id == check_var.id
+            ):
+                return node
+        raise Unsupported("checks are not called in the loop")
+    raise Unsupported("no loop over checks")
+
+
+def prepare(precheck_script: Path, argv: list[str]):
+    """Run main()'s setup in precheck's module scope.
+
+    Returns (namespace, list of (name, check callable), call node).
+    """
+    source = precheck_script.read_text()
+    tree = ast.parse(source, str(precheck_script))
+    main, index, entries, call = find_checks(tree)
+
+    spec = importlib.util.spec_from_file_location("precheck", precheck_script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["precheck"] = module
+    sys.argv = [str(precheck_script), *argv]
+    spec.loader.exec_module(module)
+
+    # Wrap the setup statements in a function so that early returns and
+    # main()'s local variables behave as they do in main() itself
+    setup = ast.FunctionDef(
+        name="__tt_setup__",
+        args=main.args,
+        body=[
+            *main.body[:index],
+            ast.Return(ast.Call(ast.Name("locals", ast.Load()), args=[], keywords=[])),
+        ],
+        decorator_list=[],
+        returns=None,
+        type_params=[],
+    )
+    wrapper = ast.fix_missing_locations(ast.Module(body=[setup], type_ignores=[]))
+    exec(compile(wrapper, str(precheck_script), "exec"), vars(module))
+    scope = vars(module)["__tt_setup__"]()
+    if not isinstance(scope, dict):
+        raise Unsupported("main() returned before building the checks")
+
+    namespace = {**vars(module), **scope}
+    checks = []
+    for name, expr in entries:
+        code = compile(ast.Expression(expr), str(precheck_script), "eval")
+        checks.append((name, eval(code, namespace)))
+    return namespace, checks, call
+
+
+def _with_threads(cmd):
+    """Add '-rd thr=N' to KLayout batch commands that do not set it."""
+    if isinstance(cmd, list | tuple) and cmd:
+        program = os.path.basename(str(cmd[0]))
+        args = [str(a) for a in cmd]
+        if program.startswith("klayout") and not any(
+            a.startswith("thr=") for a in args
+        ):
+            return [*cmd[:1], "-rd", f"thr={_THREADS}", *cmd[1:]]
+    return cmd
+
+
+def _patch_subprocess():
+    original_run, original_popen = subprocess.run, subprocess.Popen
+
+    def run(cmd, *args, **kwargs):
+        return original_run(_with_threads(cmd), *args, **kwargs)
+
+    class Popen(original_popen):
+        def __init__(self, cmd, *args, **kwargs):
+            super().__init__(_with_threads(cmd), *args, **kwargs)
+
+    subprocess.run, subprocess.Popen = run, Popen
+
+
+def _slug(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name.lower()).strip("_")
+
+
+def _run_check(index: int):
+    """Worker: run one check with its output redirected to a log file."""
+    name, check = _CHECKS[index]
+    log_path = _REPORTS / f"check_{_slug(name)}.log"
+    with open(log_path, "w") as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        sys.stdout = os.fdopen(1, "w", buffering=1, closefd=False)
+        sys.stderr = os.fdopen(2, "w", buffering=1, closefd=False)
+    _patch_subprocess()
+
+    start = time.time()
+    error = None
+    try:
+        namespace, call = _CALL
+        args = [
+            eval(compile(ast.Expression(a), "<check>", "eval"), namespace)
+            for a in call.args
+        ]
+        kwargs = {
+            kw.arg: eval(
+                compile(ast.Expression(kw.value), "<check>", "eval"), namespace
+            )
+            for kw in call.keywords
+        }
+        check(*args, **kwargs)
+    except KeyboardInterrupt:
+        raise
+    except SystemExit as e:
+        # precheck helpers may sys.exit() on failure; that fails this check
+        # rather than the worker (and with it the whole report)
+        if e.code not in (0, None):
+            traceback.print_exc()
+            error = f"exited with status {e.code}"
+    except Exception as e:
+        traceback.print_exc()
+        error = str(e) or type(e).__name__
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return name, error, time.time() - start, str(log_path)
+
+
+def write_reports(reports: Path, results: list[tuple[str, str | None, float]]):
+    """Write results.md and results.xml in precheck.py's format."""
+    testsuite = ET.Element("testsuite", name="Tiny Tapeout Prechecks")
+    markdown = "# Tiny Tapeout Precheck Results\n\n| Check | Result |\n|-----------|--------|\n"
+    for name, error, elapsed in results:
+        case = ET.SubElement(testsuite, "testcase", name=name)
+        case.set("time", str(round(elapsed, 2)))
+        if error is None:
+            markdown += f"| {name} | ✅ |\n"
+        else:
+            markdown += f"| {name} | ❌ Fail: {error} |\n"
+            ET.SubElement(case, "error", message=error)
+    errors = sum(1 for _, error, _ in results if error is not None)
+    testsuite.set("tests", str(len(results)))
+    testsuite.set("errors", str(errors))
+    ET.ElementTree(testsuite).write(reports / "results.xml", encoding="unicode")
+    (reports / "results.md").write_text(markdown)
+
+
+def main() -> int:
+    global _CHECKS, _CALL, _THREADS, _REPORTS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--precheck", required=True, type=Path)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Cores for this precheck run, shared by the checks (default: --jobs)",
+    )
+    parser.add_argument("precheck_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    precheck_args = args.precheck_args
+    if precheck_args[:1] == ["--"]:
+        precheck_args = precheck_args[1:]
+
+    try:
+        namespace, checks, call = prepare(args.precheck.absolute(), precheck_args)
+    except Unsupported as e:
+        print(f"Parallel precheck unavailable: {e}", flush=True)
+        return EXIT_UNSUPPORTED
+
+    jobs = max(1, min(args.jobs, len(checks)))
+    _CHECKS = checks
+    _CALL = (namespace, call)
+    _THREADS = max(1, (args.threads or args.jobs) // jobs)
+    _REPORTS = Path(namespace.get("REPORTS_PATH", "reports"))
+    _REPORTS.mkdir(parents=True, exist_ok=True)
+    print(f"Running {len(checks)} checks with {jobs} jobs", flush=True)
+
+    results: dict[str, tuple[str | None, float]] = {}
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        futures = [pool.submit(_run_check, i) for i in range(len(checks))]
+        # The pool starts queued checks in order as workers become free; only
+        # this process writes to stdout, so markers never interleave with logs
+        started = min(jobs, len(checks))
+        for name, _ in checks[:started]:
+            print(f"=== START {name}", flush=True)
+        for future in as_completed(futures):
+            name, error, elapsed, log_path = future.result()
+            results[name] = (error, elapsed)
+            if error is None:
+                print(f"=== PASS {name} ({elapsed:.1f}s)", flush=True)
+            else:
+                reason = error.splitlines()[0] if error.strip() else error
+                print(f"=== FAIL {name} ({elapsed:.1f}s): {reason}", flush=True)
+            with open(log_path) as log:
+                for line in log:
+                    sys.stdout.write(line)
+            sys.stdout.flush()
+            if started < len(checks):
+                print(f"=== START {checks[started][0]}", flush=True)
+                started += 1
+
+    ordered = [(name, *results[name]) for name, _ in checks]
+    write_reports(_REPORTS, ordered)
+    failed = [name for name, error, _ in ordered if error is not None]
+    if failed:
+        print(f"Precheck failed: {len(failed)} of {len(ordered)} checks", flush=True)
+        return 1
+    print(f"Precheck passed: {len(ordered)} checks", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
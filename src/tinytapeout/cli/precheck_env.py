@@ -7,7 +7,15 @@ from pathlib import Path
 
 from packaging.version import Version
 
-from tinytapeout.cli.environment import check_klayout, check_magic, check_nix
+from tinytapeout.cli.docker_runner import exec_command
+from tinytapeout.cli.environment import (
+    ToolInfo,
+    check_docker,
+    check_klayout,
+    check_magic,
+    check_nix,
+)
+from tinytapeout.cli.nix_env import NixShellEnv
 
 RUNNER_NATIVE = "native"
 RUNNER_NIX = "nix"
@@ -24,6 +32,10 @@ class ToolVersions:
 class PrecheckEnv:
     runner: str  # RUNNER_NATIVE | RUNNER_NIX | RUNNER_DOCKER
     nix_file: Path | None = None
+    shell_env: NixShellEnv | None = None  # cached nix-shell environment
+    container: str | None = None  # running precheck container (docker)
+    workdir: Path | None = None  # working directory inside the container
+    staged_tt: Path | None = None  # copy of tt-support-tools the container sees
 
 
 def load_tool_versions(tt_dir: Path) -> ToolVersions:
@@ -48,10 +60,14 @@ def _version_ok(actual: str | None, minimum: str) -> bool:
         return False
 
 
+def _docker_running(docker: ToolInfo) -> bool:
+    return docker.available and "(running)" in (docker.version or "")
+
+
 def detect_precheck_env(tt_dir: Path, requested: str = "auto") -> PrecheckEnv:
     """Detect or validate execution environment for precheck.
 
-    Auto cascade: nix → native (with version check) → error.
+    Auto cascade: nix → native (with version check) → docker → error.
     """
     from tinytapeout.cli.console import console
 
@@ -75,9 +91,13 @@ def detect_precheck_env(tt_dir: Path, requested: str = "auto") -> PrecheckEnv:
         ):
             return PrecheckEnv(runner=RUNNER_NATIVE)
 
-        # 3. Error
+        # 3. Docker
+        if _docker_running(check_docker()):
+            return PrecheckEnv(runner=RUNNER_DOCKER)
+
+        # 4. Error
         console.print(
-            f"[red]Cannot run precheck: install Nix (recommended), "
+            f"[red]Cannot run precheck: install Nix (recommended), Docker, "
             f"or install klayout >= {versions.klayout} and magic >= {versions.magic} natively.[/red]"
         )
         raise SystemExit(2)
@@ -113,6 +133,16 @@ def detect_precheck_env(tt_dir: Path, requested: str = "auto") -> PrecheckEnv:
             raise SystemExit(2)
         return PrecheckEnv(runner=RUNNER_NATIVE)
 
+    elif requested == RUNNER_DOCKER:
+        docker = check_docker()
+        if not docker.available:
+            console.print("[red]docker not found on PATH.[/red]")
+            raise SystemExit(2)
+        if not _docker_running(docker):
+            console.print("[red]The Docker daemon is not running.[/red]")
+            raise SystemExit(2)
+        return PrecheckEnv(runner=RUNNER_DOCKER)
+
     else:
         console.print(f"[red]Unknown runner: {requested}[/red]")
         raise SystemExit(2)
@@ -120,6 +150,15 @@ def detect_precheck_env(tt_dir: Path, requested: str = "auto") -> PrecheckEnv:
 
 def wrap_command(env: PrecheckEnv, cmd: list[str]) -> list[str]:
     """Wrap a command for the resolved environment."""
-    if env.runner == RUNNER_NIX:
+    if env.runner == RUNNER_NIX and env.shell_env is None:
         return ["nix-shell", str(env.nix_file), "--run", shlex.join(cmd)]
+    if env.runner == RUNNER_DOCKER and env.container is not None:
+        return exec_command(env.container, env.workdir, cmd)
     return cmd
+
+
+def command_env(env: PrecheckEnv, base: dict[str, str]) -> dict[str, str]:
+    """Environment variables for a command run in the resolved environment."""
+    if env.shell_env is not None:
+        return env.shell_env.apply(base)
+    return base
@@ -0,0 +1,172 @@
+"""Structured view of precheck output, built line by line as precheck runs.
+
+The parallel precheck driver (precheck_driver.py) marks the start and result
+of every check in its output:
+
+    === START Magic DRC
+    === PASS Magic DRC (12.3s)
+    === FAIL KLayout FEOL (4.5s): 3 DRC violations
+
+PrecheckParser turns these lines into events; PrecheckReport forwards them as
+they arrive, as NDJSON on stdout and/or as rows of a markdown table in the
+GitHub Actions step summary. Log lines are only echoed (or dropped), never
+accumulated. A serial precheck.py run has no markers; its results are read
+from reports/results.md once it finishes.
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import click
+
+from tinytapeout.cli.console import write_step_summary
+
+_START_RE = re.compile(r"^=== START (?P<check>.+)$")
+_RESULT_RE = re.compile(
+    r"^=== (?P<status>PASS|FAIL) (?P<check>.+) \((?P<duration>\d+(?:\.\d+)?)s\)"
+    r"(?:: (?P<error>.*))?$"
+)
+_TABLE_ROW_RE = re.compile(r"^\|\s*(?P<check>[^|]+?)\s*\|\s*(?P<result>[^|]*?)\s*\|$")
+
+
+@dataclass
+class CheckResult:
+    check: str
+    passed: bool
+    duration: float | None = None
+    error: str | None = None
+
+    def to_event(self) -> dict:
+        return {
+            "event": "result",
+            "check": self.check,
+            "status": "pass" if self.passed else "fail",
+            "duration": self.duration,
+            "error": self.error,
+        }
+
+
+@dataclass
+class PrecheckParser:
+    results: list[CheckResult] = field(default_factory=list)
+
+    def feed(self, line: str) -> dict | None:
+        """Parse one line of output. Returns an event, or None for log lines."""
+        line = line.rstrip("\n")
+        if match := _START_RE.match(line):
+            return {"event": "start", "check": match["check"]}
+        if match := _RESULT_RE.match(line):
+            result = CheckResult(
+                check=match["check"],
+                passed=match["status"] == "PASS",
+                duration=float(match["duration"]),
+                error=match["error"],
+            )
+            self.results.append(result)
+            return result.to_event()
+        return None
+
+
+def parse_results_markdown(path: Path) -> list[CheckResult]:
+    """Check results from the results.md table that precheck.py writes."""
+    results = []
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return results
+    for line in lines:
+        match = _TABLE_ROW_RE.match(line.strip())
+        if not match or match["check"] in ("Check", "") or set(match["check"]) <= {"-"}:
+            continue
+        outcome = match["result"]
+        passed = outcome.startswith("✅")
+        error = None if passed else outcome.removeprefix("❌").strip()
+        error = (error or "").removeprefix("Fail:").strip() or None
+        results.append(CheckResult(check=match["check"], passed=passed, error=error))
+    return results
+
+
+class PrecheckReport:
+    """Forward precheck output as it is produced.
+
+    json_output: write one JSON event per line to stdout.
+    step_summary: append a markdown row per finished check to the step summary.
+    echo: pass log lines through to stdout (ignored with json_output).
+    layouts: names of the GDS files when several are checked concurrently;
+    events then carry a "gds" field and the table a Layout column.
+    """
+
+    def __init__(
+        self,
+        *,
+        json_output: bool,
+        step_summary: bool,
+        echo: bool,
+        layouts: list[str] | None = None,
+    ):
+        self.json_output = json_output
+        self.step_summary = step_summary
+        self.echo = echo and not json_output
+        self.layouts = layouts
+        self.parsers = {layout: PrecheckParser() for layout in layouts or [None]}
+        self._lock = threading.Lock()
+        if step_summary:
+            columns = ["Layout"] if layouts else []
+            columns += ["Check", "Result", "Time"]
+            write_step_summary(
+                "## Precheck Results\n\n"
+                f"| {' | '.join(columns)} |\n|{'---|' * len(columns)}"
+            )
+
+    def line(self, line: str, layout: str | None = None) -> None:
+        event = self.parsers[layout].feed(line)
+        with self._lock:
+            if self.echo:
+                click.echo(line, nl=False)
+            if event is not None:
+                self._emit(event, layout)
+
+    def finish(
+        self, returncode: int, reports_dir: Path, layout: str | None = None
+    ) -> list[CheckResult]:
+        """Report the overall result, using results.md if no markers were seen."""
+        results = self.parsers[layout].results
+        with self._lock:
+            if not results:
+                results = parse_results_markdown(reports_dir / "results.md")
+                for result in results:
+                    self._emit(result.to_event(), layout)
+            failed = sum(1 for r in results if not r.passed)
+            if self.json_output:
+                summary = {
+                    "event": "summary",
+                    "status": "pass" if returncode == 0 else "fail",
+                    "returncode": returncode,
+                    "checks": len(results),
+                    "failed": failed,
+                    "reports": str(reports_dir),
+                }
+                click.echo(json.dumps(self._tag(summary, layout)))
+            if self.step_summary and not self.layouts:
+                status = "passed" if returncode == 0 else "failed"
+                write_step_summary(
+                    f"\nPrecheck {status}: {failed} of {len(results)} checks failed.\n"
+                )
+        return results
+
+    def _tag(self, event: dict, layout: str | None) -> dict:
+        return {"gds": layout, **event} if self.layouts else event
+
+    def _emit(self, event: dict, layout: str | None) -> None:
+        if self.json_output:
+            click.echo(json.dumps(self._tag(event, layout)))
+        if self.step_summary and event["event"] == "result":
+            result = "✅" if event["status"] == "pass" else f"❌ {event['error'] or ''}"
+            duration = event["duration"]
+            time_text = f"{duration:.1f}s" if duration is not None else ""
+            cells = [layout] if self.layouts else []
+            cells += [event["check"], result.strip().replace("|", "\\|"), time_text]
+            write_step_summary(f"| {' | '.join(cells)} |")
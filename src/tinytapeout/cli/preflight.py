@@ -0,0 +1,229 @@
+"""Fast GDS sanity checks run by 'tt gds validate' before the full precheck.
+
+Full precheck takes minutes, but its most common failures are trivial to
+spot: a wrong top cell name, a missing or wrongly sized prBoundary, pins
+without labels or with labels on the wrong layer, and shapes on metal layers
+the project may not use. These are checked here straight from the GDS with
+gdstk, using the layer information in the Tech definitions, in well under a
+second even for large layouts:
+
+- layer usage comes from the library's (layer, datatype) index and is only
+  traced to individual cells when a forbidden layer is present;
+- the boundary and labels are read from the top cell only, and compared with
+  the tile's DIE_AREA with vectorized NumPy bounding-box math.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from tinytapeout.cli.layout import read_library, topological_order
+from tinytapeout.tech import TechName, tech_map
+
+# Tolerance when comparing the boundary with the tile size, in um
+_TOLERANCE = 0.005
+
+
+@dataclass
+class PreflightFinding:
+    check: str
+    message: str
+
+
+def expected_pins(analog_pins: int = 0) -> list[str]:
+    """Names of the top-level pins every Tiny Tapeout project has."""
+    pins = ["clk", "ena", "rst_n"]
+    for bus in ("ui_in", "uo_out", "uio_in", "uio_out", "uio_oe"):
+        pins.extend(f"{bus}[{i}]" for i in range(8))
+    pins.extend(f"ua[{i}]" for i in range(analog_pins))
+    return pins
+
+
+def parse_die_area(die_area: str) -> tuple[float, float, float, float]:
+    """Parse a tile_sizes.yaml DIE_AREA ('x0 y0 x1 y1', in um)."""
+    x0, y0, x1, y1 = (float(v) for v in die_area.split())
+    return x0, y0, x1, y1
+
+
+def forbidden_layers(tech: TechName) -> dict[tuple[int, int], str]:
+    """Drawing layers above the project's top metal layer."""
+    tech_info = tech_map[tech]
+    names = list(tech_info.drawing_layers)
+    if tech_info.project_top_metal_layer not in names:
+        return {}
+    above = names[names.index(tech_info.project_top_metal_layer) + 1 :]
+    return {tech_info.drawing_layers[name]: name for name in above}
+
+
+def preflight_gds(
+    gds_path: str | Path,
+    tech: TechName,
+    *,
+    die_area: tuple[float, float, float, float] | None = None,
+    pins: list[str] | None = None,
+) -> list[PreflightFinding]:
+    """Check a GDS for problems that would fail precheck.
+
+    The top cell must be named after the file. die_area (the tile's
+    DIE_AREA) enables the boundary size check, pins the pin label check; both
+    only apply to the project's own layout, not to other macros.
+    """
+    import numpy as np
+
+    tech_info = tech_map[tech]
+    gds_path = Path(gds_path)
+    library = read_library(gds_path)
+    findings: list[PreflightFinding] = []
+
+    top_cells = library.top_level()
+    by_name = {cell.name: cell for cell in top_cells}
+    top = by_name.get(gds_path.stem)
+    if top is None:
+        names = ", ".join(sorted(by_name)) or "none"
+        findings.append(
+            PreflightFinding(
+                "Top cell", f"expected top cell {gds_path.stem}, found {names}"
+            )
+        )
+        if len(top_cells) != 1:
+            return findings
+        top = top_cells[0]
+    elif len(top_cells) > 1:
+        others = ", ".join(sorted(set(by_name) - {top.name}))
+        findings.append(
+            PreflightFinding("Top cell", f"extra top-level cells: {others}")
+        )
+
+    # Boundary: present on the top cell, matching the tile, enclosing everything
+    layer, datatype = tech_info.prboundary_layer
+    boundary = top.get_polygons(depth=0, layer=layer, datatype=datatype)
+    boundary_box = None
+    if not boundary:
+        findings.append(
+            PreflightFinding(
+                "Boundary", f"no shape on the prBoundary layer {layer}/{datatype}"
+            )
+        )
+    else:
+        points = np.concatenate([polygon.points for polygon in boundary])
+        boundary_box = np.concatenate([points.min(axis=0), points.max(axis=0)])
+        if die_area is not None and not np.allclose(
+            boundary_box, die_area, atol=_TOLERANCE
+        ):
+            findings.append(
+                PreflightFinding(
+                    "Boundary",
+                    f"prBoundary is {_format_box(boundary_box)}, "
+                    f"the tile's DIE_AREA is {_format_box(die_area)}",
+                )
+            )
+        extent = top.bounding_box()
+        if extent is not None:
+            extent = np.array([*extent[0], *extent[1]])
+            outside = np.concatenate(
+                [boundary_box[:2] - extent[:2], extent[2:] - boundary_box[2:]]
+            )
+            if (outside > _TOLERANCE).any():
+                findings.append(
+                    PreflightFinding(
+                        "Boundary",
+                        f"layout extends to {_format_box(extent)}, "
+                        f"beyond the prBoundary {_format_box(boundary_box)}",
+                    )
+                )
+
+    # Layers above the project's top metal
+    forbidden = forbidden_layers(tech)
+    present = forbidden.keys() & library.layers_and_datatypes()
+    if present:
+        cells = topological_order(top)
+        for spec in sorted(present):
+            users = [
+                cell.name
+                for cell in cells
+                if cell.get_polygons(depth=0, layer=spec[0], datatype=spec[1])
+            ]
+            if users:
+                shown = ", ".join(users[:3]) + (" ..." if len(users) > 3 else "")
+                findings.append(
+                    PreflightFinding(
+                        "Layers",
+                        f"shapes on {forbidden[spec]} ({spec[0]}/{spec[1]}), above "
+                        f"{tech_info.project_top_metal_layer}, in {shown}",
+                    )
+                )
+
+    if pins is not None and tech_info.label_layers:
+        findings.extend(_check_labels(top, tech, pins, boundary_box))
+    return findings
+
+
+def _check_labels(top, tech: TechName, pins: list[str], boundary_box):
+    import numpy as np
+
+    tech_info = tech_map[tech]
+    label_layers = set(tech_info.label_layers)
+    buried_layers = set(tech_info.buried_layers)
+    labels = top.get_labels(depth=0)
+    findings = []
+
+    buried = sorted(
+        {
+            f"{label.text} ({label.layer}/{label.texttype})"
+            for label in labels
+            if (label.layer, label.texttype) in buried_layers
+        }
+    )
+    if buried:
+        findings.append(
+            PreflightFinding("Pin labels", f"labels on buried layers: {_list(buried)}")
+        )
+
+    pin_labels = [
+        label for label in labels if (label.layer, label.texttype) in label_layers
+    ]
+    unlabelled = set(pins) - {label.text for label in pin_labels}
+    misplaced = sorted(
+        {
+            f"{label.text} ({label.layer}/{label.texttype})"
+            for label in labels
+            if label.text in unlabelled
+        }
+    )
+    if misplaced:
+        findings.append(
+            PreflightFinding(
+                "Pin labels", f"pin labels on the wrong layer: {_list(misplaced)}"
+            )
+        )
+    missing = sorted(unlabelled - {label.text for label in labels})
+    if missing:
+        findings.append(
+            PreflightFinding("Pin labels", f"pins without a label: {_list(missing)}")
+        )
+
+    if boundary_box is not None and pin_labels:
+        origins = np.array([label.origin for label in pin_labels])
+        inside = (
+            (origins >= boundary_box[:2] - _TOLERANCE)
+            & (origins <= boundary_box[2:] + _TOLERANCE)
+        ).all(axis=1)
+        outside = sorted({pin_labels[i].text for i in np.flatnonzero(~inside)})
+        if outside:
+            findings.append(
+                PreflightFinding(
+                    "Pin labels", f"labels outside the prBoundary: {_list(outside)}"
+                )
+            )
+    return findings
+
+
+def _list(items: list[str], limit: int = 8) -> str:
+    shown = ", ".join(items[:limit])
+    if len(items) > limit:
+        shown += f" and {len(items) - limit} more"
+    return shown
+
+
+def _format_box(box) -> str:
+    x0, y0, x1, y1 = (float(v) for v in box)
+    return f"({x0:g}, {y0:g})-({x1:g}, {y1:g})"
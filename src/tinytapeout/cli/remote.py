@@ -0,0 +1,199 @@
+"""Remote build client — 'tt gds build --remote <url>'.
+
+Protocol (JSON over HTTP, served by 'tt worker serve'):
+
+  GET  /v1/info                  worker version
+  POST /v1/blobs/missing         {"hashes": [...]} -> {"missing": [...]}
+  PUT  /v1/blobs/<hash>          upload file content
+  GET  /v1/blobs/<hash>          download file content
+  POST /v1/jobs                  submit a build -> {"id": ...}
+  GET  /v1/jobs/<id>             job status and artifact manifest
+  GET  /v1/jobs/<id>/log         build log, streamed until the job finishes
+
+Every request carries "Authorization: Bearer <token>" when the client has a
+token (--remote-token or TT_WORKER_TOKEN); a worker with a token rejects
+requests without it.
+
+Files are addressed by content hash, so inputs the worker already has are not
+re-sent and artifacts that are unchanged locally are not downloaded again.
+"""
+
+import os
+import socket
+import sys
+from pathlib import Path, PurePosixPath
+
+from tinytapeout.cli.context import ProjectContext
+from tinytapeout.cli.hashing import hash_bytes, hash_file, is_digest, new_hash
+
+PROTOCOL_VERSION = 1
+
+# Inputs sent to the worker, relative to the project directory
+INPUT_PATHS = ["info.yaml", "src"]
+
+# Outputs fetched back from the worker, relative to the project directory
+ARTIFACT_PATHS = ["runs/wokwi/final", "runs/wokwi/pdk.json", "tt_submission"]
+
+
+class RemoteBuildError(Exception):
+    pass
+
+
+def collect_files(root: Path, paths: list[str]) -> dict[str, Path]:
+    """Map project-relative POSIX paths to files for each file or directory in paths."""
+    files: dict[str, Path] = {}
+    for rel in paths:
+        path = root / rel
+        if path.is_file():
+            files[rel] = path
+        elif path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file():
+                    files[child.relative_to(root).as_posix()] = child
+    return files
+
+
+def is_allowed_path(rel: str, roots: list[str]) -> bool:
+    """Whether a project-relative path sent over the wire stays inside one of
+    roots (no absolute paths, no '..')."""
+    path = PurePosixPath(rel)
+    if not rel or path.is_absolute() or ".." in path.parts:
+        return False
+    return any(rel == root or rel.startswith(root + "/") for root in roots)
+
+
+def project_key(project_dir: Path) -> str:
+    """Stable worker-side workspace name for this checkout of the project."""
+    origin = f"{socket.gethostname()}:{project_dir}"
+    return f"{project_dir.name}-{hash_bytes(origin.encode())[:12]}"
+
+
+def run_remote_build(
+    ctx: ProjectContext,
+    url: str,
+    *,
+    no_docker: bool = False,
+    token: str | None = None,
+):
+    """Build the project on a remote worker and fetch the final artifacts."""
+    import requests
+
+    from tinytapeout.cli.console import console
+    from tinytapeout.cli.harden import git_commit_hash, git_remote_url
+
+    base = url.rstrip("/") + "/v1"
+    session = requests.Session()
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+
+    try:
+        info = session.get(f"{base}/info", timeout=10)
+        if info.status_code == 401:
+            raise RemoteBuildError(
+                f"Worker at {url} requires a valid token "
+                "(--remote-token or TT_WORKER_TOKEN)."
+            )
+        info.raise_for_status()
+        if info.json().get("protocol") != PROTOCOL_VERSION:
+            raise RemoteBuildError(f"Worker at {url} speaks an unsupported protocol.")
+
+        inputs = collect_files(ctx.project_dir, INPUT_PATHS)
+        hashes = {rel: hash_file(path) for rel, path in inputs.items()}
+
+        resp = session.post(
+            f"{base}/blobs/missing",
+            json={"hashes": sorted(set(hashes.values()))},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        missing = set(resp.json()["missing"])
+        console.print(
+            f"Uploading {len(missing)} of {len(inputs)} input files to {url} ..."
+        )
+        for rel, digest in hashes.items():
+            if digest not in missing:
+                continue
+            with open(inputs[rel], "rb") as f:
+                session.put(f"{base}/blobs/{digest}", data=f).raise_for_status()
+            missing.discard(digest)
+
+        resp = session.post(
+            f"{base}/jobs",
+            json={
+                "project": project_key(ctx.project_dir),
+                "files": hashes,
+                "no_docker": no_docker,
+                "git": {
+                    "remote": git_remote_url(ctx.project_dir),
+                    "commit": git_commit_hash(ctx.project_dir),
+                },
+            },
+            timeout=30,
+        )
+        resp.raise_for_status()
+        job_id = resp.json()["id"]
+
+        # Stream the build log until the worker closes the connection
+        with session.get(f"{base}/jobs/{job_id}/log", stream=True) as log:
+            log.raise_for_status()
+            for chunk in log.iter_content(chunk_size=None):
+                sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+
+        status = session.get(f"{base}/jobs/{job_id}", timeout=30)
+        status.raise_for_status()
+        job = status.json()
+        if job["state"] != "succeeded":
+            console.print(
+                f"[red]Remote build failed (exit code {job['returncode']}).[/red]"
+            )
+            raise SystemExit(1)
+
+        _fetch_artifacts(session, base, ctx.project_dir, job["artifacts"])
+    except (requests.RequestException, RemoteBuildError) as e:
+        console.print(f"[red]Remote build error:[/red] {e}")
+        raise SystemExit(2) from None
+
+
+def _fetch_artifacts(session, base: str, project_dir: Path, artifacts: dict[str, str]):
+    """Download artifacts whose local content differs, and prune stale local ones.
+
+    The manifest comes from the worker, so its paths must stay inside
+    ARTIFACT_PATHS and every download must match its digest.
+    """
+    from tinytapeout.cli.console import console
+
+    for rel, digest in artifacts.items():
+        if not is_allowed_path(rel, ARTIFACT_PATHS):
+            raise RemoteBuildError(f"Worker sent an unexpected artifact path: {rel!r}")
+        if not is_digest(digest):
+            raise RemoteBuildError(f"Worker sent an invalid digest for {rel}")
+
+    local = collect_files(project_dir, ARTIFACT_PATHS)
+    for rel, path in local.items():
+        if rel not in artifacts:
+            path.unlink()
+
+    fetched = 0
+    for rel, digest in sorted(artifacts.items()):
+        dest = project_dir / rel
+        if dest.is_file() and hash_file(dest) == digest:
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + ".part")
+        h = new_hash()
+        with session.get(f"{base}/blobs/{digest}", stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            with open(tmp, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=1 << 20):
+                    h.update(chunk)
+                    f.write(chunk)
+        if h.hexdigest() != digest:
+            tmp.unlink()
+            raise RemoteBuildError(f"Download of {rel} does not match its digest")
+        os.replace(tmp, dest)
+        fetched += 1
+    console.print(
+        f"Downloaded {fetched} of {len(artifacts)} artifacts "
+        f"({len(artifacts) - fetched} unchanged)."
+    )
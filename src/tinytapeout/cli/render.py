@@ -0,0 +1,332 @@
+"""Native PNG renderer for 'tt gds view 2d'.
+
+Replaces 'tt_tool.py --create-png' (GDS -> SVG -> CairoSVG). Polygons are read
+with gdstk and scan-converted with NumPy: every polygon edge yields one winding
+crossing per pixel row it spans, and a cumulative sum along each row gives the
+nonzero-winding coverage of a whole layer at once. The image is split into
+horizontal strips that are rasterized and composited in a process pool.
+
+Rendered images are cached in the user cache, keyed on the GDS content hash,
+the tech and the render parameters, so viewing an unchanged layout again does
+not re-render it. cached_render_files does the same for renderers that write
+several images (tt_tool.py's PNG, SVG and thumbnails).
+"""
+
+import multiprocessing
+import os
+import shutil
+import struct
+import threading
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from tinytapeout.cli.cache import ArtifactCache, cache_key
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.cli.layout import load_layout
+from tinytapeout.tech import TechName, tech_map
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_SIZE = 2048
+BACKGROUND = (255, 255, 255)
+LAYER_ALPHA = 0.6
+# Rows per strip handed to a worker process
+_STRIP_ROWS = 256
+# Bump when the renderer's output changes, to invalidate cached images
+_RENDER_VERSION = 1
+RENDER_CACHE_BYTES = 256 << 20
+
+
+@dataclass
+class RenderedLayer:
+    name: str
+    layer: tuple[int, int]
+    color: tuple[int, int, int]
+
+
+def render_layers(
+    tech: TechName, names: list[str] | None = None
+) -> list[RenderedLayer]:
+    """Resolve the layers to draw, in compositing order (bottom to top).
+
+    By default all layers with a color in the tech are drawn. Names are matched
+    case-insensitively against the tech's drawing layers.
+    """
+    tech_info = tech_map[tech]
+    if names is None:
+        names = list(tech_info.layer_colors)
+    by_name = {name.lower(): name for name in tech_info.drawing_layers}
+    selected = []
+    for requested in names:
+        name = by_name.get(requested.lower())
+        if name is None:
+            known = ", ".join(tech_info.drawing_layers)
+            raise ValueError(f"Unknown layer '{requested}' (known: {known})")
+        selected.append(name)
+
+    order = list(tech_info.drawing_layers)
+    return [
+        RenderedLayer(
+            name=name,
+            layer=tech_info.drawing_layers[name],
+            color=_parse_color(tech_info.layer_colors.get(name, "#808080")),
+        )
+        for name in sorted(set(selected), key=order.index)
+    ]
+
+
+def render_png(
+    gds_path: str | Path,
+    png_path: str | Path,
+    tech: TechName,
+    *,
+    size: int = DEFAULT_SIZE,
+    layers: list[str] | None = None,
+    top_cell: str | None = None,
+    jobs: int | None = None,
+) -> tuple[int, int]:
+    """Render a GDS file to a PNG whose longer side is `size` pixels.
+
+    Returns the (width, height) of the image.
+    """
+    import numpy as np
+
+    drawn = render_layers(tech, layers)
+    geom = load_layout(gds_path, top_cell)
+    bbox = geom.bbox()
+    boundary_key = _key(tech_map[tech].prboundary_layer)
+    keys = geom.layer_keys()
+    if np.any(keys == boundary_key):
+        # Frame the image on the prBoundary rather than on stray geometry
+        box = geom.polygon_bboxes()[keys == boundary_key]
+        bbox = (box[:, 0].min(), box[:, 1].min(), box[:, 2].max(), box[:, 3].max())
+    if bbox is None:
+        raise ValueError("GDS file contains no polygons")
+
+    x0, y0, x1, y1 = bbox
+    scale = size / max(x1 - x0, y1 - y0)
+    width = max(1, round((x1 - x0) * scale))
+    height = max(1, round((y1 - y0) * scale))
+
+    edges = _layer_edges(geom, drawn, x0, y1, scale)
+    colors = np.array([layer.color for layer in drawn], dtype=np.float32)
+    strips = [
+        (row, min(row + _STRIP_ROWS, height)) for row in range(0, height, _STRIP_ROWS)
+    ]
+    tasks = [
+        (row0, row1, width, _edges_in_rows(edges, row0, row1), colors)
+        for row0, row1 in strips
+    ]
+
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        # Forking while other threads run (e.g. as a 'tt gds build --prerender'
+        # pipeline step) can hand the workers locks that are never released
+        context = None
+        if threading.active_count() > 1:
+            context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            parts = list(pool.map(_render_strip, tasks))
+    else:
+        parts = [_render_strip(task) for task in tasks]
+
+    write_png(png_path, np.concatenate(parts))
+    return width, height
+
+
+def cached_render_png(
+    gds_path: str | Path,
+    png_path: str | Path,
+    tech: TechName,
+    *,
+    size: int = DEFAULT_SIZE,
+    layers: list[str] | None = None,
+    top_cell: str | None = None,
+    jobs: int | None = None,
+    cache: ArtifactCache | None = None,
+) -> bool:
+    """Like render_png, but reuse a cached image of the same GDS and parameters.
+
+    Returns True if the image came from the cache.
+    """
+    cache = cache or ArtifactCache("renders", RENDER_CACHE_BYTES)
+    drawn = [(layer.layer, layer.color) for layer in render_layers(tech, layers)]
+    key = cache_key(
+        "png", _RENDER_VERSION, hash_file(gds_path), tech, size, drawn, top_cell
+    )
+    cached = cache.get(key, ".png")
+    if cached is not None:
+        shutil.copyfile(cached, png_path)
+        return True
+    render_png(
+        gds_path, png_path, tech, size=size, layers=layers, top_cell=top_cell, jobs=jobs
+    )
+    cache.put(key, Path(png_path), ".png")
+    return False
+
+
+def cached_render_files(
+    key_parts: tuple,
+    out_dir: Path,
+    render: Callable[[], None],
+    cache: ArtifactCache | None = None,
+) -> bool:
+    """Run render, which writes images into out_dir, or restore its images.
+
+    Every PNG and SVG file that render creates or updates in out_dir is cached
+    under one key made of key_parts, so a hit restores all of them. Returns
+    True if the images came from the cache.
+    """
+    cache = cache or ArtifactCache("renders", RENDER_CACHE_BYTES)
+    key = cache_key("files", _RENDER_VERSION, *key_parts)
+    cached = cache.get_files(key)
+    if cached is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name, path in cached.items():
+            shutil.copyfile(path, out_dir / name)
+        return True
+    before = _image_stamps(out_dir)
+    render()
+    outputs = [
+        out_dir / name
+        for name, stamp in _image_stamps(out_dir).items()
+        if before.get(name) != stamp
+    ]
+    if outputs:
+        cache.put_files(key, outputs)
+    return False
+
+
+def _image_stamps(out_dir: Path) -> dict[str, tuple[int, int]]:
+    stamps = {}
+    for path in out_dir.glob("*"):
+        if path.suffix in (".png", ".svg") and path.is_file():
+            st = path.stat()
+            stamps[path.name] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def write_png(path: str | Path, image: "np.ndarray") -> None:
+    """Write an (H, W, 3) uint8 array as an 8-bit RGB PNG."""
+    import numpy as np
+
+    height, width, _ = image.shape
+    # Filter type 0 (None) byte in front of every scanline
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", header))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def _parse_color(value: str) -> tuple[int, int, int]:
+    value = value.lstrip("#")
+    return (int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16))
+
+
+def _key(layer: tuple[int, int]) -> int:
+    return layer[0] * 65536 + layer[1]
+
+
+def _layer_edges(geom, drawn: list[RenderedLayer], x0: float, y1: float, scale: float):
+    """Non-horizontal polygon edges of the drawn layers in pixel coordinates.
+
+    Returns (layer index, xa, ya, xb, yb, winding direction) arrays. The winding
+    direction is normalized by polygon orientation, so overlapping clockwise
+    and counter-clockwise polygons add up instead of cancelling out.
+    """
+    import numpy as np
+
+    index_of = {_key(layer.layer): i for i, layer in enumerate(drawn)}
+    poly_layer = np.full(geom.polygon_count, -1, dtype=np.int64)
+    keys = geom.layer_keys()
+    for key, i in index_of.items():
+        poly_layer[keys == key] = i
+    orientation = np.sign(geom.polygon_areas())
+
+    sizes = np.diff(geom.offsets)
+    edge_poly = np.repeat(np.arange(geom.polygon_count), sizes)
+    nxt = np.arange(1, len(geom.points) + 1)
+    nxt[geom.offsets[1:] - 1] = geom.offsets[:-1]
+
+    # GDS y grows upwards, image rows grow downwards
+    px = (geom.points[:, 0] - x0) * scale
+    py = (y1 - geom.points[:, 1]) * scale
+    xa, ya, xb, yb = px, py, px[nxt], py[nxt]
+    layer = poly_layer[edge_poly]
+    keep = (layer >= 0) & (ya != yb)
+    # Flipping y reverses orientation; the sign cancels in the product below
+    direction = np.where(yb > ya, 1, -1) * orientation[edge_poly]
+    return (
+        layer[keep],
+        xa[keep],
+        ya[keep],
+        xb[keep],
+        yb[keep],
+        direction[keep].astype(np.int64),
+    )
+
+
+def _edges_in_rows(edges, row0: int, row1: int):
+    """Subset of edges whose y-range overlaps pixel rows [row0, row1)."""
+    import numpy as np
+
+    _, _, ya, _, yb, _ = edges
+    mask = (np.maximum(ya, yb) > row0) & (np.minimum(ya, yb) < row1)
+    return tuple(a[mask] for a in edges)
+
+
+def _render_strip(task) -> "np.ndarray":
+    """Rasterize and composite all layers for pixel rows [row0, row1)."""
+    import numpy as np
+
+    row0, row1, width, edges, colors = task
+    rows = row1 - row0
+    image = np.empty((rows, width, 3), dtype=np.float32)
+    image[:] = BACKGROUND
+    layer = edges[0]
+    for i, color in enumerate(colors):
+        mask = _coverage(tuple(a[layer == i] for a in edges[1:]), row0, rows, width)
+        image[mask] = image[mask] * (1 - LAYER_ALPHA) + color * LAYER_ALPHA
+    return image.round().astype(np.uint8)
+
+
+def _coverage(edges, row0: int, rows: int, width: int) -> "np.ndarray":
+    """Boolean (rows, width) mask of pixel centers inside the polygons."""
+    import numpy as np
+
+    xa, ya, xb, yb, direction = edges
+    if not len(xa):
+        return np.zeros((rows, width), dtype=bool)
+
+    # Rows whose center (r + 0.5) lies in [min(ya, yb), max(ya, yb))
+    first = np.maximum(np.ceil(np.minimum(ya, yb) - 0.5), row0).astype(np.int64)
+    last = np.minimum(np.ceil(np.maximum(ya, yb) - 0.5), row0 + rows).astype(np.int64)
+    spans = np.maximum(last - first, 0)
+    edge = np.repeat(np.arange(len(xa)), spans)
+    starts = np.cumsum(spans) - spans
+    row = first[edge] + np.arange(len(edge)) - starts[edge]
+
+    t = (row + 0.5 - ya[edge]) / (yb[edge] - ya[edge])
+    x = xa[edge] + t * (xb[edge] - xa[edge])
+    # A crossing at x affects pixels whose center lies to its right
+    col = np.clip(np.floor(x - 0.5) + 1, 0, width).astype(np.int64)
+
+    stride = width + 1
+    winding = np.bincount(
+        (row - row0) * stride + col, weights=direction[edge], minlength=rows * stride
+    ).reshape(rows, stride)
+    return np.cumsum(winding[:, :width], axis=1) != 0
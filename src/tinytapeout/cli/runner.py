@@ -1,8 +1,84 @@
+import contextlib
+import io
 import os
+import shutil
 import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import replace
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from tinytapeout.cli.context import ProjectContext, _tt_tools_python
+from tinytapeout.cli.tracing import current_step, record_command
+
+if TYPE_CHECKING:
+    from tinytapeout.cli.precheck_env import PrecheckEnv
+
+
+@contextlib.contextmanager
+def traced_popen(cmd: list[str], **kwargs) -> Iterator[subprocess.Popen]:
+    """Start an external command; on leaving the block, close its pipes and
+    wait for it.
+
+    The child is reaped with os.wait4(), so that 'tt --trace' can record its
+    CPU time and peak memory along with the wall time.
+    """
+    start = time.perf_counter()
+    step = current_step()
+    proc = subprocess.Popen(cmd, **kwargs)
+    try:
+        yield proc
+    finally:
+        for stream in (proc.stdin, proc.stdout, proc.stderr):
+            if stream is not None:
+                stream.close()
+        usage = _reap(proc)
+        record_command(cmd, start, proc.returncode, usage, step)
+
+
+def run_command(
+    cmd: list[str], *, capture_output: bool = False, text: bool = False, **kwargs
+) -> subprocess.CompletedProcess:
+    """subprocess.run() for the CLI's external commands, traced by traced_popen.
+
+    Captured output goes to temporary files instead of pipes, so nothing has
+    to drain them while the child runs.
+    """
+    with contextlib.ExitStack() as stack:
+        if capture_output:
+            kwargs["stdout"] = stack.enter_context(tempfile.TemporaryFile())
+            kwargs["stderr"] = stack.enter_context(tempfile.TemporaryFile())
+        with traced_popen(cmd, **kwargs) as proc:
+            pass
+        stdout = stderr = None
+        if capture_output:
+            stdout = _read_output(kwargs["stdout"], text)
+            stderr = _read_output(kwargs["stderr"], text)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+def _reap(proc: subprocess.Popen):
+    """Wait for proc, returning its resource usage where wait4() exists."""
+    if proc.returncode is not None or not hasattr(os, "wait4"):
+        proc.wait()
+        return None
+    try:
+        _, status, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError:  # already reaped
+        proc.wait()
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage
+
+
+def _read_output(file, text: bool) -> str | bytes:
+    file.seek(0)
+    data = file.read()
+    # Decoded like subprocess.run(text=True): locale encoding, universal newlines
+    return io.TextIOWrapper(io.BytesIO(data)).read() if text else data
 
 
 def _tt_tools_env(tt_dir: Path) -> dict[str, str]:
@@ -29,7 +105,7 @@ def run_tt_tool(
     elif ctx.tech == "gf180mcuD":
         cmd.append("--gf")
     cmd.extend(args)
-    return subprocess.run(
+    return run_command(
         cmd, capture_output=capture, text=True, env=_tt_tools_env(tt_dir)
     )
 
@@ -47,7 +123,7 @@ def _install_precheck_deps(tt_dir: Path) -> None:
         return
 
     # Fast path: check if deps are already satisfied
-    result = subprocess.run(
+    result = run_command(
         [str(venv_python), "-m", "pip", "install", "--dry-run", "-r", str(req_file)],
         capture_output=True,
         text=True,
@@ -56,7 +132,7 @@ def _install_precheck_deps(tt_dir: Path) -> None:
         return
 
     console.print("Installing precheck dependencies ...")
-    result = subprocess.run(
+    result = run_command(
         [str(venv_python), "-m", "pip", "install", "-r", str(req_file)],
         capture_output=True,
         text=True,
@@ -75,47 +151,277 @@ def run_precheck(
     *args: str,
     runner: str = "auto",
     capture: bool = False,
+    force: bool = False,
+    jobs: int | None = None,
+    on_line: Callable[[str], None] | None = None,
+    get_env: "Callable[[], PrecheckEnv] | None" = None,
+    precheck_dir: Path | None = None,
 ) -> subprocess.CompletedProcess:
-    """Run precheck.py with the given arguments."""
-    from tinytapeout.cli.precheck_env import detect_precheck_env, wrap_command
+    """Run precheck.py with the given arguments.
+
+    Results are cached by GDS content, tech, precheck version and environment;
+    a cache hit restores the reports and replays the original log. Failures
+    are cached only if the report shows a failed check. force=True re-runs
+    precheck regardless (and refreshes the cache). Output is always combined
+    into stdout.
+
+    Unless jobs is 1, the individual checks run in parallel through
+    precheck_driver.py (jobs=None: one per CPU), falling back to a serial
+    precheck.py run if the driver does not understand this precheck version
+    or is turned off with TT_PRECHECK_DRIVER=0.
+
+    on_line receives each line of output as it is produced (or replayed from
+    the cache) instead of it being echoed; status notes are then left out.
+
+    get_env provides the environment to run in on a cache miss (default:
+    prepare_precheck_env); precheck_dir is an isolated_precheck_dir to run in
+    instead of tt/precheck.
+    """
+    from tinytapeout.cli.console import console
+    from tinytapeout.cli.precheck_cache import (
+        LOG_NAME,
+        PrecheckCache,
+        driver_enabled,
+        is_conclusive,
+        precheck_environment,
+        precheck_key,
+    )
+    from tinytapeout.cli.precheck_env import RUNNER_DOCKER, command_env, wrap_command
 
     tt_dir = ctx.require_tt_tools()
+    _require_precheck_script(tt_dir)
 
-    precheck_script = tt_dir / "precheck" / "precheck.py"
-    if not precheck_script.exists():
-        from tinytapeout.cli.console import console
+    precheck_dir = precheck_dir or tt_dir / "precheck"
+    reports_dir = precheck_dir / "reports"
+    cache = PrecheckCache()
+    use_driver = jobs != 1 and driver_enabled()
+    environment = precheck_environment(runner, driver=use_driver)
+    key = precheck_key(gds_path, ctx.tech, tt_dir, args, environment)
+    if key is not None and not force:
+        shutil.rmtree(reports_dir, ignore_errors=True)
+        cached = cache.load(key, reports_dir)
+        if cached is not None:
+            if on_line is None:
+                console.print(
+                    "Using cached precheck result (GDS and precheck unchanged)."
+                )
+            if cached.log_path.exists():
+                _replay_log(cached.log_path, echo=not capture, on_line=on_line)
+            return subprocess.CompletedProcess(
+                [],
+                cached.returncode,
+                stdout=_read_log(cached.log_path) if capture else None,
+                stderr="",
+            )
 
-        console.print(
-            f"[red]Precheck script not found at {precheck_script}.[/red]\n"
-            "Try updating tt-support-tools: git -C tt pull"
+    if get_env is None:
+        env_info = prepare_precheck_env(ctx, runner)
+    else:
+        env_info = get_env()
+    run_dir, run_gds = precheck_dir, gds_path
+    if env_info.runner == RUNNER_DOCKER:
+        from tinytapeout.cli.docker_runner import stage_precheck_run
+
+        run_dir, run_gds = stage_precheck_run(
+            env_info.staged_tt, tt_dir, precheck_dir, gds_path
         )
-        raise SystemExit(2)
+        env_info = replace(env_info, workdir=run_dir)
+
+    python = _tt_tools_python(tt_dir)
+    precheck_args = ["--gds", run_gds, "--tech", ctx.tech, *args]
+    serial_cmd = [python, str(run_dir / "precheck.py"), *precheck_args]
+    if not use_driver:
+        cmd = serial_cmd
+    else:
+        cmd = [python, str(Path(__file__).with_name("precheck_driver.py"))]
+        cmd.extend(["--precheck", str(run_dir / "precheck.py")])
+        # The caller's core share (e.g. per layout) bounds checks and threads
+        cores = jobs or os.cpu_count() or 1
+        cmd.extend(["--jobs", str(cores), "--threads", str(cores)])
+        cmd.extend(["--", *precheck_args])
+
+    env = command_env(env_info, _tt_tools_env(tt_dir))
+    env["PDK"] = ctx.tech  # precheck reads PDK env var at module level
+    shutil.rmtree(reports_dir, ignore_errors=True)
+    log_path = precheck_dir / LOG_NAME
+
+    # Wrap command for the detected environment (e.g. nix-shell)
+    returncode = _run_logged(
+        wrap_command(env_info, cmd),
+        cwd=precheck_dir,
+        env=env,
+        log_path=log_path,
+        echo=not capture,
+        on_line=on_line,
+    )
+    if cmd is not serial_cmd and returncode == _DRIVER_UNSUPPORTED:
+        if on_line is None:
+            console.print("[yellow]Running precheck checks serially.[/yellow]")
+        cmd = serial_cmd
+        returncode = _run_logged(
+            wrap_command(env_info, cmd),
+            cwd=precheck_dir,
+            env=env,
+            log_path=log_path,
+            echo=not capture,
+            on_line=on_line,
+        )
+    if run_dir != precheck_dir and (run_dir / "reports").is_dir():
+        shutil.copytree(run_dir / "reports", reports_dir)
+    if (
+        key is not None
+        and reports_dir.is_dir()
+        and is_conclusive(returncode, reports_dir)
+    ):
+        cache.store(key, returncode, reports_dir, log_path)
+    return subprocess.CompletedProcess(
+        cmd,
+        returncode,
+        stdout=_read_log(log_path) if capture else None,
+        stderr="",
+    )
+
+
+def prepare_precheck_env(ctx: ProjectContext, runner: str) -> "PrecheckEnv":
+    """Install precheck's dependencies and set up the environment to run it in.
+
+    Done once per validation, even when several layouts are checked.
+    """
+    from tinytapeout.cli.nix_env import load_nix_env
+    from tinytapeout.cli.precheck_env import (
+        RUNNER_DOCKER,
+        RUNNER_NIX,
+        detect_precheck_env,
+    )
+
+    tt_dir = ctx.require_tt_tools()
+    _require_precheck_script(tt_dir)
 
     # Install precheck Python deps into the venv
     _install_precheck_deps(tt_dir)
 
     # Detect execution environment
     env_info = detect_precheck_env(tt_dir, runner)
+    if env_info.runner == RUNNER_NIX:
+        # Run directly in the captured shell environment instead of nix-shell
+        env_info.shell_env = load_nix_env(env_info.nix_file)
+    elif env_info.runner == RUNNER_DOCKER:
+        env_info.container, env_info.staged_tt = _start_precheck_container(tt_dir)
+    return env_info
 
-    precheck_dir = tt_dir / "precheck"
-    cmd = [_tt_tools_python(tt_dir), str(precheck_script)]
-    cmd.extend(["--gds", gds_path])
-    cmd.extend(["--tech", ctx.tech])
-    cmd.extend(args)
 
-    # Wrap command for the detected environment (e.g. nix-shell)
-    cmd = wrap_command(env_info, cmd)
+def isolated_precheck_dir(tt_dir: Path, name: str) -> Path:
+    """A private copy of tt/precheck for one of several concurrent runs.
 
-    env = _tt_tools_env(tt_dir)
-    env["PDK"] = ctx.tech  # precheck reads PDK env var at module level
-    return subprocess.run(
-        cmd,
-        cwd=str(precheck_dir),
-        capture_output=capture,
-        text=True,
-        env=env,
+    precheck.py writes its reports next to itself, so concurrent runs each get
+    a sibling directory of symlinks to the precheck sources, with their own
+    reports directory and log.
+    """
+    from tinytapeout.cli.precheck_cache import LOG_NAME
+
+    source = tt_dir / "precheck"
+    workdir = tt_dir / f".precheck-{name}"
+    shutil.rmtree(workdir, ignore_errors=True)
+    workdir.mkdir()
+    for entry in source.iterdir():
+        if entry.name not in ("reports", LOG_NAME, "__pycache__"):
+            (workdir / entry.name).symlink_to(entry)
+    return workdir
+
+
+def _require_precheck_script(tt_dir: Path) -> None:
+    from tinytapeout.cli.console import console
+
+    precheck_script = tt_dir / "precheck" / "precheck.py"
+    if not precheck_script.exists():
+        console.print(
+            f"[red]Precheck script not found at {precheck_script}.[/red]\n"
+            "Try updating tt-support-tools: git -C tt pull"
+        )
+        raise SystemExit(2)
+
+
+def _start_precheck_container(tt_dir: Path) -> tuple[str, Path]:
+    """Stage tt-support-tools and start or reuse the precheck container.
+
+    Returns the container and the staged copy of tt-support-tools; exits with
+    a message on error.
+    """
+    from tinytapeout.cli.console import console
+    from tinytapeout.cli.docker_runner import (
+        DockerError,
+        ensure_container,
+        precheck_image,
+        precheck_mounts,
+        stage_tt_tools,
+        staging_dir,
     )
 
+    staging = staging_dir()
+    staged_tt = stage_tt_tools(tt_dir, staging)
+    mounts = precheck_mounts(staging, os.environ.get("PDK_ROOT"))
+    requirements = staged_tt / "precheck" / "requirements.txt"
+    try:
+        return ensure_container(precheck_image(), mounts, requirements), staged_tt
+    except DockerError as e:
+        console.print(f"[red]{e}[/red]")
+        raise SystemExit(2) from None
+
+
+# precheck_driver.EXIT_UNSUPPORTED (the driver runs outside this package's venv)
+_DRIVER_UNSUPPORTED = 3
+
+
+def _run_logged(
+    cmd: list[str],
+    *,
+    cwd: Path,
+    env: dict[str, str],
+    log_path: Path,
+    echo: bool,
+    on_line: Callable[[str], None] | None = None,
+) -> int:
+    """Run a command, writing its combined output to log_path.
+
+    Each line is also passed to on_line if given, else echoed to stdout.
+    """
+    with (
+        open(log_path, "w") as log,
+        traced_popen(
+            cmd,
+            cwd=str(cwd),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+        ) as proc,
+    ):
+        for line in proc.stdout:
+            log.write(line)
+            if on_line is not None:
+                on_line(line)
+            elif echo:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+    return proc.returncode
+
+
+def _replay_log(
+    log_path: Path, *, echo: bool, on_line: Callable[[str], None] | None
+) -> None:
+    with open(log_path, errors="replace") as log:
+        for line in log:
+            if on_line is not None:
+                on_line(line)
+            elif echo:
+                sys.stdout.write(line)
+    sys.stdout.flush()
+
+
+def _read_log(log_path: Path) -> str:
+    return log_path.read_text(errors="replace") if log_path.exists() else ""
+
 
 def run_make(
     directory: str,
@@ -131,4 +437,4 @@ def run_make(
     if env:
         run_env.update(env)
 
-    return subprocess.run(cmd, capture_output=capture, text=True, env=run_env)
+    return run_command(cmd, capture_output=capture, text=True, env=run_env)
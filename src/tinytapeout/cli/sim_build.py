@@ -0,0 +1,98 @@
+"""Incremental simulation builds for 'tt test'.
+
+cocotb's Makefile only recompiles when a file listed in VERILOG_SOURCES is
+newer than the compiled simulation. It misses `include'd files and changes to
+the Makefile's compile flags, which is why 'tt test' used to run 'make clean'
+every time. Instead, the HDL inputs are fingerprinted: the project's
+source_files, everything they (transitively) `include, the Verilog in test/
+(the testbench and, for gate-level runs, the netlist) and the Makefile.
+'make clean' runs only when the fingerprint differs from the one recorded
+after the previous run, so editing only the Python testbench goes straight to
+simulation.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+from tinytapeout.cli.cache import cache_key
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.project_info import ProjectInfo
+
+HDL_SUFFIXES = {".v", ".sv", ".vh", ".svh"}
+GL_NETLIST = "gate_level_netlist.v"
+_INCLUDE_RE = re.compile(rb'^\s*`include\s+"(?P<path>[^"]+)"', re.MULTILINE)
+
+
+def hdl_inputs(
+    project_dir: Path, test_dir: Path, info: ProjectInfo | None, gl: bool
+) -> list[Path]:
+    """The files a simulation build of the project is compiled from."""
+    src_dir = project_dir / "src"
+    if info is not None:
+        sources = [src_dir / name for name in info.source_files]
+    else:
+        sources = sorted(p for p in src_dir.glob("*") if p.suffix in HDL_SUFFIXES)
+    sources += sorted(
+        p
+        for p in test_dir.glob("*")
+        if p.suffix in HDL_SUFFIXES and (gl or p.name != GL_NETLIST)
+    )
+
+    inputs: list[Path] = []
+    seen: set[Path] = set()
+    pending = [p for p in sources if p.is_file()]
+    while pending:
+        path = pending.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+        inputs.append(path)
+        pending.extend(_includes(path, [path.parent, src_dir, test_dir]))
+    makefile = test_dir / "Makefile"
+    if makefile.is_file():
+        inputs.append(makefile)
+    return inputs
+
+
+def _includes(path: Path, search_dirs: list[Path]) -> list[Path]:
+    """The `include'd files of path that exist in search_dirs."""
+    found = []
+    for match in _INCLUDE_RE.finditer(path.read_bytes()):
+        name = os.fsdecode(match["path"])
+        for directory in search_dirs:
+            candidate = directory / name
+            if candidate.is_file():
+                found.append(candidate)
+                break
+    return found
+
+
+def inputs_fingerprint(inputs: list[Path], *extra) -> str:
+    """Content fingerprint of the build inputs (plus extra key parts)."""
+    return cache_key(
+        [(str(path), hash_file(path)) for path in inputs],
+        *extra,
+        os.environ.get("PDK_ROOT"),
+        os.environ.get("PDK"),
+    )
+
+
+def _stamp_path(test_dir: Path, mode: str) -> Path:
+    return test_dir / "sim_build" / f".tt-inputs-{mode}.json"
+
+
+def build_is_current(test_dir: Path, mode: str, fingerprint: str) -> bool:
+    """Whether the last build of this mode was made from the same inputs."""
+    try:
+        stamp = json.loads(_stamp_path(test_dir, mode).read_text())
+    except (OSError, ValueError):
+        return False
+    return stamp.get("fingerprint") == fingerprint
+
+
+def record_build(test_dir: Path, mode: str, fingerprint: str) -> None:
+    path = _stamp_path(test_dir, mode)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"fingerprint": fingerprint}) + "\n")
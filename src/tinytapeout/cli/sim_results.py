@@ -0,0 +1,143 @@
+"""Summaries of cocotb's results.xml (JUnit XML), read incrementally.
+
+Gate-level regressions can produce very large results files, so they are
+never loaded whole: iter_testcases() walks the file with iterparse and
+discards every <testcase> once it has been read. summarize() keeps only the
+counts, a capped list of failures and the slowest testcases (on a heap), so
+its memory use does not depend on the number of testcases.
+"""
+
+import heapq
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+MAX_FAILURES = 50
+
+
+class ResultsError(Exception):
+    pass
+
+
+@dataclass
+class CaseResult:
+    name: str
+    classname: str | None
+    status: str  # "pass", "fail" or "skip"
+    duration: float | None = None
+    message: str | None = None
+
+
+@dataclass
+class ResultsSummary:
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+    failures: list[CaseResult] = field(default_factory=list)
+    slowest: list[CaseResult] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.passed + self.failed + self.skipped
+
+    def to_json(self) -> dict:
+        return {
+            "status": "fail" if self.failed else "pass",
+            "tests": self.total,
+            "passed": self.passed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "duration": round(self.duration, 3),
+            "failures": [asdict(case) for case in self.failures],
+            "slowest": [asdict(case) for case in self.slowest],
+        }
+
+
+def iter_testcase_elements(path: str | Path) -> Iterator[ET.Element]:
+    """Yield the <testcase> elements of a results.xml one at a time.
+
+    Each element is discarded once the next one is requested. Raises
+    ResultsError if the file cannot be read or is not well-formed.
+    """
+    parents: list[ET.Element] = []
+    try:
+        for event, elem in ET.iterparse(path, events=("start", "end")):
+            if event == "start":
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem.tag != "testcase":
+                continue
+            yield elem
+            # Drop the testcase (and anything read before it) from the tree
+            if parents:
+                parents[-1].clear()
+    except (OSError, ET.ParseError) as e:
+        raise ResultsError(f"Cannot read {path}: {e}") from e
+
+
+def iter_testcases(path: str | Path) -> Iterator[CaseResult]:
+    """Yield the testcases of a results.xml one at a time."""
+    for elem in iter_testcase_elements(path):
+        yield _case_result(elem)
+
+
+def _case_result(elem: ET.Element) -> CaseResult:
+    failure = elem.find("failure")
+    if failure is None:
+        failure = elem.find("error")
+    skipped = elem.find("skipped")
+    if failure is not None:
+        status = "fail"
+        message = failure.get("message") or (failure.text or "").strip() or None
+    elif skipped is not None:
+        status = "skip"
+        message = skipped.get("message") or None
+    else:
+        status, message = "pass", None
+    try:
+        duration = float(elem.get("time", ""))
+    except ValueError:
+        duration = None
+    return CaseResult(
+        name=elem.get("name", "?"),
+        classname=elem.get("classname"),
+        status=status,
+        duration=duration,
+        message=message,
+    )
+
+
+def summarize(
+    cases: Iterable[CaseResult], slowest: int = 5, max_failures: int = MAX_FAILURES
+) -> ResultsSummary:
+    """Count the results, keeping the first failures and the slowest cases."""
+    summary = ResultsSummary()
+    heap: list[tuple[float, int, CaseResult]] = []
+    for index, case in enumerate(cases):
+        if case.status == "fail":
+            summary.failed += 1
+            if len(summary.failures) < max_failures:
+                summary.failures.append(case)
+        elif case.status == "skip":
+            summary.skipped += 1
+        else:
+            summary.passed += 1
+        if case.duration is None:
+            continue
+        summary.duration += case.duration
+        if slowest <= 0 or case.status == "skip":
+            continue
+        item = (case.duration, -index, case)
+        if len(heap) < slowest:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+    summary.slowest = [case for _, _, case in sorted(heap, reverse=True)]
+    return summary
+
+
+def summarize_results(path: str | Path, slowest: int = 5) -> ResultsSummary:
+    return summarize(iter_testcases(path), slowest=slowest)
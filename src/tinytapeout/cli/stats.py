@@ -0,0 +1,121 @@
+"""Design statistics computed in-process from the hardened run directory.
+
+Replaces 'tt_tool.py --print-stats --print-cell-summary'. The gate-level netlist
+is scanned in fixed-size chunks with the tech's cell_regexp, so memory use is
+bounded no matter how many instances the design has.
+"""
+
+import json
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from tinytapeout.tech import TechName, tech_map
+
+_CHUNK_SIZE = 4 << 20
+
+# LibreLane metrics reported by 'tt gds stats'
+_METRIC_KEYS = {
+    "instance_count": "design__instance__count",
+    "die_area": "design__die__area",
+    "core_area": "design__core__area",
+    "instance_area": "design__instance__area",
+    "utilization": "design__instance__utilization",
+    "wire_length": "route__wirelength",
+}
+
+
+@dataclass
+class DesignStats:
+    top_module: str
+    netlist: str | None = None
+    total_cells: int = 0
+    cells: dict[str, int] = field(default_factory=dict)
+    categories: dict[str, int] = field(default_factory=dict)
+    area: dict[str, float] = field(default_factory=dict)
+    utilization: float | None = None
+    metrics: dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def find_netlist(
+    final_dir: Path, tech: TechName, top_module: str | None
+) -> Path | None:
+    """Locate the final gate-level netlist (e.g. final/pnl/<top>.pnl.v)."""
+    netlist_type = tech_map[tech].netlist_type
+    netlist_dir = final_dir / netlist_type
+    if top_module:
+        path = netlist_dir / f"{top_module}.{netlist_type}.v"
+        return path if path.exists() else None
+    candidates = sorted(netlist_dir.glob(f"*.{netlist_type}.v"))
+    return candidates[0] if candidates else None
+
+
+def count_cells(netlist: Path, cell_regexp: str) -> Counter[str]:
+    """Count standard-cell instances by cell name, streaming the netlist."""
+    pattern = re.compile(cell_regexp, re.MULTILINE)
+    counts: Counter[str] = Counter()
+    tail = ""
+    with open(netlist) as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            # Only scan complete lines; carry the partial last line over
+            text = tail + chunk
+            cut = text.rfind("\n") + 1
+            text, tail = text[:cut], text[cut:]
+            counts.update(m.group("cell_name") for m in pattern.finditer(text))
+    if tail:
+        counts.update(m.group("cell_name") for m in pattern.finditer(tail))
+    return counts
+
+
+def load_metrics(final_dir: Path) -> dict[str, float]:
+    """Read the LibreLane metrics we report from final/metrics.json."""
+    path = final_dir / "metrics.json"
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    return {name: data[key] for name, key in _METRIC_KEYS.items() if key in data}
+
+
+def compute_design_stats(
+    project_dir: Path,
+    tech: TechName,
+    top_module: str | None = None,
+    tt_tools_dir: Path | None = None,
+) -> DesignStats:
+    """Compute cell histogram, categories, area and utilization for a run."""
+    final_dir = project_dir / "runs" / "wokwi" / "final"
+    netlist = find_netlist(final_dir, tech, top_module)
+    stats = DesignStats(top_module=top_module or "")
+
+    if netlist is not None:
+        stats.netlist = str(netlist)
+        if not stats.top_module:
+            stats.top_module = netlist.name.split(".")[0]
+        cells = count_cells(netlist, tech_map[tech].cell_regexp)
+        stats.cells = dict(cells.most_common())
+        stats.total_cells = sum(cells.values())
+
+        if tt_tools_dir is not None:
+            definitions = tech_map[tech].load_cell_definitions(tt_tools_dir)
+            categories: Counter[str] = Counter()
+            for name, count in cells.items():
+                definition = definitions.get(name)
+                category = definition.get("category", "other") if definition else None
+                categories[category or "unknown"] += count
+            stats.categories = dict(categories.most_common())
+
+    metrics = load_metrics(final_dir)
+    stats.metrics = metrics
+    for name in ("die_area", "core_area", "instance_area"):
+        if name in metrics:
+            stats.area[name.removesuffix("_area")] = metrics[name]
+    if "utilization" in metrics:
+        stats.utilization = metrics["utilization"]
+    elif metrics.get("core_area") and "instance_area" in metrics:
+        stats.utilization = metrics["instance_area"] / metrics["core_area"]
+    return stats
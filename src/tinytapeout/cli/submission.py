@@ -0,0 +1,196 @@
+"""Incremental assembly of the tt_submission/ directory.
+
+Replaces 'tt_tool.py --create-tt-submission', which copies every artifact from
+scratch. Files whose content hash matches what is already in tt_submission/
+are left alone; changed files are reflinked (copy-on-write clone) or hardlinked
+from the run directory when the filesystem allows it, and only copied as a
+last resort. Each file is swapped in atomically.
+
+A manifest records the content hash of every file together with the size,
+mtime and inode of the source it came from, so unchanged sources are not even
+re-read on the next build. It is kept in the user cache, so tt_submission/
+holds only the deliverable files.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tinytapeout.cli.cache import cache_key, cache_root
+from tinytapeout.cli.fsutil import write_atomic
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.tech import TechName, tech_map
+
+# Written into tt_submission/ by earlier versions; removed when found
+LEGACY_MANIFEST_NAME = ".manifest.json"
+# SPEF corner directories that hold the nominal extraction, in order of
+# preference ('tt_tool.py --create-tt-submission' ships the nominal corner)
+SPEF_CORNERS = ("nom_", "nom")
+# ioctl request number of FICLONE on Linux (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+
+class SubmissionError(Exception):
+    pass
+
+
+@dataclass
+class SubmissionFile:
+    src: Path
+    dest: str  # path relative to tt_submission/
+    required: bool = True
+
+
+@dataclass
+class SubmissionResult:
+    actions: dict[str, str]  # dest -> unchanged, reflink, hardlink or copy
+    removed: list[str]
+    warnings: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        counts: dict[str, int] = {}
+        for action in self.actions.values():
+            counts[action] = counts.get(action, 0) + 1
+        parts = [f"{n} {action}" for action, n in sorted(counts.items())]
+        if self.removed:
+            parts.append(f"{len(self.removed)} removed")
+        summary = f"{len(self.actions)} files ({', '.join(parts)})"
+        return "\n".join([summary, *(f"Warning: {w}" for w in self.warnings)])
+
+
+def submission_files(
+    project_dir: Path, tech: TechName, top_module: str
+) -> list[SubmissionFile]:
+    """The run artifacts that make up a submission."""
+    final_dir = project_dir / "runs" / "wokwi" / "final"
+    netlist_type = tech_map[tech].netlist_type
+    spef = nominal_spef(final_dir, top_module)
+    files = [
+        SubmissionFile(final_dir / "commit_id.json", "commit_id.json"),
+        SubmissionFile(final_dir / "gds" / f"{top_module}.gds", f"{top_module}.gds"),
+        SubmissionFile(final_dir / "lef" / f"{top_module}.lef", f"{top_module}.lef"),
+        SubmissionFile(
+            final_dir / netlist_type / f"{top_module}.{netlist_type}.v",
+            f"{top_module}.v",
+        ),
+        SubmissionFile(final_dir / "metrics.csv", "stats/metrics.csv", required=False),
+    ]
+    if spef:
+        files.append(SubmissionFile(spef, f"{top_module}.spef", required=False))
+    return files
+
+
+def nominal_spef(final_dir: Path, top_module: str) -> Path | None:
+    """The nominal-corner SPEF of the run, or None if there is none."""
+    for corner in SPEF_CORNERS:
+        path = final_dir / "spef" / corner / f"{top_module}.{corner}.spef"
+        if path.exists():
+            return path
+    return None
+
+
+def manifest_path(project_dir: Path) -> Path:
+    """Where the manifest of a project's tt_submission/ is kept."""
+    key = cache_key(str(project_dir.resolve()))
+    return cache_root() / "submissions" / f"{key[:16]}.json"
+
+
+def assemble_submission(
+    project_dir: Path, tech: TechName, top_module: str
+) -> SubmissionResult:
+    """Bring tt_submission/ up to date with the current run."""
+    out_dir = project_dir / "tt_submission"
+    files = submission_files(project_dir, tech, top_module)
+    missing = [str(f.src) for f in files if f.required and not f.src.exists()]
+    if missing:
+        raise SubmissionError("Missing build artifacts: " + ", ".join(missing))
+
+    manifest = _load_manifest(manifest_path(project_dir))
+    warnings = []
+    spef_dir = project_dir / "runs" / "wokwi" / "final" / "spef"
+    if spef_dir.is_dir() and not any(f.dest.endswith(".spef") for f in files):
+        warnings.append(
+            f"no nominal-corner SPEF in {spef_dir}; the submission has no SPEF"
+        )
+    new_manifest: dict[str, dict] = {}
+    actions: dict[str, str] = {}
+    for file in files:
+        if not file.src.exists():
+            continue
+        dest = out_dir / file.dest
+        entry = manifest.get(file.dest)
+        st = file.src.stat()
+        stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+        if entry and entry["source"] == stamp and dest.exists():
+            digest = entry["hash"]  # source untouched since the last build
+        else:
+            digest = hash_file(file.src)
+
+        if entry and entry["hash"] == digest and dest.exists():
+            actions[file.dest] = "unchanged"
+        else:
+            actions[file.dest] = link_or_copy(file.src, dest)
+        new_manifest[file.dest] = {"hash": digest, "source": stamp}
+
+    removed = []
+    for name in manifest.keys() - new_manifest.keys():
+        (out_dir / name).unlink(missing_ok=True)
+        removed.append(name)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / LEGACY_MANIFEST_NAME).unlink(missing_ok=True)
+    path = manifest_path(project_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, json.dumps(new_manifest, indent=2).encode() + b"\n")
+    return SubmissionResult(actions=actions, removed=sorted(removed), warnings=warnings)
+
+
+def link_or_copy(src: Path, dest: Path) -> str:
+    """Atomically place src at dest, sharing storage where possible.
+
+    Returns the method used: "reflink", "hardlink" or "copy".
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        if _reflink(src, Path(tmp)):
+            method = "reflink"
+        else:
+            os.unlink(tmp)
+            try:
+                os.link(src, tmp)
+                method = "hardlink"
+            except OSError:
+                shutil.copyfile(src, tmp)
+                method = "copy"
+        os.replace(tmp, dest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return method
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _load_manifest(path: Path) -> dict[str, dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
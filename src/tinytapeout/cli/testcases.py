@@ -0,0 +1,273 @@
+"""Run a project's cocotb testcases in parallel ('tt test --jobs N').
+
+cocotb runs every testcase of the test module in one simulator process, on one
+core. Here the testcases are found in the test module(s) and each is run in a
+simulator process of its own (selected with select_testcases), N at a time. A worker
+runs make in its own directory under test/sim_build/jobs/, which links to
+everything in test/ but gets its own sim_build/, waveform dumps and
+results.xml. PWD is set to test/, so the $(PWD)-relative paths of the project
+template's Makefile resolve as usual. The per-testcase results.xml files are
+merged into test/results.xml.
+"""
+
+import ast
+import functools
+import os
+import re
+import shutil
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from tinytapeout.cli.runner import run_command, run_make
+from tinytapeout.cli.sim_results import (
+    ResultsError,
+    iter_testcase_elements,
+    iter_testcases,
+)
+
+_MODULE_RE = re.compile(r"^\s*MODULE\s*[:?]?=\s*(?P<modules>.+?)\s*$", re.MULTILINE)
+# Outputs of a run that each worker must have for itself
+_RUN_OUTPUTS = {"sim_build", "results.xml", "__pycache__"}
+_RUN_OUTPUT_SUFFIXES = {".fst", ".vcd", ".ghw", ".log"}
+
+
+@dataclass
+class CocotbRun:
+    name: str
+    returncode: int
+    duration: float
+    results: Path
+    log: Path
+
+    @property
+    def passed(self) -> bool:
+        return self.returncode == 0 and not results_have_failures(self.results)
+
+
+def testbench_modules(test_dir: Path) -> list[Path]:
+    """The Python test modules named by MODULE in the Makefile (or all)."""
+    makefile = test_dir / "Makefile"
+    names: list[str] = []
+    if makefile.exists():
+        for match in _MODULE_RE.finditer(makefile.read_text(errors="replace")):
+            names.extend(n for n in re.split(r"[\s,]+", match["modules"]) if n)
+    if names and "$" not in "".join(names):
+        paths = [test_dir / f"{name.replace('.', '/')}.py" for name in names]
+        return [path for path in paths if path.exists()]
+    return sorted(test_dir.glob("*.py"))
+
+
+def find_testcases(test_dir: Path) -> list[str]:
+    """Names of the @cocotb.test() functions in the test modules, in order.
+
+    Tests marked skip=True are left out: selecting a testcase by name makes
+    cocotb run it even if it is marked to be skipped.
+    """
+    names: list[str] = []
+    for module in testbench_modules(test_dir):
+        try:
+            tree = ast.parse(module.read_text(), filename=str(module))
+        except (OSError, SyntaxError):
+            continue
+        for node in tree.body:
+            if not isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+                continue
+            tests = [d for d in node.decorator_list if _is_cocotb_test(d)]
+            if tests and not any(_is_skipped(d) for d in tests):
+                if node.name not in names:
+                    names.append(node.name)
+    return names
+
+
+def select_testcases(
+    names: list[str], env: dict[str, str] | None = None
+) -> dict[str, str]:
+    """Environment variables making cocotb run exactly the named testcases.
+
+    cocotb 2.x deprecates TESTCASE in favour of COCOTB_TEST_FILTER, a regex
+    matched against the (module-qualified) test names; 1.x only knows TESTCASE.
+    env is the environment make runs in, for finding cocotb-config.
+    """
+    path = (env or {}).get("PATH") or os.environ.get("PATH", "")
+    if _cocotb_major_version(path) >= 2:
+        alternatives = "|".join(re.escape(name) for name in names)
+        return {"COCOTB_TEST_FILTER": rf"(?:^|\.)(?:{alternatives})$"}
+    return {"TESTCASE": ",".join(names)}
+
+
+@functools.cache
+def _cocotb_major_version(path: str) -> int:
+    """Major version of the cocotb on path (0 if unknown)."""
+    config = shutil.which("cocotb-config", path=path)
+    if config is None:
+        return 0
+    result = run_command([config, "--version"], capture_output=True, text=True)
+    match = re.match(r"\s*(\d+)\.", result.stdout)
+    return int(match[1]) if result.returncode == 0 and match else 0
+
+
+def _is_cocotb_test(decorator: ast.expr) -> bool:
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return (
+            decorator.attr == "test"
+            and isinstance(decorator.value, ast.Name)
+            and decorator.value.id == "cocotb"
+        )
+    return isinstance(decorator, ast.Name) and decorator.id == "test"
+
+
+def _is_skipped(decorator: ast.expr) -> bool:
+    return isinstance(decorator, ast.Call) and any(
+        k.arg == "skip" and isinstance(k.value, ast.Constant) and k.value.value
+        for k in decorator.keywords
+    )
+
+
+def results_have_failures(results_xml: Path) -> bool:
+    """Whether a cocotb results.xml records a failed (or no) testcase."""
+    try:
+        statuses = [case.status for case in iter_testcases(results_xml)]
+    except ResultsError:
+        return True
+    return not statuses or "fail" in statuses
+
+
+def worker_dir(test_dir: Path, path: Path) -> Path:
+    """Create a worker directory linking to the inputs in test_dir."""
+    path.mkdir(parents=True, exist_ok=True)
+    for entry in test_dir.iterdir():
+        if entry.name in _RUN_OUTPUTS or entry.suffix in _RUN_OUTPUT_SUFFIXES:
+            continue
+        link = path / entry.name
+        if not link.is_symlink():
+            link.symlink_to(entry.absolute())
+    return path
+
+
+def run_testcases(
+    test_dir: Path,
+    testcases: list[str],
+    jobs: int,
+    env: dict[str, str] | None = None,
+    on_done: Callable[[CocotbRun], None] | None = None,
+    clean: bool = True,
+    make_args: list[str] | None = None,
+) -> list[CocotbRun]:
+    """Run each testcase in its own simulator process, jobs at a time.
+
+    Testcases are handed out in the given order to whichever worker is free.
+    Returns the runs in the order of testcases. Unless clean, the workers
+    reuse the simulations they compiled in earlier runs. make_args (e.g. a
+    shared SIM_BUILD) are passed to every make.
+    """
+    jobs_root = test_dir / "sim_build" / "jobs"
+    if clean:
+        shutil.rmtree(jobs_root, ignore_errors=True)
+    workers = min(jobs, len(testcases))
+    workdirs = [worker_dir(test_dir, jobs_root / str(i)) for i in range(workers)]
+
+    queue = list(testcases)
+    runs: dict[str, CocotbRun] = {}
+    lock = threading.Lock()
+    python_path = os.pathsep.join(
+        p for p in (str(test_dir.absolute()), os.environ.get("PYTHONPATH")) if p
+    )
+
+    def work(workdir: Path) -> None:
+        while True:
+            with lock:
+                if not queue:
+                    return
+                name = queue.pop(0)
+            (workdir / "results.xml").unlink(missing_ok=True)
+            start = time.monotonic()
+            result = run_make(
+                str(workdir),
+                *(make_args or []),
+                env={
+                    **(env or {}),
+                    **select_testcases([name], env),
+                    "PWD": str(test_dir.absolute()),
+                    "PYTHONPATH": python_path,
+                },
+                capture=True,
+            )
+            duration = time.monotonic() - start
+            log = workdir / f"{name}.log"
+            log.write_text(result.stdout + result.stderr)
+            results = workdir / f"{name}.xml"
+            if _readable(workdir / "results.xml"):
+                (workdir / "results.xml").replace(results)
+            else:
+                _write_crash_results(results, name, result.returncode, duration)
+            run = CocotbRun(name, result.returncode, duration, results, log)
+            with lock:
+                runs[name] = run
+                if on_done is not None:
+                    on_done(run)
+
+    threads = [threading.Thread(target=work, args=(d,)) for d in workdirs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [runs[name] for name in testcases]
+
+
+def merge_results(sources: list[Path], dest: Path) -> int:
+    """Merge cocotb results.xml files into one with a single testsuite.
+
+    The testcases are streamed from the sources, so memory use does not
+    depend on their size. Returns the number of testcases. Raises
+    ResultsError (leaving dest alone) if a source cannot be read.
+    """
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    count = 0
+    try:
+        with open(tmp, "w") as out:
+            out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            out.write('<testsuites name="results">\n')
+            out.write('  <testsuite name="all" package="all">\n')
+            for source in sources:
+                for testcase in iter_testcase_elements(source):
+                    ET.indent(testcase, level=2)
+                    testcase.tail = "\n"
+                    out.write("    " + ET.tostring(testcase, encoding="unicode"))
+                    count += 1
+            out.write("  </testsuite>\n</testsuites>\n")
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return count
+
+
+def _readable(results_xml: Path) -> bool:
+    try:
+        for _ in iter_testcases(results_xml):
+            pass
+    except ResultsError:
+        return False
+    return True
+
+
+def _write_crash_results(path: Path, name: str, returncode: int, duration: float):
+    """results.xml for a simulator run that did not write one."""
+    suite = ET.Element("testsuites", name="results")
+    testcase = ET.SubElement(
+        ET.SubElement(suite, "testsuite", name="all", package="all"),
+        "testcase",
+        name=name,
+        time=f"{duration:.3f}",
+    )
+    ET.SubElement(
+        testcase,
+        "failure",
+        message=f"simulator exited with status {returncode} without results",
+    )
+    ET.ElementTree(suite).write(path, encoding="unicode", xml_declaration=True)
@@ -0,0 +1,137 @@
+"""Resource usage tracing of external commands ('tt --trace out.json ...').
+
+Nearly all of the CLI's time is spent in subprocesses (make, LibreLane,
+precheck, git, pip, nix-shell, ...). They are started through the helpers in
+tinytapeout.cli.runner, which reap each child with wait4() and, while tracing
+is enabled, record it here with its command, wall time, user/system CPU time
+and peak RSS (wait4() reports the usage of the child and the descendants it
+waited for). Each command is attributed to the build step it ran in
+(trace_step), and steps are recorded as spans themselves.
+
+The trace is written in the Chrome trace event format, which chrome://tracing
+and https://ui.perfetto.dev open directly.
+"""
+
+import contextvars
+import json
+import os
+import shlex
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+_current_step: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "tt_trace_step", default=None
+)
+_tracer: "Tracer | None" = None
+
+
+class Tracer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, category: str, start: float, end: float, **args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.start) * 1e6),
+            "dur": round((end - start) * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def to_json(self) -> dict:
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["ts"])
+        meta = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "args": {"name": "tt"},
+        }
+        return {"traceEvents": [meta, *events], "displayTimeUnit": "ms"}
+
+    def write(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_json(), indent=1) + "\n")
+
+
+def current_step() -> str | None:
+    return _current_step.get()
+
+
+@contextmanager
+def trace_step(name: str) -> Iterator[None]:
+    """Attribute commands run inside the block to step name (nested: a > b)."""
+    parent = _current_step.get()
+    path = f"{parent} > {name}" if parent else name
+    token = _current_step.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current_step.reset(token)
+        if _tracer is not None:
+            _tracer.add_span(name, "step", start, time.perf_counter(), step=path)
+
+
+def enable_tracing() -> Tracer:
+    """Start recording commands. Returns the tracer to write out later."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing() -> None:
+    global _tracer
+    _tracer = None
+
+
+def record_command(
+    args,
+    start: float,
+    returncode: int,
+    usage=None,
+    step: str | None = None,
+) -> None:
+    """Record a finished command (started at perf_counter() start) if tracing.
+
+    usage is the resource.struct_rusage from wait4(), if available.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return
+    name, command = _command_name(args)
+    span = {"command": command, "returncode": returncode}
+    if step:
+        span["step"] = step
+    if usage is not None:
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        scale = 1 if os.uname().sysname == "Darwin" else 1024
+        span["user_cpu_s"] = round(usage.ru_utime, 3)
+        span["sys_cpu_s"] = round(usage.ru_stime, 3)
+        span["max_rss_mb"] = round(usage.ru_maxrss * scale / (1 << 20), 1)
+    tracer.add_span(name, "subprocess", start, time.perf_counter(), **span)
+
+
+def _command_name(args) -> tuple[str, str]:
+    """Short span name and full command line of Popen args."""
+    if isinstance(args, str | bytes | os.PathLike):
+        command = os.fsdecode(args)
+        argv = command.split()
+    else:
+        argv = [os.fsdecode(a) for a in args]
+        command = shlex.join(argv)
+    if not argv:
+        return command, command
+    name = os.path.basename(argv[0])
+    if len(argv) > 1 and not argv[1].startswith("-"):
+        name += f" {os.path.basename(argv[1])}"
+    return name, command
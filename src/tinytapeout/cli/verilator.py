@@ -0,0 +1,92 @@
+"""Verilator backend for 'tt test --sim verilator'.
+
+The project's cocotb Makefile is reused as is: SIM=verilator selects cocotb's
+Verilator makefile, and the extra Verilator arguments (timing support for the
+testbench's delays, non-fatal lint warnings, --threads) are passed in
+EXTRA_ARGS, which the Makefile appends to. The model is built in its own
+SIM_BUILD, so switching between simulators does not throw away either build.
+
+Compiling the C++ model is the slow part, so it is built once per run (the
+'$(SIM_BUILD)/Vtop' target) and then shared by all testcase workers. Built
+models are also stored in the user cache, keyed on the fingerprint of the
+HDL inputs and the Verilator arguments: returning to sources that were
+compiled before (another branch, an undone edit) restores the model instead
+of recompiling it.
+"""
+
+import os
+import tarfile
+import time
+from pathlib import Path
+
+from packaging.version import InvalidVersion, Version
+
+from tinytapeout.cli.cache import ArtifactCache
+
+VERILATOR_CACHE_BYTES = 4 << 30
+# Designs smaller than this gain nothing from a multithreaded model
+MIN_THREADED_SOURCE_BYTES = 256 << 10
+MAX_THREADS = 4
+
+
+def sim_build_dir(mode: str) -> str:
+    """SIM_BUILD for Verilator builds, relative to test/."""
+    return f"sim_build/verilator-{mode}"
+
+
+def default_threads(jobs: int, inputs: list[Path]) -> int:
+    """Model threads: only for large designs, and not when testcases run in
+    parallel (the workers already use the cores)."""
+    if jobs > 1:
+        return 1
+    size = sum(path.stat().st_size for path in inputs)
+    if size < MIN_THREADED_SOURCE_BYTES:
+        return 1
+    return max(1, min(MAX_THREADS, os.cpu_count() or 1))
+
+
+def verilator_args(version: str | None, threads: int) -> str:
+    args = ["-Wno-fatal"]
+    try:
+        if version and Version(version) >= Version("5"):
+            args.append("--timing")
+    except InvalidVersion:
+        pass
+    if threads > 1:
+        args.append(f"--threads {threads}")
+    return " ".join(args)
+
+
+def verilator_model_cache() -> ArtifactCache:
+    return ArtifactCache("verilator-models", VERILATOR_CACHE_BYTES)
+
+
+def restore_model(cache: ArtifactCache, key: str, build_dir: Path) -> bool:
+    """Unpack a cached model into build_dir. Returns False on a miss."""
+    archive = cache.get(key, ".tar")
+    if archive is None:
+        return False
+    build_dir.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(archive) as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(build_dir, filter="data")
+        else:
+            tar.extractall(build_dir)  # the archive was written by store_model
+    # Newer than the sources, so that make considers the model up to date
+    now = time.time()
+    for root, _, files in os.walk(build_dir):
+        for name in files:
+            os.utime(os.path.join(root, name), (now, now))
+    return True
+
+
+def store_model(cache: ArtifactCache, key: str, build_dir: Path) -> None:
+    """Archive build_dir in the cache (object files and all)."""
+    tmp = build_dir.with_name(f".{build_dir.name}.tar")
+    try:
+        with tarfile.open(tmp, "w") as tar:
+            for entry in sorted(build_dir.iterdir()):
+                tar.add(entry, arcname=entry.name)
+        cache.put(key, tmp, ".tar")
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -0,0 +1,210 @@
+"""Local 3D layout viewer for 'tt gds view 3d --local'.
+
+The final GDS is converted once into a layer-stacked box mesh, extruded between
+each drawn layer's z range. The full-detail level cuts every polygon into
+rectangles (exact for Manhattan shapes). Coarser levels of detail start from
+the polygons' bounding boxes and replace those smaller than a grid cell with
+one box per occupied cell, so the browser can show a coarse level immediately
+and refine as the camera gets closer.
+
+Meshes are gzip-compressed and cached by GDS content hash, and served together
+with a small three.js page from a localhost-only HTTP server. The layout never
+leaves the machine, but the page loads three.js itself from the unpkg CDN, so
+the browser needs network access (or a cached copy) to show it.
+"""
+
+import gzip
+import json
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import resources
+from pathlib import Path
+
+from tinytapeout.cli.cache import ArtifactCache, cache_key
+from tinytapeout.cli.hashing import hash_file
+from tinytapeout.cli.layout import LayoutGeometry, load_layout
+from tinytapeout.cli.render import RenderedLayer, render_layers
+from tinytapeout.tech import TechName, tech_map
+
+# Bump when the mesh format changes, to invalidate cached meshes
+_MESH_VERSION = 2
+MESH_CACHE_BYTES = 512 << 20
+# Grid cells across the larger die side for each coarse level of detail
+LOD_CELLS = (1024, 256, 64)
+LAYER_THICKNESS = 0.6  # in units of layer pitch
+
+
+@dataclass
+class Mesh:
+    manifest: dict
+    levels: list[bytes] = field(default_factory=list)  # gzipped float32 boxes
+
+
+def decimate(boxes, grid: float, origin: tuple[float, float]):
+    """Keep boxes at least one grid cell in size; replace the smaller ones with
+    one box per grid cell that contains a small box's center."""
+    import numpy as np
+
+    size = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    large = boxes[size >= grid]
+    small = boxes[size < grid]
+    if not len(small):
+        return large
+    centers = np.stack(
+        [(small[:, 0] + small[:, 2]) / 2, (small[:, 1] + small[:, 3]) / 2], axis=1
+    )
+    cells = np.unique(np.floor((centers - origin) / grid), axis=0)
+    corners = cells * grid + origin
+    return np.concatenate([large, np.concatenate([corners, corners + grid], axis=1)])
+
+
+def build_mesh(
+    geom: LayoutGeometry, drawn: list[RenderedLayer], tech: TechName
+) -> Mesh:
+    """Convert a flattened layout into a multi-level box mesh."""
+    import numpy as np
+
+    bbox = geom.bbox()
+    if bbox is None:
+        raise ValueError("GDS file contains no polygons")
+    x0, y0, x1, y1 = bbox
+    extent = max(x1 - x0, y1 - y0)
+    keys = geom.layer_keys()
+    all_boxes = geom.polygon_bboxes()
+    rects, rect_polygons = geom.polygon_rectangles()
+    rect_keys = keys[rect_polygons]
+    stack = list(tech_map[tech].drawing_layers)
+
+    layer_keys = [layer.layer[0] * 65536 + layer.layer[1] for layer in drawn]
+    exact = [rects[rect_keys == key] for key in layer_keys]
+    bounding = [all_boxes[keys == key] for key in layer_keys]
+    grids = [0.0] + [extent / cells for cells in LOD_CELLS]
+
+    mesh = Mesh(
+        manifest={
+            "top_cell": geom.top_cell,
+            "bbox": [x0, y0, x1, y1],
+            "layers": [
+                {
+                    "name": layer.name,
+                    "layer": list(layer.layer),
+                    "color": "#{:02x}{:02x}{:02x}".format(*layer.color),
+                    "z": stack.index(layer.name),
+                    "thickness": LAYER_THICKNESS,
+                }
+                for layer in drawn
+            ],
+            "levels": [],
+        }
+    )
+    for grid in grids:
+        chunks, layers, offset = [], [], 0
+        for index in range(len(drawn)):
+            boxes = exact[index]
+            if grid and len(bounding[index]):
+                boxes = decimate(bounding[index], grid, (x0, y0))
+            # Relative to the die origin, so float32 keeps sub-nm precision
+            chunks.append((boxes - [x0, y0, x0, y0]).astype(np.float32))
+            layers.append({"index": index, "offset": offset, "count": len(boxes)})
+            offset += len(boxes)
+        levels = mesh.manifest["levels"]
+        if levels and levels[-1]["boxes"] == offset:
+            continue  # nothing was small enough to merge at this grid
+        data = np.concatenate(chunks).tobytes() if chunks else b""
+        mesh.levels.append(gzip.compress(data, 6))
+        levels.append(
+            {"level": len(levels), "grid": grid, "boxes": offset, "layers": layers}
+        )
+    return mesh
+
+
+def load_mesh(
+    gds_path: str | Path,
+    tech: TechName,
+    top_cell: str | None = None,
+    cache: ArtifactCache | None = None,
+) -> tuple[Mesh, bool]:
+    """Return the mesh for a GDS, from the cache if possible.
+
+    Returns (mesh, cached).
+    """
+    cache = cache or ArtifactCache("meshes", MESH_CACHE_BYTES)
+    drawn = render_layers(tech)
+    key = cache_key(
+        "mesh",
+        _MESH_VERSION,
+        hash_file(gds_path),
+        tech,
+        top_cell,
+        [(layer.layer, layer.color) for layer in drawn],
+    )
+
+    manifest_path = cache.get(key, ".json")
+    if manifest_path is not None:
+        manifest = json.loads(manifest_path.read_text())
+        paths = [
+            cache.get(key, f".lod{i}.bin.gz") for i in range(len(manifest["levels"]))
+        ]
+        # Entries are evicted one by one; rebuild if any level is gone
+        if all(paths):
+            return Mesh(manifest, [p.read_bytes() for p in paths]), True
+
+    mesh = build_mesh(load_layout(gds_path, top_cell), drawn, tech)
+    for i, data in enumerate(mesh.levels):
+        cache.put_bytes(key, data, f".lod{i}.bin.gz")
+    cache.put_bytes(key, json.dumps(mesh.manifest).encode(), ".json")
+    return mesh, False
+
+
+def _make_handler(mesh: Mesh):
+    page = resources.files("tinytapeout.cli").joinpath("viewer3d.html").read_bytes()
+    manifest = json.dumps(mesh.manifest).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "tt-viewer"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path in ("/", "/index.html"):
+                self._send(page, "text/html; charset=utf-8")
+            elif path == "/mesh/manifest.json":
+                self._send(manifest, "application/json")
+            elif path.startswith("/mesh/lod") and path.endswith(".bin"):
+                level = path.removeprefix("/mesh/lod").removesuffix(".bin")
+                if not level.isdigit() or int(level) >= len(mesh.levels):
+                    self._send(b"Not found", "text/plain", status=404)
+                    return
+                self._send_gzipped(mesh.levels[int(level)])
+            else:
+                self._send(b"Not found", "text/plain", status=404)
+
+        def _send(self, data: bytes, content_type: str, status: int = 200):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_gzipped(self, data: bytes):
+            # Levels are stored compressed; only inflate for clients without gzip
+            if "gzip" not in self.headers.get("Accept-Encoding", ""):
+                self._send(gzip.decompress(data), "application/octet-stream")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def create_server(mesh: Mesh, port: int = 0) -> ThreadingHTTPServer:
+    """Create (but do not start) a localhost server for the viewer."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(mesh))
+    server.daemon_threads = True
+    return server
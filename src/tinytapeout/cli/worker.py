@@ -0,0 +1,440 @@
+"""Remote build worker — the server side of 'tt gds build --remote'.
+
+The worker keeps a content-addressed blob store and one persistent workspace per
+client project. A job materializes the uploaded inputs into its workspace, runs
+'tt gds build' there, and publishes the final artifacts into the blob store for
+the client to download. See tinytapeout.cli.remote for the protocol.
+
+Builds run project-supplied configs and Verilog, so every request must carry
+the worker's shared token ("Authorization: Bearer <token>") when it has one,
+and a worker listening on anything but a loopback address must have one.
+
+The blob store has a size budget: after each job, the least recently used
+blobs beyond it are removed, except those of queued or running jobs and
+blobs used within the last hour (uploaded for a job about to be submitted,
+or artifacts not yet downloaded).
+"""
+
+import hmac
+import ipaddress
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from tinytapeout.cli.hashing import hash_file, is_digest, new_hash
+from tinytapeout.cli.remote import (
+    ARTIFACT_PATHS,
+    INPUT_PATHS,
+    PROTOCOL_VERSION,
+    collect_files,
+    is_allowed_path,
+)
+from tinytapeout.cli.runner import run_command
+
+_CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_BLOB_BYTES = 20 << 30
+# Blobs used more recently than this (in seconds) are never evicted
+EVICT_GRACE = 3600.0
+
+
+class BlobStore:
+    """Immutable files stored under their content hash.
+
+    Looking a blob up refreshes its mtime, which evict() uses as the time it
+    was last used.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BLOB_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        try:
+            os.utime(self.path(digest))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def evict(self, keep: set[str], now: float | None = None) -> int:
+        """Remove least recently used blobs beyond the size budget, except
+        those in keep and those used within EVICT_GRACE. Returns bytes freed."""
+        now = time.time() if now is None else now
+        entries = []
+        for path in self.root.glob("*/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for mtime, size, path in sorted(entries, key=lambda e: e[0]):
+            if total - freed <= self.max_bytes or now - mtime < EVICT_GRACE:
+                break
+            if path.name in keep:
+                continue
+            path.unlink(missing_ok=True)
+            freed += size
+        return freed
+
+    def put_stream(self, stream, length: int, digest: str) -> bool:
+        """Store length bytes from stream, verifying they hash to digest."""
+        h = new_hash()
+        with tempfile.NamedTemporaryFile(dir=self.root, delete=False) as tmp:
+            remaining = length
+            while remaining > 0:
+                chunk = stream.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                h.update(chunk)
+                tmp.write(chunk)
+                remaining -= len(chunk)
+        if remaining or h.hexdigest() != digest:
+            os.unlink(tmp.name)
+            return False
+        self._commit(Path(tmp.name), digest)
+        return True
+
+    def put_file(self, path: Path) -> str:
+        """Copy a file into the store and return its digest."""
+        digest = hash_file(path)
+        if not self.has(digest):
+            fd, tmp = tempfile.mkstemp(dir=self.root)
+            os.close(fd)
+            shutil.copyfile(path, tmp)
+            self._commit(Path(tmp), digest)
+        return digest
+
+    def _commit(self, tmp: Path, digest: str) -> None:
+        dest = self.path(digest)
+        dest.parent.mkdir(exist_ok=True)
+        os.replace(tmp, dest)
+
+
+@dataclass
+class Job:
+    id: str
+    workspace: Path
+    log_path: Path
+    files: dict[str, str]
+    no_docker: bool
+    git: dict[str, str]
+    state: str = "queued"  # queued | running | succeeded | failed
+    returncode: int | None = None
+    artifacts: dict[str, str] = field(default_factory=dict)
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def status(self) -> dict:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "returncode": self.returncode,
+            "artifacts": self.artifacts,
+        }
+
+
+class JobError(Exception):
+    pass
+
+
+class BuildWorker:
+    def __init__(
+        self,
+        workdir: Path,
+        *,
+        tt_tools_dir: Path | None = None,
+        max_jobs: int = 1,
+        max_blob_bytes: int = DEFAULT_MAX_BLOB_BYTES,
+    ):
+        self.workdir = workdir
+        self.tt_tools_dir = tt_tools_dir
+        self.blobs = BlobStore(workdir / "blobs", max_blob_bytes)
+        self.jobs: dict[str, Job] = {}
+        self._slots = threading.Semaphore(max_jobs)
+        self._workspace_locks: dict[Path, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, spec: dict) -> Job:
+        """Validate a job request and start it in the background."""
+        project = str(spec.get("project", ""))
+        if not project or "/" in project or project.startswith("."):
+            raise JobError(f"Invalid project name: {project!r}")
+        files = spec.get("files")
+        if not isinstance(files, dict) or "info.yaml" not in files:
+            raise JobError("Job must include info.yaml")
+        for rel, digest in files.items():
+            _check_input_path(rel)
+            if not is_digest(digest) or not self.blobs.has(digest):
+                raise JobError(f"Missing blob for {rel}")
+
+        job_id = uuid.uuid4().hex
+        logs_dir = self.workdir / "logs"
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        job = Job(
+            id=job_id,
+            workspace=self.workdir / "projects" / project,
+            log_path=logs_dir / f"{job_id}.log",
+            files=files,
+            no_docker=bool(spec.get("no_docker")),
+            git=spec.get("git") or {},
+        )
+        job.log_path.touch()
+        with self._lock:
+            self.jobs[job_id] = job
+            lock = self._workspace_locks.setdefault(job.workspace, threading.Lock())
+        threading.Thread(target=self._run, args=(job, lock), daemon=True).start()
+        return job
+
+    def build_command(self, job: Job) -> list[str]:
+        """Command that builds the project in the job's workspace."""
+        cmd = [sys.executable, "-m", "tinytapeout", "gds", "build"]
+        cmd.extend(["--project-dir", str(job.workspace)])
+        if job.no_docker:
+            cmd.append("--no-docker")
+        return cmd
+
+    def _run(self, job: Job, workspace_lock: threading.Lock) -> None:
+        with self._slots, workspace_lock:
+            job.state = "running"
+            try:
+                self._prepare_workspace(job)
+                env = os.environ.copy()
+                if job.git.get("remote"):
+                    env["TT_GIT_REMOTE_URL"] = job.git["remote"]
+                if job.git.get("commit"):
+                    env["TT_GIT_COMMIT"] = job.git["commit"]
+                with open(job.log_path, "ab") as log:
+                    result = run_command(
+                        self.build_command(job),
+                        cwd=str(job.workspace),
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                        env=env,
+                    )
+                job.returncode = result.returncode
+                if result.returncode == 0:
+                    artifacts = collect_files(job.workspace, ARTIFACT_PATHS)
+                    job.artifacts = {
+                        rel: self.blobs.put_file(path)
+                        for rel, path in artifacts.items()
+                    }
+                    job.state = "succeeded"
+                else:
+                    job.state = "failed"
+            except Exception as e:
+                with open(job.log_path, "a") as log:
+                    log.write(f"\nWorker error: {e}\n")
+                job.state = "failed"
+            finally:
+                job.done.set()
+        self._evict_blobs(job)
+
+    def _evict_blobs(self, finished: Job) -> None:
+        """Trim the blob store, keeping what pending jobs and the client of
+        the finished one still need."""
+        keep = set(finished.artifacts.values())
+        with self._lock:
+            for job in self.jobs.values():
+                if job.state in ("queued", "running"):
+                    keep.update(job.files.values())
+        self.blobs.evict(keep)
+
+    def _prepare_workspace(self, job: Job) -> None:
+        """Sync the workspace inputs with the job manifest."""
+        ws = job.workspace
+        ws.mkdir(parents=True, exist_ok=True)
+
+        for rel, path in collect_files(ws, INPUT_PATHS).items():
+            if rel not in job.files:
+                path.unlink()
+        for rel, digest in job.files.items():
+            dest = ws / rel
+            if dest.is_file() and hash_file(dest) == digest:
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            # Copy rather than link: the build rewrites some inputs in place
+            shutil.copyfile(self.blobs.path(digest), dest)
+
+        if self.tt_tools_dir and not (ws / "tt").exists():
+            (ws / "tt").symlink_to(self.tt_tools_dir.resolve())
+
+        # tt-support-tools expects a git repository with an origin remote
+        if not (ws / ".git").exists():
+            run_command(["git", "init", "-q"], cwd=str(ws), capture_output=True)
+            if job.git.get("remote"):
+                run_command(
+                    ["git", "remote", "add", "origin", job.git["remote"]],
+                    cwd=str(ws),
+                    capture_output=True,
+                )
+
+
+def _check_input_path(rel: str) -> None:
+    if not is_allowed_path(rel, INPUT_PATHS):
+        raise JobError(f"Unexpected input path: {rel}")
+
+
+def _make_handler(worker: BuildWorker, token: str | None):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "tt-worker"
+
+        def log_message(self, format, *args):
+            pass
+
+        def parse_request(self) -> bool:
+            # Checks the token before any do_* method sees the request
+            if not super().parse_request():
+                return False
+            if token is None:
+                return True
+            sent = self.headers.get("Authorization", "")
+            if hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+                return True
+            self.close_connection = True  # any request body is left unread
+            self._error(401, "Missing or invalid worker token")
+            return False
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if parts == ["v1", "info"]:
+                self._json({"protocol": PROTOCOL_VERSION})
+            elif len(parts) == 3 and parts[:2] == ["v1", "blobs"]:
+                self._send_blob(parts[2])
+            elif len(parts) == 3 and parts[:2] == ["v1", "jobs"]:
+                job = worker.jobs.get(parts[2])
+                if job is None:
+                    self._error(404, "Unknown job")
+                else:
+                    self._json(job.status())
+            elif len(parts) == 4 and parts[:2] == ["v1", "jobs"] and parts[3] == "log":
+                job = worker.jobs.get(parts[2])
+                if job is None:
+                    self._error(404, "Unknown job")
+                else:
+                    self._stream_log(job)
+            else:
+                self._error(404, "Not found")
+
+        def do_POST(self):
+            parts = self.path.strip("/").split("/")
+            try:
+                body = json.loads(self._read_body() or b"{}")
+            except ValueError:
+                self._error(400, "Invalid JSON")
+                return
+            if parts == ["v1", "blobs", "missing"]:
+                hashes = body.get("hashes", [])
+                missing = [
+                    h for h in hashes if not (is_digest(h) and worker.blobs.has(h))
+                ]
+                self._json({"missing": missing})
+            elif parts == ["v1", "jobs"]:
+                try:
+                    job = worker.submit(body)
+                except JobError as e:
+                    self._error(400, str(e))
+                    return
+                self._json({"id": job.id}, status=201)
+            else:
+                self._error(404, "Not found")
+
+        def do_PUT(self):
+            parts = self.path.strip("/").split("/")
+            if (
+                len(parts) != 3
+                or parts[:2] != ["v1", "blobs"]
+                or not is_digest(parts[2])
+            ):
+                self._error(404, "Not found")
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            if not worker.blobs.put_stream(self.rfile, length, parts[2]):
+                self._error(400, "Content does not match hash")
+                return
+            self._json({}, status=201)
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get("Content-Length", 0))
+            return self.rfile.read(length)
+
+        def _json(self, data: dict, status: int = 200):
+            payload = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _error(self, status: int, message: str):
+            self._json({"error": message}, status=status)
+
+        def _send_blob(self, digest: str):
+            if not (is_digest(digest) and worker.blobs.has(digest)):
+                self._error(404, "Unknown blob")
+                return
+            path = worker.blobs.path(digest)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(path.stat().st_size))
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, _CHUNK_SIZE)
+
+        def _stream_log(self, job: Job):
+            # No Content-Length: the client reads until the connection closes
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+            with open(job.log_path, "rb") as log:
+                while True:
+                    finished = job.done.is_set()
+                    chunk = log.read(_CHUNK_SIZE)
+                    if chunk:
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                    elif finished:
+                        break
+                    else:
+                        time.sleep(0.2)
+
+    return Handler
+
+
+def create_server(
+    worker: BuildWorker, host: str, port: int, token: str | None = None
+) -> ThreadingHTTPServer:
+    """Create (but do not start) the HTTP server for a worker.
+
+    Raises ValueError if host is not a loopback address and there is no token.
+    """
+    if not token and not _is_loopback(host):
+        raise ValueError(
+            f"Refusing to listen on {host} without a token: anyone who can reach "
+            "the worker could run builds on it."
+        )
+    server = ThreadingHTTPServer((host, port), _make_handler(worker, token or None))
+    server.daemon_threads = True
+    return server
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # a host name could resolve to anything
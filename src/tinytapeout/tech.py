@@ -54,6 +54,8 @@ class Tech(Protocol):
     extra_logo_macros: list[str]
     prboundary_layer: tuple[int, int]
     logo_layer: tuple[int, int]
+    drawing_layers: dict[str, tuple[int, int]]
+    layer_colors: dict[str, str]
     logo_layer_name: str
     logo_pixel_size: float
 
@@ -118,6 +120,38 @@ class Sky130Tech(Tech):
     extra_logo_macros = []
     prboundary_layer = (235, 4)  # prBoundary.boundary
     logo_layer = (71, 20)  # met4.drawing
+    # Bottom to top
+    drawing_layers = {
+        "nwell": (64, 20),
+        "diff": (65, 20),
+        "tap": (65, 44),
+        "poly": (66, 20),
+        "licon1": (66, 44),
+        "li1": (67, 20),
+        "mcon": (67, 44),
+        "met1": (68, 20),
+        "via": (68, 44),
+        "met2": (69, 20),
+        "via2": (69, 44),
+        "met3": (70, 20),
+        "via3": (70, 44),
+        "met4": (71, 20),
+        "via4": (71, 44),
+        "met5": (72, 20),
+    }
+    # Layers drawn by 'tt gds view 2d', composited bottom to top
+    layer_colors = {
+        "nwell": "#9ec3e6",
+        "diff": "#3fbf3f",
+        "tap": "#3fbf3f",
+        "poly": "#d94c4c",
+        "li1": "#8c6fd1",
+        "met1": "#4f8fdb",
+        "met2": "#d98cd9",
+        "met3": "#5fbfbf",
+        "met4": "#e0b040",
+        "met5": "#c08040",
+    }
     logo_layer_name = "met4"
     logo_pixel_size = 0.5  # um
 
@@ -172,6 +206,39 @@ class IHPTech(Tech):
     ]
     prboundary_layer = (189, 4)  # prBoundary.boundary
     logo_layer = (67, 0)  # Metal5.drawing
+    # Bottom to top
+    drawing_layers = {
+        "NWell": (31, 0),
+        "Activ": (1, 0),
+        "GatPoly": (5, 0),
+        "Cont": (6, 0),
+        "Metal1": (8, 0),
+        "Via1": (19, 0),
+        "Metal2": (10, 0),
+        "Via2": (29, 0),
+        "Metal3": (30, 0),
+        "Via3": (49, 0),
+        "Metal4": (50, 0),
+        "Via4": (66, 0),
+        "Metal5": (67, 0),
+        "TopVia1": (125, 0),
+        "TopMetal1": (126, 0),
+        "TopVia2": (133, 0),
+        "TopMetal2": (134, 0),
+    }
+    # Layers drawn by 'tt gds view 2d', composited bottom to top
+    layer_colors = {
+        "NWell": "#9ec3e6",
+        "Activ": "#3fbf3f",
+        "GatPoly": "#d94c4c",
+        "Metal1": "#4f8fdb",
+        "Metal2": "#d98cd9",
+        "Metal3": "#5fbfbf",
+        "Metal4": "#e0b040",
+        "Metal5": "#c08040",
+        "TopMetal1": "#a0a0a0",
+        "TopMetal2": "#707070",
+    }
     logo_layer_name = "Metal5"
     logo_pixel_size = 0.25  # um
 
@@ -236,6 +303,33 @@ class GF180MCUDTech(Tech):
     extra_logo_macros = []
     prboundary_layer = (0, 0)  # PR_bndry
     logo_layer = (46, 0)  # Metal4
+    # Bottom to top
+    drawing_layers = {
+        "Nwell": (21, 0),
+        "COMP": (22, 0),
+        "Poly2": (30, 0),
+        "Contact": (33, 0),
+        "Metal1": (34, 0),
+        "Via1": (35, 0),
+        "Metal2": (36, 0),
+        "Via2": (38, 0),
+        "Metal3": (42, 0),
+        "Via3": (40, 0),
+        "Metal4": (46, 0),
+        "Via4": (41, 0),
+        "Metal5": (81, 0),
+    }
+    # Layers drawn by 'tt gds view 2d', composited bottom to top
+    layer_colors = {
+        "Nwell": "#9ec3e6",
+        "COMP": "#3fbf3f",
+        "Poly2": "#d94c4c",
+        "Metal1": "#4f8fdb",
+        "Metal2": "#d98cd9",
+        "Metal3": "#5fbfbf",
+        "Metal4": "#e0b040",
+        "Metal5": "#c08040",
+    }
     logo_layer_name = "Metal4"
     logo_pixel_size = 0.325  # um
 
@@ -271,6 +365,8 @@ class FpgaTech(Tech):
     extra_logo_macros = []
     prboundary_layer = (0, 0)
     logo_layer = (0, 0)
+    drawing_layers = {}
+    layer_colors = {}
     logo_layer_name = ""
     logo_pixel_size = 0
     read_pdk_version = Tech.read_pdk_version
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+
+import pytest
+
+from tinytapeout.cli import archive as archive_module
+from tinytapeout.cli.archive import (
+    ArchiveError,
+    ArtifactStore,
+    build_commit,
+    parse_size,
+)
+
+
+def _make_build(project_dir, commit, gds=b"G" * 100):
+    final_dir = project_dir / "runs" / "wokwi" / "final"
+    (final_dir / "gds").mkdir(parents=True, exist_ok=True)
+    (final_dir / "commit_id.json").write_text(json.dumps({"commit": commit}))
+    (final_dir / "gds" / "tt_um_test.gds").write_bytes(gds)
+    (project_dir / "runs" / "wokwi" / "flow.log").write_text("log\n" * 50)
+    (project_dir / "tt_submission").mkdir(exist_ok=True)
+    (project_dir / "tt_submission" / "tt_um_test.gds").write_bytes(gds)
+
+
+def test_parse_size():
+    assert parse_size("500M") == 500 << 20
+    assert parse_size("5G") == 5 << 30
+    assert parse_size("1.5KiB") == 1536
+    assert parse_size("1024") == 1024
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_build_commit(tmp_path):
+    with pytest.raises(ArchiveError):
+        build_commit(tmp_path)
+    _make_build(tmp_path, "abc123")
+    assert build_commit(tmp_path) == "abc123"
+
+
+def test_archive_and_restore_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "CHUNK_SIZE", 16)
+    project = tmp_path / "project"
+    project.mkdir()
+    _make_build(project, "aaa111")
+    store = ArtifactStore(tmp_path / "store")
+    first = store.archive(project, "tt_um_test", "aaa111")
+    assert first.files == 4
+    assert first.new_chunks > 0
+
+    # The second build only changes the GDS; everything else is deduplicated
+    _make_build(project, "bbb222", gds=b"H" * 100)
+    second = store.archive(project, "tt_um_test", "bbb222")
+    assert second.new_chunks < first.new_chunks
+
+    store.restore(project, "tt_um_test", "aaa")
+    final_dir = project / "runs" / "wokwi" / "final"
+    assert (final_dir / "gds" / "tt_um_test.gds").read_bytes() == b"G" * 100
+    assert (project / "tt_submission" / "tt_um_test.gds").read_bytes() == b"G" * 100
+    assert build_commit(project) == "aaa111"
+    assert [s.commit for s in store.snapshots("tt_um_test")] == ["aaa111", "bbb222"]
+
+
+def test_restore_errors(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    store = ArtifactStore(tmp_path / "store")
+    _make_build(project, "abc111")
+    store.archive(project, "tt_um_test", "abc111")
+    store.archive(project, "tt_um_test", "abc222")
+    with pytest.raises(ArchiveError, match="ambiguous"):
+        store.restore(project, "tt_um_test", "abc")
+    with pytest.raises(ArchiveError, match="No archived build"):
+        store.restore(project, "tt_um_test", "fff")
+    with pytest.raises(ArchiveError, match="Invalid"):
+        store.restore(project, "tt_um_test", "../x")
+
+
+def test_evicts_least_recently_used_snapshots(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    store = ArtifactStore(tmp_path / "store")
+    for i, commit in enumerate(["c1", "c2"]):
+        _make_build(project, commit, gds=os.urandom(4000))
+        store.archive(project, "tt_um_test", commit)
+        snapshot = store.find("tt_um_test", commit)
+        os.utime(snapshot, (1000 + i, 1000 + i))
+    # Restoring c1 makes c2 the least recently used
+    store.restore(project, "tt_um_test", "c1")
+
+    store.max_bytes = store.size() + 1000
+    _make_build(project, "c3", gds=os.urandom(4000))
+    result = store.archive(project, "tt_um_test", "c3")
+    assert result.evicted == ["tt_um_test/c2"]
+    assert [s.commit for s in store.snapshots()] == ["c1", "c3"]
+    # Chunks of the evicted snapshot are gone, the others still restore
+    store.restore(project, "tt_um_test", "c1")
+    assert store.size() <= store.max_bytes
+
+
+def test_garbage_collection_waits_for_archiving(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    _make_build(project, "c1", gds=os.urandom(4000))
+    store = ArtifactStore(tmp_path / "store")
+    chunk_written = threading.Event()
+    proceed = threading.Event()
+    put_chunk = store._put_chunk
+
+    def slow_put_chunk(data):
+        result = put_chunk(data)
+        chunk_written.set()
+        proceed.wait(5)
+        return result
+
+    store._put_chunk = slow_put_chunk
+    archiver = threading.Thread(
+        target=store.archive, args=(project, "tt_um_test", "c1")
+    )
+    archiver.start()
+    assert chunk_written.wait(5)
+    # Another process's GC sees a chunk no snapshot references yet
+    collector = threading.Thread(
+        target=ArtifactStore(tmp_path / "store").collect_garbage
+    )
+    collector.start()
+    collector.join(0.2)
+    assert collector.is_alive()
+
+    proceed.set()
+    archiver.join(5)
+    collector.join(5)
+    store.restore(project, "tt_um_test", "c1")
+
+
+def test_eviction_scans_the_store_once(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    store = ArtifactStore(tmp_path / "store")
+    for i in range(5):
+        _make_build(project, f"c{i}", gds=os.urandom(4000))
+        store.archive(project, "tt_um_test", f"c{i}")
+        os.utime(store.find("tt_um_test", f"c{i}"), (1000 + i, 1000 + i))
+
+    calls = []
+    for name in ("_snapshot_chunks", "_chunk_sizes"):
+        method = getattr(store, name)
+        monkeypatch.setattr(
+            store, name, lambda m=method, n=name: calls.append(n) or m()
+        )
+    store.max_bytes = 1
+    evicted = store.evict(keep=store.find("tt_um_test", "c4"))
+    assert evicted == [f"tt_um_test/c{i}" for i in range(4)]
+    # The snapshots are read and the chunks listed once, not per eviction
+    assert sorted(calls) == ["_chunk_sizes", "_snapshot_chunks"]
+    store.restore(project, "tt_um_test", "c4")
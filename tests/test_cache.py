@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from tinytapeout.cli.cache import ArtifactCache, cache_key, cache_root
+
+
+def _write(path, size):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_cache_root_honours_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("TT_CACHE_DIR", str(tmp_path / "tt"))
+    assert cache_root() == tmp_path / "tt"
+    monkeypatch.delenv("TT_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert cache_root() == tmp_path / "xdg" / "tinytapeout"
+
+
+def test_cache_key_depends_on_all_parts():
+    assert cache_key("png", 1, [(68, 20)]) == cache_key("png", 1, [(68, 20)])
+    assert cache_key("png", 1, [(68, 20)]) != cache_key("png", 2, [(68, 20)])
+
+
+def test_put_and_get(tmp_path):
+    cache = ArtifactCache("renders", 1 << 20, root=tmp_path / "cache")
+    key = cache_key("a")
+    assert cache.get(key, ".png") is None
+    cache.put(key, _write(tmp_path / "a.png", 10), ".png")
+    hit = cache.get(key, ".png")
+    assert hit is not None and hit.read_bytes() == b"x" * 10
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache("renders", 250, root=tmp_path / "cache")
+    keys = [cache_key(i) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        path = cache.put(key, _write(tmp_path / "src", 100))
+        os.utime(path, (1000 + i, 1000 + i))
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], _write(tmp_path / "src", 100))
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+@pytest.mark.parametrize("budget", [0, 50])
+def test_never_evicts_the_new_entry(tmp_path, budget):
+    cache = ArtifactCache("renders", budget, root=tmp_path / "cache")
+    key = cache_key("big")
+    cache.put(key, _write(tmp_path / "src", 100))
+    assert cache.get(key) is not None
+
+
+def test_files_are_stored_and_restored_together(tmp_path):
+    cache = ArtifactCache("renders", 1 << 20, root=tmp_path / "cache")
+    key = cache_key("render")
+    files = [_write(tmp_path / "render.png", 10), _write(tmp_path / "render.svg", 20)]
+    assert cache.get_files(key) is None
+    cache.put_files(key, files)
+    hit = cache.get_files(key)
+    assert sorted(hit) == ["render.png", "render.svg"]
+    assert hit["render.svg"].read_bytes() == b"x" * 20
+
+    # A group missing a member (e.g. evicted) is a miss
+    hit["render.png"].unlink()
+    assert cache.get_files(key) is None
@@ -0,0 +1,114 @@
+from tinytapeout.cli.cache import ArtifactCache
+from tinytapeout.cli.cell_models import prepare_cell_models
+
+PRIMITIVES = """\
+`ifndef NO_PRIMITIVES
+primitive sky130_fd_sc_hd__udp_dff$P (Q, D, CLK);
+    output Q; reg Q; input D, CLK;
+    table
+        1 (01) : ? : 1;
+        0 (01) : ? : 0;
+    endtable
+endprimitive
+primitive sky130_fd_sc_hd__udp_mux_2to1 (X, A0, A1, S);
+    output X; input A0, A1, S;
+    table
+        0 ? 0 : 0;
+    endtable
+endprimitive
+`endif
+"""
+
+CELLS = """\
+`timescale 1ns / 1ps
+`ifdef FUNCTIONAL
+module sky130_fd_sc_hd__dfxtp (Q, CLK, D);
+    output Q; input CLK, D;
+    sky130_fd_sc_hd__udp_dff$P dff0 (Q, D, CLK);
+endmodule
+`else
+module sky130_fd_sc_hd__dfxtp (Q, CLK, D);
+    output Q; input CLK, D;
+    sky130_fd_sc_hd__udp_dff$P dff0 (Q, D, CLK);
+endmodule
+`endif
+`celldefine
+module sky130_fd_sc_hd__dfxtp_1 (Q, CLK, D);
+    output Q; input CLK, D;
+    sky130_fd_sc_hd__dfxtp base (.Q(Q), .CLK(CLK), .D(D));
+endmodule
+`endcelldefine
+module sky130_fd_sc_hd__mux2_1 (X, A0, A1, S);
+    output X; input A0, A1, S;
+    sky130_fd_sc_hd__udp_mux_2to1 m (X, A0, A1, S);
+endmodule
+module sky130_fd_sc_hd__fill_1 (); endmodule
+"""
+
+NETLIST = """\
+module tt_um_x (clk, d, q);
+ sky130_fd_sc_hd__dfxtp_1 _1_ (.CLK(clk), .D(d), .Q(q));
+endmodule
+"""
+
+
+def _pdk(tmp_path):
+    pdk_root = tmp_path / "pdk"
+    verilog = pdk_root / "sky130A" / "libs.ref" / "sky130_fd_sc_hd" / "verilog"
+    verilog.mkdir(parents=True)
+    (verilog / "primitives.v").write_text(PRIMITIVES)
+    (verilog / "sky130_fd_sc_hd.v").write_text(CELLS)
+    (verilog.parent / "lib").mkdir()
+    (pdk_root / "sky130A" / "SOURCES").write_text("open_pdks abc123\n")
+    (pdk_root / "sky130A" / "libs.tech").mkdir()
+    netlist = tmp_path / "gate_level_netlist.v"
+    netlist.write_text(NETLIST)
+    return pdk_root, netlist
+
+
+def test_models_are_reduced_to_used_cells(tmp_path):
+    pdk_root, netlist = _pdk(tmp_path)
+    cache = ArtifactCache("cell-models", 1 << 20, root=tmp_path / "cache")
+    mirror = prepare_cell_models(
+        netlist, "sky130A", str(pdk_root), tmp_path / "mirror", cache
+    )
+
+    verilog = mirror / "sky130A" / "libs.ref" / "sky130_fd_sc_hd" / "verilog"
+    cells = (verilog / "sky130_fd_sc_hd.v").read_text()
+    assert cells.count("module sky130_fd_sc_hd__dfxtp ") == 2
+    assert "sky130_fd_sc_hd__dfxtp_1 (" in cells
+    assert "mux2" not in cells and "fill_1" not in cells
+    assert cells.count("`ifdef FUNCTIONAL") == 1 and "`celldefine" in cells
+    primitives = (verilog / "primitives.v").read_text()
+    assert "udp_dff$P" in primitives and "mux_2to1" not in primitives
+    assert "`endif" in primitives
+
+    # Everything else links to the real PDK
+    assert (mirror / "sky130A" / "libs.tech").is_symlink()
+    assert (mirror / "sky130A" / "SOURCES").read_text() == "open_pdks abc123\n"
+    assert (verilog.parent / "lib").is_symlink()
+
+
+def test_reduced_models_are_cached_and_stable(tmp_path):
+    pdk_root, netlist = _pdk(tmp_path)
+    cache = ArtifactCache("cell-models", 1 << 20, root=tmp_path / "cache")
+    mirror = prepare_cell_models(
+        netlist, "sky130A", str(pdk_root), tmp_path / "mirror", cache
+    )
+    model = mirror / "sky130A/libs.ref/sky130_fd_sc_hd/verilog/sky130_fd_sc_hd.v"
+    mtime = model.stat().st_mtime_ns
+
+    # A second run with the same PDK version reads the cache, not the PDK
+    (pdk_root / "sky130A/libs.ref/sky130_fd_sc_hd/verilog/sky130_fd_sc_hd.v").unlink()
+    (pdk_root / "sky130A/libs.ref/sky130_fd_sc_hd/verilog/sky130_fd_sc_hd.v").touch()
+    prepare_cell_models(netlist, "sky130A", str(pdk_root), tmp_path / "mirror", cache)
+    assert model.stat().st_mtime_ns == mtime
+    assert "dfxtp_1" in model.read_text()
+
+
+def test_missing_models(tmp_path):
+    netlist = tmp_path / "netlist.v"
+    netlist.write_text(NETLIST)
+    assert (
+        prepare_cell_models(netlist, "sky130A", str(tmp_path), tmp_path / "m") is None
+    )
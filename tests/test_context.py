@@ -1,8 +1,11 @@
+import threading
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import yaml
 
-from tinytapeout.cli.context import detect_context, detect_tech
+from tinytapeout.cli.context import ProjectContext, detect_context, detect_tech
 from tinytapeout.project_info import YAML_VERSION
 
 
@@ -76,3 +79,50 @@ class TestDetectContext:
         gds_dir.mkdir(parents=True)
         (gds_dir / "test.gds").write_bytes(b"\x00")
         assert detect_context(str(tmp_path)).has_gds is True
+
+
+def test_require_tt_tools_updates_once(tmp_path):
+    ctx = ProjectContext(
+        project_dir=tmp_path,
+        tt_tools_dir=tmp_path / "tt",
+        info=None,
+        tech="sky130A",
+        has_gds=False,
+    )
+    with (
+        patch("tinytapeout.cli.context._update_tt_tools") as update,
+        patch("tinytapeout.cli.context._install_tt_tools_deps") as install,
+    ):
+        assert ctx.require_tt_tools() == tmp_path / "tt"
+        assert ctx.require_tt_tools() == tmp_path / "tt"
+    assert update.call_count == 1
+    assert install.call_count == 1
+
+
+def test_require_tt_tools_updates_once_across_threads(tmp_path):
+    ctx = ProjectContext(
+        project_dir=tmp_path,
+        tt_tools_dir=tmp_path / "tt",
+        info=None,
+        tech="sky130A",
+        has_gds=False,
+    )
+    results = []
+    with (
+        patch(
+            "tinytapeout.cli.context._update_tt_tools",
+            side_effect=lambda tt_dir: time.sleep(0.05),
+        ) as update,
+        patch("tinytapeout.cli.context._install_tt_tools_deps") as install,
+    ):
+        threads = [
+            threading.Thread(target=lambda: results.append(ctx.require_tt_tools()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert results == [tmp_path / "tt"] * 4
+    assert update.call_count == 1
+    assert install.call_count == 1
@@ -0,0 +1,137 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from tinytapeout.cli.docker_runner import (
+    CONTAINER_WINDOW,
+    container_name,
+    ensure_container,
+    precheck_mounts,
+    stage_precheck_run,
+    stage_tt_tools,
+    stop_containers,
+)
+
+# Minimal stand-in for the docker CLI: records its arguments and keeps the
+# state of one container in a file
+FAKE_DOCKER = """\
+#!/bin/sh
+echo "$*" >> "$FAKE_DOCKER_LOG"
+state="$FAKE_DOCKER_STATE"
+case "$1" in
+  inspect) [ -f "$state" ] || exit 1; cat "$state" ;;
+  run) echo true > "$state" ;;
+  start) echo true > "$state" ;;
+  ps) if [ -f "$state" ]; then echo tt-precheck-test; fi ;;
+  rm) rm -f "$state" ;;
+esac
+"""
+
+
+@pytest.fixture
+def docker(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "docker"
+    script.write_text(FAKE_DOCKER)
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_DOCKER_LOG", str(tmp_path / "docker.log"))
+    monkeypatch.setenv("FAKE_DOCKER_STATE", str(tmp_path / "state"))
+    return tmp_path
+
+
+def _calls(tmp_path):
+    return [
+        line.split()[0]
+        for line in (tmp_path / "docker.log").read_text().split("\n")
+        if line
+    ]
+
+
+def test_mounts_do_not_depend_on_the_project(tmp_path):
+    staging = tmp_path / "cache" / "precheck-docker"
+    mounts = dict(precheck_mounts(staging, str(tmp_path / "pdk")))
+    assert mounts[staging] is True
+    assert mounts[tmp_path / "pdk"] is False
+
+    # A read-only mount inside the writable one is dropped
+    mounts = dict(precheck_mounts(staging, str(staging / "pdk")))
+    assert staging / "pdk" not in mounts
+
+
+def test_inputs_are_staged_for_the_container(tmp_path):
+    tt_dir = tmp_path / "project" / "tt"
+    (tt_dir / "precheck" / "reports").mkdir(parents=True)
+    (tt_dir / "precheck" / "precheck.py").write_text("print('v1')\n")
+    (tt_dir / "precheck" / "reports" / "old.txt").write_text("stale")
+    (tt_dir / "tech").mkdir()
+    (tt_dir / "tech" / "layers.yaml").write_text("{}\n")
+    (tt_dir / ".git").mkdir()
+    gds = tmp_path / "project" / "tt_submission" / "tt_um_test.gds"
+    gds.parent.mkdir()
+    gds.write_bytes(b"gds")
+    staging = tmp_path / "staging"
+
+    staged_tt = stage_tt_tools(tt_dir, staging)
+    assert staged_tt.is_relative_to(staging)
+    assert (staged_tt / "tech" / "layers.yaml").read_text() == "{}\n"
+    assert not (staged_tt / ".git").exists()
+    assert not (staged_tt / "precheck" / "reports").exists()
+
+    # Isolated precheck directories (symlink farms) are staged as copies
+    isolated = tt_dir / ".precheck-0"
+    isolated.mkdir()
+    (isolated / "precheck.py").symlink_to(tt_dir / "precheck" / "precheck.py")
+    run_dir, run_gds = stage_precheck_run(staged_tt, tt_dir, isolated, str(gds))
+    assert run_dir == staged_tt / ".precheck-0"
+    assert not (run_dir / "precheck.py").is_symlink()
+    assert Path(run_gds).is_relative_to(staging)
+    assert Path(run_gds).read_bytes() == b"gds"
+
+    # Changes and deletions are synced; staged run directories are kept
+    (tt_dir / "precheck" / "precheck.py").write_text("print('version 2')\n")
+    (tt_dir / "tech" / "layers.yaml").unlink()
+    stage_tt_tools(tt_dir, staging)
+    assert "version 2" in (staged_tt / "precheck" / "precheck.py").read_text()
+    assert not (staged_tt / "tech" / "layers.yaml").exists()
+    assert run_dir.is_dir()
+
+
+def test_container_is_started_once_and_reused(docker):
+    staging = docker / "staging"
+    (staging / "tt").mkdir(parents=True)
+    requirements = staging / "tt" / "requirements.txt"
+    requirements.write_text("gdstk\n")
+    mounts = precheck_mounts(staging, None)
+    now = 10 * CONTAINER_WINDOW
+
+    name = ensure_container("precheck:1", mounts, requirements, now)
+    assert _calls(docker) == ["inspect", "run", "exec"]  # exec installs requirements
+    run_args = (docker / "docker.log").read_text().splitlines()[1].split()
+    assert f"{staging}:{staging}:rw" in run_args
+    assert "--rm" in run_args
+    assert run_args[-1] != "infinity"  # idle containers exit on their own
+
+    assert ensure_container("precheck:1", mounts, requirements, now + 60) == name
+    assert _calls(docker) == ["inspect", "run", "exec", "inspect"]
+
+    (docker / "state").write_text("false\n")  # stopped, e.g. after a reboot
+    ensure_container("precheck:1", mounts, requirements, now)
+    assert _calls(docker)[-2:] == ["inspect", "start"]
+
+    requirements.write_text("gdstk\nklayout\n")
+    assert container_name("precheck:1", mounts, requirements, now) != name
+    # Later validations move on to a fresh container
+    later = container_name("precheck:1", mounts, requirements, now + CONTAINER_WINDOW)
+    assert later != container_name("precheck:1", mounts, requirements, now)
+
+
+def test_stop_containers(docker):
+    assert stop_containers() == []
+    (docker / "state").write_text("true\n")
+    assert stop_containers() == ["tt-precheck-test"]
+    assert _calls(docker)[-1] == "rm"
+    assert not (docker / "state").exists()
@@ -0,0 +1,56 @@
+from tinytapeout.cli.durations import DurationDB
+from tinytapeout.cli.sim_results import CaseResult
+
+
+def _case(name, duration, status="pass"):
+    return CaseResult(name=name, classname="test", status=status, duration=duration)
+
+
+def test_longest_first_with_median_for_unseen(tmp_path):
+    db = DurationDB(tmp_path / "durations.json", "rtl")
+    assert db.schedule(["a", "b", "c"]) == ["a", "b", "c"]
+
+    db.record([_case("a", 1.0), _case("b", 30.0), _case("c", 5.0)])
+    # new is estimated at the median (5.0) and ties keep their order
+    assert db.schedule(["a", "new", "c", "b"]) == ["b", "new", "c", "a"]
+    assert db.estimate("new") == 5.0
+
+
+def test_durations_are_smoothed_and_persisted_per_mode(tmp_path):
+    path = tmp_path / "sim_build" / "durations.json"
+    rtl = DurationDB(path, "rtl")
+    rtl.record([_case("a", 10.0), _case("skipped", 0.0, status="skip")])
+    rtl.save()
+
+    rtl = DurationDB(path, "rtl")
+    rtl.record([_case("a", 20.0)])
+    rtl.save()
+    gl = DurationDB(path, "gl")
+    gl.record([_case("a", 100.0)])
+    gl.save()
+
+    assert DurationDB(path, "rtl").durations == {"a": 15.0}
+    assert DurationDB(path, "gl").durations == {"a": 100.0}
+
+
+def test_corrupt_database_is_ignored(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text("{not json")
+    db = DurationDB(path, "rtl")
+    assert db.durations == {}
+    db.record([_case("a", 1.0)])
+    db.save()
+    assert DurationDB(path, "rtl").durations == {"a": 1.0}
+
+
+def test_shards_are_balanced_and_deterministic(tmp_path):
+    db = DurationDB(tmp_path / "durations.json", "rtl")
+    db.record([_case("a", 10.0), _case("b", 6.0), _case("c", 5.0), _case("d", 4.0)])
+    names = ["d", "new", "c", "b", "a"]
+
+    shards = db.shards(names, 2)
+    # new is estimated at the median (5.5): a, c = 15 and b, new, d = 15.5
+    assert shards == [["a", "c"], ["b", "new", "d"]]
+    assert db.shards(list(reversed(names)), 2) == shards
+    assert sorted(sum(shards, [])) == sorted(names)
+    assert db.shards(["a"], 3) == [["a"], [], []]
@@ -0,0 +1,20 @@
+import pytest
+
+from tinytapeout.cli.fsutil import write_atomic
+
+
+def test_write_atomic_replaces_the_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old")
+    write_atomic(path, b"new")
+    assert path.read_bytes() == b"new"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+
+def test_write_atomic_leaves_no_temporary_file_on_error(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old")
+    with pytest.raises(TypeError):
+        write_atomic(path, "not bytes")
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
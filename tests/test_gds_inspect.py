@@ -0,0 +1,80 @@
+import pytest
+
+gdstk = pytest.importorskip("gdstk")
+np = pytest.importorskip("numpy")
+
+from tinytapeout.cli.gds_inspect import summarize_gds  # noqa: E402
+from tinytapeout.cli.layout import load_layout  # noqa: E402
+
+
+def _write_gds(path, with_boundary=True):
+    lib = gdstk.Library()
+    std = lib.new_cell("sky130_fd_sc_hd__and2_1")
+    std.add(gdstk.rectangle((0, 0), (1, 2), layer=68, datatype=20))
+    top = lib.new_cell("tt_um_test")
+    top.add(gdstk.Reference(std, (10, 10), columns=3, rows=2, spacing=(5, 5)))
+    top.add(gdstk.rectangle((0, 0), (20, 4), layer=69, datatype=20))
+    # Triangle: area 2
+    top.add(gdstk.Polygon([(0, 0), (2, 0), (0, 2)], layer=70, datatype=20))
+    if with_boundary:
+        top.add(gdstk.rectangle((0, 0), (161, 111.52), layer=235, datatype=4))
+    top.add(gdstk.Label("clk", (1, 1), layer=71, texttype=5))
+    top.add(gdstk.Label("stray", (1, 1), layer=68, texttype=20))
+    lib.write_gds(str(path))
+
+
+def test_load_layout_flattens_hierarchy(tmp_path):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    geom = load_layout(gds)
+    assert geom.top_cell == "tt_um_test"
+    assert geom.polygon_count == 6 + 3
+    assert len(geom.labels) == 2
+    areas = np.abs(geom.polygon_areas())
+    assert sorted(areas.round(2).tolist())[:7] == [2.0] * 7
+
+
+def test_summarize_layout(tmp_path):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    summary = summarize_gds(gds, "sky130A")
+    layers = {(s.layer, s.datatype): s for s in summary.layers}
+
+    met1 = layers[(68, 20)]
+    assert met1.name == "met1"
+    assert met1.polygons == 6
+    assert met1.area == pytest.approx(12.0)
+    assert met1.bbox == (10.0, 10.0, 21.0, 17.0)
+    assert layers[(69, 20)].area == pytest.approx(80.0)
+
+    assert summary.prboundary_populated is True
+    assert summary.die_size == pytest.approx((161.0, 111.52))
+    assert summary.logo_populated is False
+    assert summary.label_counts == {"71/5": 1}
+
+
+def test_summarize_without_boundary_uses_geometry_bbox(tmp_path):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds, with_boundary=False)
+    summary = summarize_gds(gds, "sky130A")
+    assert summary.prboundary_populated is False
+    assert summary.die_bbox == (0.0, 0.0, 21.0, 17.0)
+
+
+def test_summarize_matches_flattened_geometry(tmp_path):
+    lib = gdstk.Library()
+    leaf = lib.new_cell("leaf")
+    leaf.add(gdstk.rectangle((0, 0), (1, 3), layer=68, datatype=20))
+    mid = lib.new_cell("mid")
+    mid.add(gdstk.Reference(leaf, (5, 0), rotation=1.5707963267948966))
+    mid.add(gdstk.Reference(leaf, (0, 5), x_reflection=True, magnification=2))
+    top = lib.new_cell("tt_um_test")
+    top.add(gdstk.Reference(mid, (100, 50), columns=4, rows=1, spacing=(20, 0)))
+    gds = tmp_path / "test.gds"
+    lib.write_gds(str(gds))
+
+    summary = summarize_gds(gds, "sky130A")
+    geom = load_layout(gds)
+    assert summary.polygons == geom.polygon_count == 8
+    assert summary.layers[0].area == pytest.approx(np.abs(geom.polygon_areas()).sum())
+    assert summary.layers[0].bbox == pytest.approx(geom.bbox())
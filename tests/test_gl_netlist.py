@@ -0,0 +1,52 @@
+from tinytapeout.cli.gl_netlist import write_gl_netlist
+from tinytapeout.tech import tech_map
+
+NETLIST = """\
+module tt_um_example (clk, uo_out);
+ input clk;
+ output uo_out;
+ sky130_fd_sc_hd__decap_12 FILLER_0_0_1 (.VGND(VGND),
+    .VNB(VGND),
+    .VPB(VPWR),
+    .VPWR(VPWR));
+ sky130_ef_sc_hd__decap_12 FILLER_0_1_3 ();
+ sky130_fd_sc_hd__tapvpwrvgnd_1 TAP_0 ();
+ sky130_fd_sc_hd__diode_2 ANTENNA_1 (.DIODE(clk));
+ sky130_fd_sc_hd__dfxtp_1 _1_ (.CLK(clk),
+    .D(uo_out),
+    .Q(uo_out));
+ sky130_fd_sc_hd__fill_1 FILLER_2 ();
+endmodule"""
+
+
+def test_physical_cells_are_left_out(tmp_path):
+    source = tmp_path / "tt_um_example.v"
+    source.write_text(NETLIST)
+    dest = tmp_path / "gate_level_netlist.v"
+
+    result = write_gl_netlist([source], dest, tech_map["sky130A"].cell_regexp)
+    assert result.changed and result.removed == 5
+    text = dest.read_text()
+    assert "FILLER" not in text and "TAP_0" not in text and "ANTENNA" not in text
+    assert "sky130_fd_sc_hd__dfxtp_1 _1_ (.CLK(clk),\n    .D(uo_out)," in text
+    assert text.endswith("endmodule\n")
+
+    full = write_gl_netlist([source], tmp_path / "full.v")
+    assert full.removed == 0
+    assert (tmp_path / "full.v").read_text() == NETLIST + "\n"
+
+
+def test_unchanged_netlist_is_not_rewritten(tmp_path):
+    source = tmp_path / "tt_um_example.v"
+    source.write_text(NETLIST)
+    dest = tmp_path / "gate_level_netlist.v"
+    regexp = tech_map["sky130A"].cell_regexp
+
+    write_gl_netlist([source], dest, regexp)
+    mtime = dest.stat().st_mtime_ns
+    assert not write_gl_netlist([source], dest, regexp).changed
+    assert dest.stat().st_mtime_ns == mtime
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    source.write_text(NETLIST.replace("_1_", "_2_"))
+    assert write_gl_netlist([source], dest, regexp).changed
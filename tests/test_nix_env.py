@@ -0,0 +1,77 @@
+import os
+import stat
+
+import pytest
+
+from tinytapeout.cli.cache import ArtifactCache
+from tinytapeout.cli.nix_env import load_nix_env
+from tinytapeout.cli.precheck_env import (
+    RUNNER_NIX,
+    PrecheckEnv,
+    command_env,
+    wrap_command,
+)
+
+FAKE_NIX_SHELL = """\
+#!/bin/sh
+echo run >> "$FAKE_NIX_RUNS"
+export PRECHECK_TOOL=klayout
+export PATH="$FAKE_NIX_PATH:$PATH"
+eval "$3"
+"""
+
+
+@pytest.fixture
+def nix(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "nix-shell"
+    script.write_text(FAKE_NIX_SHELL)
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_NIX_RUNS", str(tmp_path / "runs.txt"))
+    monkeypatch.setenv("FAKE_NIX_PATH", "/opt/klayout/bin")
+    nix_file = tmp_path / "default.nix"
+    nix_file.write_text("{ pkgs ? import <nixpkgs> {} }: pkgs.mkShell {}")
+    return nix_file
+
+
+def _runs(tmp_path):
+    return (tmp_path / "runs.txt").read_text().count("run")
+
+
+def test_environment_is_captured_once(tmp_path, nix):
+    cache = ArtifactCache("nix-env", 1 << 20, root=tmp_path / "cache")
+    shell_env = load_nix_env(nix, cache)
+    assert shell_env.variables["PRECHECK_TOOL"] == "klayout"
+    assert shell_env.path == ["/opt/klayout/bin"]
+    assert "PWD" not in shell_env.variables
+    assert "HOME" not in shell_env.variables  # unchanged by the shell
+
+    assert load_nix_env(nix, cache) == shell_env
+    assert _runs(tmp_path) == 1
+
+    nix.write_text("{ pkgs ? import <nixpkgs> {} }: pkgs.mkShell { x = 1; }")
+    load_nix_env(nix, cache)
+    assert _runs(tmp_path) == 2
+
+
+def test_collected_store_paths_are_recaptured(tmp_path, nix, monkeypatch):
+    monkeypatch.setenv("FAKE_NIX_PATH", "/nix/store/0000-gone/bin")
+    cache = ArtifactCache("nix-env", 1 << 20, root=tmp_path / "cache")
+    load_nix_env(nix, cache)
+    load_nix_env(nix, cache)
+    assert _runs(tmp_path) == 2
+
+
+def test_cached_environment_runs_without_nix_shell(tmp_path, nix):
+    cache = ArtifactCache("nix-env", 1 << 20, root=tmp_path / "cache")
+    env = PrecheckEnv(runner=RUNNER_NIX, nix_file=nix)
+    assert wrap_command(env, ["python", "precheck.py"])[0] == "nix-shell"
+
+    env.shell_env = load_nix_env(nix, cache)
+    assert wrap_command(env, ["python", "precheck.py"]) == ["python", "precheck.py"]
+    variables = command_env(env, {"PATH": "/venv/bin", "PDK": "sky130A"})
+    assert variables["PATH"] == f"/opt/klayout/bin{os.pathsep}/venv/bin"
+    assert variables["PRECHECK_TOOL"] == "klayout"
+    assert variables["PDK"] == "sky130A"
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from tinytapeout.cli.pipeline import Step, StepResult, run_pipeline
+
+
+def _collect():
+    reported: list[str] = []
+
+    def report(step: Step, result: StepResult):
+        reported.append(f"{step.name}:{result.returncode}:{result.output}")
+
+    return reported, report
+
+
+def test_reports_in_declaration_order():
+    reported, report = _collect()
+
+    def slow():
+        time.sleep(0.1)
+        return StepResult(0, "slow")
+
+    run_pipeline(
+        [Step("a", slow), Step("b", lambda: StepResult(0, "fast"))],
+        report=report,
+    )
+    assert reported == ["a:0:slow", "b:0:fast"]
+
+
+def test_independent_steps_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def step():
+        barrier.wait()
+        return StepResult(0)
+
+    results = run_pipeline([Step("a", step), Step("b", step)], report=lambda s, r: None)
+    assert all(r.returncode == 0 for r in results.values())
+
+
+def test_dependent_step_waits_for_dependency():
+    order: list[str] = []
+
+    def make(name):
+        def run():
+            order.append(name)
+            return StepResult(0)
+
+        return run
+
+    run_pipeline(
+        [Step("a", make("a")), Step("b", make("b"), deps=("a",))],
+        report=lambda s, r: None,
+    )
+    assert order == ["a", "b"]
+
+
+def test_failed_dependency_skips_step():
+    ran: list[str] = []
+
+    def never():
+        ran.append("b")
+        return StepResult(0)
+
+    results = run_pipeline(
+        [Step("a", lambda: StepResult(3)), Step("b", never, deps=("a",))],
+        report=lambda s, r: None,
+    )
+    assert results["b"].skipped is True
+    assert ran == []
+
+
+def test_exception_becomes_failure():
+    def boom():
+        raise RuntimeError("boom")
+
+    results = run_pipeline([Step("a", boom)], report=lambda s, r: None)
+    assert results["a"].returncode == 1
+    assert "boom" in results["a"].output
+
+
+def test_unknown_dependency_rejected():
+    with pytest.raises(ValueError, match="unknown step"):
+        run_pipeline(
+            [Step("a", lambda: StepResult(0), deps=("b",))], report=lambda s, r: None
+        )
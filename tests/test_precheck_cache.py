@@ -0,0 +1,292 @@
+import json
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tinytapeout.cli import runner as runner_module
+from tinytapeout.cli.cache import ArtifactCache
+from tinytapeout.cli.commands.gds import _validate_layouts
+from tinytapeout.cli.context import ProjectContext
+from tinytapeout.cli.precheck_cache import (
+    PrecheckCache,
+    precheck_environment,
+    precheck_key,
+)
+from tinytapeout.cli.precheck_env import RUNNER_NATIVE, PrecheckEnv
+from tinytapeout.cli.runner import run_precheck
+
+FAKE_PRECHECK = """\
+import os, sys
+gds = sys.argv[sys.argv.index("--gds") + 1]
+os.makedirs("reports", exist_ok=True)
+# Count runs next to the real script, also when run from an isolated copy
+with open(os.path.join(os.path.dirname(os.path.realpath(__file__)), "runs.txt"), "a") as f:
+    f.write("run\\n")
+failed = os.environ.get("FAKE_PRECHECK_FAIL", "\\0") in gds
+with open("reports/results.md", "w") as f:
+    f.write("| Check | Result |\\n|---|---|\\n")
+    f.write("| DRC | ❌ Fail: bad |\\n" if failed else "| DRC | ✅ |\\n")
+print("precheck of", gds)
+sys.exit(1 if failed else int(os.environ.get("FAKE_PRECHECK_RC", "0")))
+"""
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def tt_dir(tmp_path):
+    tt = tmp_path / "tt"
+    (tt / "precheck").mkdir(parents=True)
+    (tt / "precheck" / "precheck.py").write_text(FAKE_PRECHECK)
+    (tt / "precheck" / "tool-versions.json").write_text(
+        json.dumps({"klayout": "0.29.0", "magic": "8.3.500"})
+    )
+    _git(tt, "init", "-q")
+    _git(tt, "add", ".")
+    _git(tt, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init")
+    return tt
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PrecheckCache(ArtifactCache("precheck", 1 << 20, root=tmp_path / "cache"))
+    with patch("tinytapeout.cli.precheck_cache.PrecheckCache", return_value=cache):
+        yield cache
+
+
+def _context(tmp_path, tt_dir):
+    ctx = ProjectContext(
+        project_dir=tmp_path,
+        tt_tools_dir=tt_dir,
+        info=None,
+        tech="sky130A",
+        has_gds=True,
+    )
+    ctx.tt_tools_ready = True
+    return ctx
+
+
+def _patched_env():
+    return (
+        patch("tinytapeout.cli.runner._install_precheck_deps"),
+        patch(
+            "tinytapeout.cli.precheck_env.detect_precheck_env",
+            return_value=PrecheckEnv(runner=RUNNER_NATIVE),
+        ),
+    )
+
+
+def _run(tmp_path, tt_dir, gds, **kwargs):
+    ctx = _context(tmp_path, tt_dir)
+    deps, env = _patched_env()
+    with deps, env:
+        return run_precheck(ctx, str(gds), capture=True, **kwargs)
+
+
+def _runs(tt_dir):
+    return (tt_dir / "precheck" / "runs.txt").read_text().count("run")
+
+
+def test_precheck_key_inputs(tmp_path, tt_dir, monkeypatch):
+    gds = tmp_path / "a.gds"
+    gds.write_bytes(b"v1")
+    key = precheck_key(gds, "sky130A", tt_dir)
+    assert key == precheck_key(gds, "sky130A", tt_dir)
+    assert key != precheck_key(gds, "ihp-sg13g2", tt_dir)
+    assert key != precheck_key(gds, "sky130A", tt_dir, ("--skip", "x"))
+
+    serial = precheck_environment("auto", driver=False)
+    key = precheck_key(gds, "sky130A", tt_dir, (), serial)
+    for environment in (
+        precheck_environment("docker", driver=False),
+        precheck_environment("auto", driver=True),
+    ):
+        assert precheck_key(gds, "sky130A", tt_dir, (), environment) != key
+    monkeypatch.setenv("PDK_ROOT", str(tmp_path / "other-pdk"))
+    assert precheck_key(gds, "sky130A", tt_dir, (), serial) == key
+    other = precheck_environment("auto", driver=False)
+    assert precheck_key(gds, "sky130A", tt_dir, (), other) != key
+
+    (tt_dir / "precheck" / "tool-versions.json").write_text("{}")
+    assert precheck_key(gds, "sky130A", tt_dir, (), serial) != key
+    assert precheck_key(gds, "sky130A", tmp_path / "not-a-repo") is None
+
+
+def test_cache_hit_replays_log_and_reports(tmp_path, tt_dir, cache):
+    gds = tmp_path / "a.gds"
+    gds.write_bytes(b"v1")
+    first = _run(tmp_path, tt_dir, gds)
+    assert first.returncode == 0
+    assert "precheck of" in first.stdout
+
+    reports = tt_dir / "precheck" / "reports"
+    (reports / "results.md").unlink()
+    second = _run(tmp_path, tt_dir, gds)
+    assert _runs(tt_dir) == 1
+    assert second.returncode == 0
+    assert second.stdout == first.stdout
+    assert "| DRC | ✅ |" in (reports / "results.md").read_text()
+
+    _run(tmp_path, tt_dir, gds, force=True)
+    assert _runs(tt_dir) == 2
+    gds.write_bytes(b"v2")
+    _run(tmp_path, tt_dir, gds)
+    assert _runs(tt_dir) == 3
+
+
+def test_only_check_failures_are_cached(tmp_path, tt_dir, cache, monkeypatch):
+    gds = tmp_path / "a.gds"
+    gds.write_bytes(b"v1")
+    # Fails without a failed check (e.g. a tool is missing): run again once
+    # the environment is fixed
+    monkeypatch.setenv("FAKE_PRECHECK_RC", "1")
+    assert _run(tmp_path, tt_dir, gds).returncode == 1
+    monkeypatch.delenv("FAKE_PRECHECK_RC")
+    assert _run(tmp_path, tt_dir, gds).returncode == 0
+    assert _runs(tt_dir) == 2
+
+    # A failed check is the GDS's result, and is replayed with its status
+    bad = tmp_path / "bad.gds"
+    bad.write_bytes(b"bad")
+    monkeypatch.setenv("FAKE_PRECHECK_FAIL", "bad")
+    assert _run(tmp_path, tt_dir, bad).returncode == 1
+    monkeypatch.delenv("FAKE_PRECHECK_FAIL")
+    assert _run(tmp_path, tt_dir, bad).returncode == 1
+    assert _runs(tt_dir) == 3
+
+
+def test_layouts_are_validated_concurrently(
+    tmp_path, tt_dir, cache, monkeypatch, capsys
+):
+    gds_files = []
+    for name in ("tt_um_a.gds", "tt_um_b.gds"):
+        gds_files.append(tmp_path / name)
+        gds_files[-1].write_bytes(name.encode())
+    ctx = _context(tmp_path, tt_dir)
+    monkeypatch.setenv("FAKE_PRECHECK_FAIL", "tt_um_b")
+
+    deps, env = _patched_env()
+    with deps, env as detect:
+        passed = _validate_layouts(
+            ctx, gds_files, runner="auto", force=False, jobs=1, json_output=True
+        )
+        assert not passed
+        assert _runs(tt_dir) == 2
+        assert detect.call_count == 1  # environment set up once for both
+        assert not (tt_dir / "precheck" / "reports").exists()
+        events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        summaries = {e["gds"]: e["status"] for e in events if e["event"] == "summary"}
+        assert summaries == {"tt_um_a.gds": "pass", "tt_um_b.gds": "fail"}
+
+        # Each layout is cached on its own
+        gds_files[0].write_bytes(b"changed")
+        _validate_layouts(
+            ctx, gds_files, runner="auto", force=False, jobs=1, json_output=True
+        )
+        assert _runs(tt_dir) == 3
+
+
+@pytest.mark.parametrize(
+    "jobs, cpus, expected", [(None, 8, 4), (4, 64, 2), (1, 8, 1), (None, 1, 1)]
+)
+def test_layouts_split_the_job_budget(tmp_path, jobs, cpus, expected, monkeypatch):
+    gds_files = [tmp_path / "tt_um_a.gds", tmp_path / "tt_um_b.gds"]
+    monkeypatch.setattr("os.cpu_count", lambda: cpus)
+    result = subprocess.CompletedProcess([], 0)
+    with (
+        patch("tinytapeout.cli.commands.gds.run_precheck", return_value=result) as run,
+        patch("tinytapeout.cli.commands.gds.isolated_precheck_dir"),
+    ):
+        ctx = _context(tmp_path, tmp_path / "tt")
+        _validate_layouts(
+            ctx, gds_files, runner="auto", force=False, jobs=jobs, json_output=True
+        )
+    assert [c.kwargs["jobs"] for c in run.call_args_list] == [expected] * 2
+
+
+def test_driver_runs_unless_turned_off(tmp_path, tt_dir, cache, monkeypatch):
+    from tinytapeout.cli import precheck_driver
+
+    gds = tmp_path / "a.gds"
+    gds.write_bytes(b"v1")
+    driver = str(Path(precheck_driver.__file__))
+    runs = []
+    original = runner_module._run_logged
+
+    def run_logged(cmd, **kwargs):
+        runs.append(cmd)
+        return original(cmd, **kwargs)
+
+    monkeypatch.setattr(runner_module, "_run_logged", run_logged)
+    _run(tmp_path, tt_dir, gds, jobs=4, force=True)
+    # The driver does not understand the fake precheck.py and falls back
+    assert [driver in cmd for cmd in runs] == [True, False]
+
+    runs.clear()
+    monkeypatch.setenv(precheck_driver.DRIVER_ENV, "0")
+    _run(tmp_path, tt_dir, gds, jobs=4, force=True)
+    assert [driver in cmd for cmd in runs] == [False]
+
+
+# precheck.py in the shape the parallel driver understands
+DRIVER_PRECHECK = """\
+import argparse, os
+
+REPORTS_PATH = os.path.join(os.path.dirname(__file__), "reports")
+
+
+def drc(gds):
+    print("running drc on", gds)
+
+
+def pins(gds):
+    raise Exception("missing pin")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gds", required=True)
+    parser.add_argument("--tech")
+    args = parser.parse_args()
+    gds = args.gds
+    checks = [
+        ["DRC", lambda: drc(gds)],
+        ["Pins", lambda: pins(gds)],
+    ]
+    for name, check in checks:
+        check()
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def test_default_validation_streams_check_events(tmp_path, tt_dir, cache, capsys):
+    from tinytapeout.cli.commands.gds import _validate_layout
+
+    (tt_dir / "precheck" / "precheck.py").write_text(DRIVER_PRECHECK)
+    gds = tmp_path / "tt_um_a.gds"
+    gds.write_bytes(b"a")
+    ctx = _context(tmp_path, tt_dir)
+    deps, env = _patched_env()
+    with deps, env:
+        passed = _validate_layout(
+            ctx, gds, runner="auto", force=False, jobs=None, json_output=True
+        )
+    assert not passed
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    # Each check is announced when it starts, before its result
+    order = [(e["event"], e["check"]) for e in events if "check" in e]
+    for check in ("DRC", "Pins"):
+        assert order.index(("start", check)) < order.index(("result", check))
+    results = {e["check"]: e for e in events if e["event"] == "result"}
+    assert results["DRC"]["status"] == "pass"
+    assert results["Pins"]["error"] == "missing pin"
+    # Durations come from the driver's markers, not from results.md afterwards
+    assert all(r["duration"] is not None for r in results.values())
+    assert events[-1]["event"] == "summary"
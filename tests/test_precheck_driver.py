@@ -0,0 +1,145 @@
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from tinytapeout.cli import precheck_driver
+
+DRIVER = Path(precheck_driver.__file__)
+
+FAKE_PRECHECK = """\
+import argparse, os
+
+REPORTS_PATH = os.path.join(os.path.dirname(__file__), "reports")
+
+
+def run_klayout(name):
+    import subprocess
+    subprocess.run(["klayout", "-b", name])
+
+
+def check_ok(gds):
+    print("checking", gds)
+
+
+def check_fail(gds):
+    raise Exception("bad layout")
+
+
+def check_exit(gds):
+    import sys
+    print("giving up")
+    sys.exit(2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gds", required=True)
+    args = parser.parse_args()
+    gds = os.path.abspath(args.gds)
+    os.makedirs(REPORTS_PATH, exist_ok=True)
+
+    checks = [
+        ["First", lambda: check_ok(gds)],
+        ["KLayout DRC", lambda: run_klayout("drc")],
+        ["Failing", lambda: check_fail(gds)],
+        ["Exiting", lambda: check_exit(gds)],
+    ]
+    for name, check in checks:
+        check()
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def _drive(tmp_path, source, *precheck_args, jobs=2, threads=None, env=None):
+    script = tmp_path / "precheck.py"
+    script.write_text(source)
+    cmd = [sys.executable, str(DRIVER), "--precheck", str(script), "--jobs", str(jobs)]
+    if threads is not None:
+        cmd.extend(["--threads", str(threads)])
+    return subprocess.run(
+        [*cmd, "--", *precheck_args],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+@pytest.fixture
+def klayout(tmp_path):
+    """A fake klayout on PATH that prints its arguments."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "klayout"
+    script.write_text('#!/bin/sh\necho "klayout $*"\n')
+    script.chmod(0o755)
+    return {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+
+
+def test_runs_checks_and_merges_reports(tmp_path, klayout):
+    result = _drive(tmp_path, FAKE_PRECHECK, "--gds", "tt_um_test.gds", env=klayout)
+    assert result.returncode == 1
+    assert "=== PASS First" in result.stdout
+    assert "checking " in result.stdout
+    assert "=== START Failing" in result.stdout
+    assert "=== FAIL Failing" in result.stdout
+    assert ": bad layout\n" in result.stdout
+    assert "=== FAIL Exiting" in result.stdout
+    assert "giving up" in result.stdout
+    assert "Precheck failed: 2 of 4 checks" in result.stdout
+
+    reports = tmp_path / "reports"
+    markdown = (reports / "results.md").read_text()
+    rows = [line for line in markdown.splitlines() if line.startswith("| ")][1:]
+    assert rows == [
+        "| First | ✅ |",
+        "| KLayout DRC | ✅ |",
+        "| Failing | ❌ Fail: bad layout |",
+        "| Exiting | ❌ Fail: exited with status 2 |",
+    ]
+    suite = ET.parse(reports / "results.xml").getroot()
+    assert suite.get("tests") == "4"
+    assert suite.get("errors") == "2"
+    assert [case.get("name") for case in suite] == [
+        "First",
+        "KLayout DRC",
+        "Failing",
+        "Exiting",
+    ]
+
+
+def test_klayout_gets_thread_count():
+    precheck_driver._THREADS = 4
+    assert precheck_driver._with_threads(["klayout", "-b", "-r", "drc.lydrc"]) == [
+        "klayout",
+        "-rd",
+        "thr=4",
+        "-b",
+        "-r",
+        "drc.lydrc",
+    ]
+    explicit = ["klayout", "-rd", "thr=2", "-b"]
+    assert precheck_driver._with_threads(explicit) == explicit
+    assert precheck_driver._with_threads(["magic", "-dnull"]) == ["magic", "-dnull"]
+
+
+@pytest.mark.parametrize("threads, expected", [(8, "thr=4"), (2, "thr=1")])
+def test_klayout_threads_come_from_the_budget(tmp_path, klayout, threads, expected):
+    result = _drive(
+        tmp_path, FAKE_PRECHECK, "--gds", "x.gds", threads=threads, env=klayout
+    )
+    assert f"klayout -rd {expected} -b drc" in result.stdout
+
+
+def test_unsupported_precheck_runs_nothing(tmp_path):
+    source = "open('ran', 'w')\nprint('serial precheck')\n"
+    result = _drive(tmp_path, source, "--gds", "x.gds")
+    assert result.returncode == precheck_driver.EXIT_UNSUPPORTED
+    assert not (tmp_path / "ran").exists()
@@ -5,6 +5,7 @@ import pytest
 
 from tinytapeout.cli.environment import ToolInfo
 from tinytapeout.cli.precheck_env import (
+    RUNNER_DOCKER,
     RUNNER_NATIVE,
     RUNNER_NIX,
     PrecheckEnv,
@@ -81,6 +82,19 @@ def _magic_unavailable():
     return ToolInfo(name="magic", available=False)
 
 
+def _docker_running():
+    return ToolInfo(
+        name="Docker",
+        available=True,
+        version="27.3.1 (running)",
+        path="/usr/bin/docker",
+    )
+
+
+def _docker_unavailable():
+    return ToolInfo(name="Docker", available=False)
+
+
 _DEFAULT_TOOL_VERSIONS = {"klayout": "0.30.4", "magic": "8.3.568"}
 
 
@@ -142,6 +156,10 @@ class TestDetectPrecheckEnv:
                 "tinytapeout.cli.precheck_env.check_magic",
                 return_value=_magic_unavailable(),
             ),
+            patch(
+                "tinytapeout.cli.precheck_env.check_docker",
+                return_value=_docker_unavailable(),
+            ),
             pytest.raises(SystemExit),
         ):
             detect_precheck_env(tt_dir, "auto")
@@ -163,6 +181,10 @@ class TestDetectPrecheckEnv:
                 "tinytapeout.cli.precheck_env.check_magic",
                 return_value=_magic_available("8.3.400"),
             ),
+            patch(
+                "tinytapeout.cli.precheck_env.check_docker",
+                return_value=_docker_unavailable(),
+            ),
             pytest.raises(SystemExit),
         ):
             detect_precheck_env(tt_dir, "auto")
@@ -185,6 +207,40 @@ class TestDetectPrecheckEnv:
             result = detect_precheck_env(tt_dir, "auto")
         assert result.runner == RUNNER_NATIVE
 
+    def test_auto_falls_back_to_docker(self, tmp_path):
+        tt_dir = _setup_tt_dir(tmp_path)
+        with (
+            patch(
+                "tinytapeout.cli.precheck_env.check_nix",
+                return_value=_nix_unavailable(),
+            ),
+            patch(
+                "tinytapeout.cli.precheck_env.check_klayout",
+                return_value=_klayout_unavailable(),
+            ),
+            patch(
+                "tinytapeout.cli.precheck_env.check_magic",
+                return_value=_magic_unavailable(),
+            ),
+            patch(
+                "tinytapeout.cli.precheck_env.check_docker",
+                return_value=_docker_running(),
+            ),
+        ):
+            result = detect_precheck_env(tt_dir, "auto")
+        assert result.runner == RUNNER_DOCKER
+
+    def test_explicit_docker_errors_when_daemon_stopped(self, tmp_path):
+        tt_dir = _setup_tt_dir(tmp_path)
+        stopped = ToolInfo(
+            name="Docker", available=True, version="27.3.1 (not running)"
+        )
+        with (
+            patch("tinytapeout.cli.precheck_env.check_docker", return_value=stopped),
+            pytest.raises(SystemExit),
+        ):
+            detect_precheck_env(tt_dir, "docker")
+
     def test_explicit_nix(self, tmp_path):
         tt_dir = _setup_tt_dir(tmp_path)
         with patch(
@@ -278,3 +334,19 @@ class TestWrapCommand:
             "'/path with spaces/test.gds'" in result[3]
             or '"/path with spaces/test.gds"' in result[3]
         )
+
+    def test_docker_exec_in_container(self, tmp_path):
+        env = PrecheckEnv(
+            runner=RUNNER_DOCKER, container="tt-precheck-1", workdir=tmp_path
+        )
+        cmd = ["/venv/bin/python", "precheck.py", "--gds", "test.gds"]
+        result = wrap_command(env, cmd)
+        assert result[:2] == ["docker", "exec"]
+        assert result[result.index("--workdir") + 1] == str(tmp_path)
+        assert result[-5:] == [
+            "tt-precheck-1",
+            "python3",
+            "precheck.py",
+            "--gds",
+            "test.gds",
+        ]
@@ -0,0 +1,76 @@
+import json
+
+from tinytapeout.cli.precheck_output import (
+    PrecheckParser,
+    PrecheckReport,
+    parse_results_markdown,
+)
+
+DRIVER_OUTPUT = """\
+Running 2 checks with 2 jobs
+=== START Magic DRC
+=== START KLayout FEOL
+=== FAIL KLayout FEOL (4.5s): 3 DRC violations
+klayout log line
+=== PASS Magic DRC (12.3s)
+Precheck failed: 1 of 2 checks
+"""
+
+
+def test_parser_recognises_driver_markers():
+    parser = PrecheckParser()
+    events = [parser.feed(line) for line in DRIVER_OUTPUT.splitlines(True)]
+    assert [e["event"] for e in events if e] == ["start", "start", "result", "result"]
+    assert events[3] == {
+        "event": "result",
+        "check": "KLayout FEOL",
+        "status": "fail",
+        "duration": 4.5,
+        "error": "3 DRC violations",
+    }
+    assert [(r.check, r.passed) for r in parser.results] == [
+        ("KLayout FEOL", False),
+        ("Magic DRC", True),
+    ]
+
+
+def test_results_markdown_fallback(tmp_path):
+    path = tmp_path / "results.md"
+    path.write_text(
+        "# Tiny Tapeout Precheck Results\n\n| Check | Result |\n|-----------|--------|\n"
+        "| Magic DRC | ✅ |\n| Pin check | ❌ Fail: missing pin clk |\n"
+    )
+    results = parse_results_markdown(path)
+    assert [(r.check, r.passed, r.error) for r in results] == [
+        ("Magic DRC", True, None),
+        ("Pin check", False, "missing pin clk"),
+    ]
+    assert parse_results_markdown(tmp_path / "missing.md") == []
+
+
+def test_report_streams_ndjson_and_step_summary(tmp_path, monkeypatch, capsys):
+    summary = tmp_path / "summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary))
+    report = PrecheckReport(json_output=True, step_summary=True, echo=True)
+
+    lines = DRIVER_OUTPUT.splitlines(True)
+    for line in lines[:4]:
+        report.line(line)
+    # The failing check is reported before the run finishes
+    assert "| KLayout FEOL | ❌ 3 DRC violations | 4.5s |" in summary.read_text()
+
+    for line in lines[4:]:
+        report.line(line)
+    report.finish(1, tmp_path)
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [e["event"] for e in events] == [
+        "start",
+        "start",
+        "result",
+        "result",
+        "summary",
+    ]
+    assert events[-1]["status"] == "fail"
+    assert events[-1]["failed"] == 1
+    assert "Precheck failed: 1 of 2 checks failed." in summary.read_text()
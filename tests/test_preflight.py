@@ -0,0 +1,67 @@
+import pytest
+
+gdstk = pytest.importorskip("gdstk")
+pytest.importorskip("numpy")
+
+from tinytapeout.cli.preflight import (  # noqa: E402
+    expected_pins,
+    forbidden_layers,
+    parse_die_area,
+    preflight_gds,
+)
+
+DIE_AREA = parse_die_area("0 0 161.00 111.52")
+
+
+def _write_gds(path, top_name="tt_um_test", skip_pin=None, met5=False, boundary=None):
+    lib = gdstk.Library()
+    macro = lib.new_cell("macro")
+    macro.add(gdstk.rectangle((0, 0), (5, 5), layer=71, datatype=20))
+    if met5:
+        macro.add(gdstk.rectangle((0, 0), (5, 5), layer=72, datatype=20))
+    top = lib.new_cell(top_name)
+    top.add(gdstk.Reference(macro, (20, 20)))
+    top.add(
+        gdstk.rectangle(*(boundary or ((0, 0), (161, 111.52))), layer=235, datatype=4)
+    )
+    for i, pin in enumerate(expected_pins()):
+        if pin != skip_pin:
+            top.add(gdstk.Label(pin, (1 + i, 110), layer=71, texttype=5))
+    lib.write_gds(str(path))
+
+
+def _check(path, **kwargs):
+    findings = preflight_gds(
+        path, "sky130A", die_area=DIE_AREA, pins=expected_pins(), **kwargs
+    )
+    return [(f.check, f.message) for f in findings]
+
+
+def test_clean_layout_passes(tmp_path):
+    gds = tmp_path / "tt_um_test.gds"
+    _write_gds(gds)
+    assert _check(gds) == []
+
+
+def test_reports_common_precheck_failures(tmp_path):
+    gds = tmp_path / "tt_um_test.gds"
+    _write_gds(
+        gds,
+        top_name="tt_um_other",
+        skip_pin="uo_out[3]",
+        met5=True,
+        boundary=((0, 0), (161, 225.76)),
+    )
+    findings = _check(gds)
+    checks = [check for check, _ in findings]
+    assert checks == ["Top cell", "Boundary", "Layers", "Pin labels"]
+    assert "expected top cell tt_um_test, found tt_um_other" in findings[0][1]
+    assert "DIE_AREA is (0, 0)-(161, 111.52)" in findings[1][1]
+    assert "met5 (72/20), above met4, in macro" in findings[2][1]
+    assert findings[3][1] == "pins without a label: uo_out[3]"
+
+
+def test_forbidden_layers_follow_the_layer_stack():
+    assert set(forbidden_layers("sky130A").values()) == {"via4", "met5"}
+    assert set(forbidden_layers("ihp-sg13g2").values()) == {"TopVia2", "TopMetal2"}
+    assert forbidden_layers("fpgaUp5k") == {}
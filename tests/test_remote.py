@@ -0,0 +1,203 @@
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from tinytapeout.cli.context import ProjectContext
+from tinytapeout.cli.hashing import hash_bytes
+from tinytapeout.cli.remote import (
+    RemoteBuildError,
+    _fetch_artifacts,
+    collect_files,
+    run_remote_build,
+)
+from tinytapeout.cli.worker import BlobStore, BuildWorker, Job, create_server
+
+# Stands in for 'tt gds build': writes a final GDS derived from the inputs
+_FAKE_BUILD = """
+import pathlib, sys
+src = pathlib.Path("src/project.v").read_text()
+print("hardening", flush=True)
+final = pathlib.Path("runs/wokwi/final/gds")
+final.mkdir(parents=True, exist_ok=True)
+(final / "tt_um_test.gds").write_text("GDS:" + src)
+pathlib.Path("runs/wokwi/pdk.json").write_text("{}")
+sys.exit(1 if "FAIL" in src else 0)
+"""
+
+
+def _plain(text: str) -> str:
+    return re.sub(r"\x1b\[[0-9;]*m", "", text)
+
+
+class FakeWorker(BuildWorker):
+    def build_command(self, job: Job) -> list[str]:
+        return [sys.executable, "-c", _FAKE_BUILD]
+
+
+def _serve(worker: BuildWorker, token: str | None = None):
+    server = create_server(worker, "127.0.0.1", 0, token)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def worker_url(tmp_path):
+    worker = FakeWorker(tmp_path / "worker")
+    server = _serve(worker)
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}", worker
+    server.shutdown()
+    server.server_close()
+
+
+def _make_project(tmp_path: Path, source: str = "module tt_um_test; endmodule") -> Path:
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "info.yaml").write_text("yaml_version: 6\n")
+    (project / "src" / "project.v").write_text(source)
+    (project / "src" / "config.json").write_text(json.dumps({"CLOCK_PERIOD": 20}))
+    return project
+
+
+def _ctx(project: Path) -> ProjectContext:
+    return ProjectContext(
+        project_dir=project, tt_tools_dir=None, info=None, tech="sky130A", has_gds=False
+    )
+
+
+def test_collect_files_maps_relative_paths(tmp_path):
+    project = _make_project(tmp_path)
+    files = collect_files(project, ["info.yaml", "src", "missing"])
+    assert sorted(files) == ["info.yaml", "src/config.json", "src/project.v"]
+
+
+def test_remote_build_downloads_artifacts(tmp_path, worker_url, capsys):
+    url, _ = worker_url
+    project = _make_project(tmp_path)
+    run_remote_build(_ctx(project), url)
+
+    gds = project / "runs" / "wokwi" / "final" / "gds" / "tt_um_test.gds"
+    assert gds.read_text() == "GDS:module tt_um_test; endmodule"
+    assert (project / "runs" / "wokwi" / "pdk.json").exists()
+    assert "hardening" in capsys.readouterr().out
+
+
+def test_remote_build_skips_unchanged_inputs(tmp_path, worker_url, capsys):
+    url, worker = worker_url
+    project = _make_project(tmp_path)
+    run_remote_build(_ctx(project), url)
+    capsys.readouterr()
+
+    run_remote_build(_ctx(project), url)
+    out = _plain(capsys.readouterr().out)
+    assert "Uploading 0 of 3 input files" in out
+    assert "Downloaded 0 of 2 artifacts" in out
+
+    (project / "src" / "project.v").write_text("module tt_um_test2; endmodule")
+    run_remote_build(_ctx(project), url)
+    out = _plain(capsys.readouterr().out)
+    assert "Uploading 1 of 3 input files" in out
+    assert "Downloaded 1 of 2 artifacts" in out
+
+
+def test_remote_build_failure_exits(tmp_path, worker_url):
+    url, _ = worker_url
+    project = _make_project(tmp_path, source="FAIL")
+    with pytest.raises(SystemExit) as exc:
+        run_remote_build(_ctx(project), url)
+    assert exc.value.code == 1
+
+
+def test_worker_requires_its_token(tmp_path, capsys):
+    import requests
+
+    server = _serve(FakeWorker(tmp_path / "worker"), token="s3cret")
+    host, port = server.server_address[:2]
+    url = f"http://{host}:{port}"
+    try:
+        assert requests.get(f"{url}/v1/info").status_code == 401
+        wrong = {"Authorization": "Bearer nope"}
+        assert requests.get(f"{url}/v1/info", headers=wrong).status_code == 401
+        resp = requests.post(f"{url}/v1/jobs", json={}, headers=wrong)
+        assert resp.status_code == 401
+
+        project = _make_project(tmp_path)
+        with pytest.raises(SystemExit) as exc:
+            run_remote_build(_ctx(project), url)
+        assert exc.value.code == 2
+        assert "requires a valid token" in _plain(capsys.readouterr().out)
+        run_remote_build(_ctx(project), url, token="s3cret")
+        gds = project / "runs" / "wokwi" / "final" / "gds" / "tt_um_test.gds"
+        assert gds.read_text().startswith("GDS:")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_worker_refuses_public_address_without_token(tmp_path):
+    with pytest.raises(ValueError, match="without a token"):
+        create_server(FakeWorker(tmp_path / "worker"), "0.0.0.0", 0)
+
+
+def test_worker_rejects_path_traversal(tmp_path, worker_url):
+    import requests
+
+    url, worker = worker_url
+    resp = requests.post(
+        f"{url}/v1/jobs",
+        json={"project": "p", "files": {"info.yaml": "0" * 64, "../evil": "0" * 64}},
+    )
+    assert resp.status_code == 400
+    assert not worker.jobs
+
+
+def test_client_checks_artifact_paths_and_digests(tmp_path, worker_url):
+    import requests
+
+    url, worker = worker_url
+    project = _make_project(tmp_path)
+    digest = worker.blobs.put_file(project / "src" / "project.v")
+    session = requests.Session()
+
+    for rel in ("../evil.v", "/tmp/evil.v", "src/project.v", "runs/wokwi/../x"):
+        with pytest.raises(RemoteBuildError):
+            _fetch_artifacts(session, f"{url}/v1", project, {rel: digest})
+    assert not (tmp_path / "evil.v").exists()
+
+    # A blob whose content does not match its name is not installed
+    worker.blobs.path(digest).write_text("tampered")
+    target = project / "tt_submission" / "tt_um_test.v"
+    with pytest.raises(RemoteBuildError, match="does not match"):
+        _fetch_artifacts(
+            session, f"{url}/v1", project, {"tt_submission/tt_um_test.v": digest}
+        )
+    assert not target.exists()
+    assert not list(target.parent.glob("*.part"))
+
+
+def test_blob_store_evicts_least_recently_used(tmp_path):
+    store = BlobStore(tmp_path / "blobs", max_bytes=250)
+    digests = []
+    for i in range(4):
+        data = bytes([i]) * 100
+        digests.append(hash_bytes(data))
+        source = tmp_path / f"blob{i}"
+        source.write_bytes(data)
+        store.put_file(source)
+        os.utime(store.path(digests[-1]), (1000 + i, 1000 + i))
+
+    # Oldest first, but never a kept blob
+    assert store.evict(keep={digests[0]}, now=1_000_000) == 200
+    assert [store.path(d).exists() for d in digests] == [True, False, False, True]
+
+    # Nothing used within the grace period is removed
+    store.has(digests[0])
+    store.max_bytes = 0
+    assert store.evict(keep=set()) == 100
+    assert store.path(digests[0]).exists()
@@ -0,0 +1,167 @@
+import struct
+import zlib
+
+import pytest
+
+gdstk = pytest.importorskip("gdstk")
+np = pytest.importorskip("numpy")
+
+from tinytapeout.cli import render as render_module  # noqa: E402
+from tinytapeout.cli.render import render_layers, render_png, write_png  # noqa: E402
+
+
+def _read_png(path):
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, idat = 8, b""
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        kind = data[pos + 4 : pos + 8]
+        body = data[pos + 8 : pos + 8 + length]
+        if kind == b"IHDR":
+            width, height = struct.unpack(">II", body[:8])
+        elif kind == b"IDAT":
+            idat += body
+        pos += 12 + length
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8)
+    return raw.reshape(height, width * 3 + 1)[:, 1:].reshape(height, width, 3)
+
+
+def _write_gds(path, extra=False):
+    lib = gdstk.Library()
+    top = lib.new_cell("tt_um_test")
+    top.add(gdstk.rectangle((0, 0), (100, 50), layer=235, datatype=4))
+    # met1 over the left half, drawn clockwise and counter-clockwise
+    top.add(gdstk.Polygon([(0, 0), (50, 0), (50, 50), (0, 50)], layer=68, datatype=20))
+    top.add(gdstk.Polygon([(0, 0), (0, 50), (50, 50), (50, 0)], layer=68, datatype=20))
+    # met2 in the top right corner, through a reference
+    via = lib.new_cell("block")
+    via.add(gdstk.rectangle((0, 0), (10, 10), layer=69, datatype=20))
+    top.add(gdstk.Reference(via, (90, 40)))
+    if extra:
+        top.add(gdstk.rectangle((60, 0), (70, 10), layer=67, datatype=20))
+    lib.write_gds(str(path))
+
+
+def test_write_png_round_trip(tmp_path):
+    image = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(4, 3, 3)
+    write_png(tmp_path / "out.png", image)
+    assert np.array_equal(_read_png(tmp_path / "out.png"), image)
+
+
+def test_render_png(tmp_path):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    png = tmp_path / "test.png"
+    assert render_png(gds, png, "sky130A", size=100, jobs=1) == (100, 50)
+
+    image = _read_png(png)
+    white = [255, 255, 255]
+    met1 = render_layers("sky130A", ["met1"])[0].color
+    blended = [round(255 * 0.4 + c * 0.6) for c in met1]
+    # Overlapping polygons of opposite orientation must not cancel out
+    assert image[25, 10].tolist() == blended
+    assert image[25, 75].tolist() == white
+    # GDS y points up: the met2 block shows in the top right corner
+    assert image[5, 95].tolist() != white
+    assert image[45, 95].tolist() == white
+
+
+def test_render_png_in_strips_matches_single_pass(tmp_path, monkeypatch):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    render_png(gds, tmp_path / "a.png", "sky130A", size=100, jobs=1)
+    monkeypatch.setattr(render_module, "_STRIP_ROWS", 7)
+    render_png(gds, tmp_path / "b.png", "sky130A", size=100, jobs=2)
+    assert np.array_equal(_read_png(tmp_path / "a.png"), _read_png(tmp_path / "b.png"))
+
+
+def test_render_layers_selection():
+    layers = render_layers("sky130A", ["MET2", "li1"])
+    # Composited bottom to top regardless of the requested order
+    assert [layer.name for layer in layers] == ["li1", "met2"]
+    assert layers[1].layer == (69, 20)
+    with pytest.raises(ValueError, match="Unknown layer 'met9'"):
+        render_layers("sky130A", ["met9"])
+
+
+def test_cached_render_png(tmp_path, monkeypatch):
+    from tinytapeout.cli.cache import ArtifactCache
+    from tinytapeout.cli.render import cached_render_png
+
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    cache = ArtifactCache("renders", 1 << 20, root=tmp_path / "cache")
+    kwargs = {"size": 100, "jobs": 1, "cache": cache}
+    assert cached_render_png(gds, tmp_path / "a.png", "sky130A", **kwargs) is False
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not re-render")
+
+    monkeypatch.setattr(render_module, "render_png", fail)
+    assert cached_render_png(gds, tmp_path / "b.png", "sky130A", **kwargs) is True
+    assert (tmp_path / "a.png").read_bytes() == (tmp_path / "b.png").read_bytes()
+
+    # Different parameters or a changed GDS miss the cache
+    monkeypatch.undo()
+    assert (
+        cached_render_png(gds, tmp_path / "c.png", "sky130A", **kwargs | {"size": 50})
+        is False
+    )
+    _write_gds(gds, extra=True)
+    assert cached_render_png(gds, tmp_path / "d.png", "sky130A", **kwargs) is False
+
+
+def test_cached_render_files_restores_every_output(tmp_path):
+    from tinytapeout.cli.cache import ArtifactCache
+    from tinytapeout.cli.render import cached_render_files
+
+    cache = ArtifactCache("renders", 1 << 20, root=tmp_path / "cache")
+    out_dir = tmp_path / "gds"
+    out_dir.mkdir()
+    (out_dir / "unrelated.png").write_bytes(b"old")
+    renders = []
+
+    def render():
+        renders.append(1)
+        for name in ("render.png", "render.svg", "render_thumb.png"):
+            (out_dir / name).write_text(name)
+
+    assert cached_render_files(("tt_tool", "abc"), out_dir, render, cache) is False
+    for path in out_dir.iterdir():
+        path.unlink()
+    assert cached_render_files(("tt_tool", "abc"), out_dir, render, cache) is True
+    assert len(renders) == 1
+    assert sorted(p.name for p in out_dir.iterdir()) == [
+        "render.png",
+        "render.svg",
+        "render_thumb.png",
+    ]
+
+
+def test_render_png_from_a_thread_uses_spawn(tmp_path, monkeypatch):
+    import threading
+
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    render_png(gds, tmp_path / "a.png", "sky130A", size=100, jobs=1)
+    monkeypatch.setattr(render_module, "_STRIP_ROWS", 7)
+    contexts = []
+    pool_class = render_module.ProcessPoolExecutor
+
+    def pool(*args, mp_context=None, **kwargs):
+        contexts.append(mp_context and mp_context.get_start_method())
+        return pool_class(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(render_module, "ProcessPoolExecutor", pool)
+    # As in 'tt gds build --prerender': a pipeline step with other threads live
+    done = threading.Event()
+    idle = threading.Thread(target=done.wait)
+    idle.start()
+    try:
+        render_png(gds, tmp_path / "b.png", "sky130A", size=100, jobs=2)
+    finally:
+        done.set()
+        idle.join()
+    assert contexts == ["spawn"]
+    assert np.array_equal(_read_png(tmp_path / "a.png"), _read_png(tmp_path / "b.png"))
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from tinytapeout.cli.sim_build import (
+    build_is_current,
+    hdl_inputs,
+    inputs_fingerprint,
+    record_build,
+)
+
+
+def _project(tmp_path):
+    src = tmp_path / "src"
+    test = tmp_path / "test"
+    src.mkdir()
+    test.mkdir()
+    (src / "project.v").write_text('`include "defs.vh"\nmodule tt_um_x; endmodule\n')
+    (src / "defs.vh").write_text('`include "nested.vh"\n`define W 8\n')
+    (src / "nested.vh").write_text("`define N 1\n")
+    (src / "unused.v").write_text("module unused; endmodule\n")
+    (test / "tb.v").write_text("module tb; endmodule\n")
+    (test / "gate_level_netlist.v").write_text("module tt_um_x; endmodule\n")
+    (test / "test.py").write_text("import cocotb\n")
+    (test / "Makefile").write_text("MODULE = test\n")
+    info = SimpleNamespace(source_files=["project.v"])
+    return tmp_path, test, info
+
+
+def test_hdl_inputs_follow_includes(tmp_path):
+    project, test, info = _project(tmp_path)
+    names = [p.name for p in hdl_inputs(project, test, info, gl=False)]
+    assert names == ["project.v", "tb.v", "defs.vh", "nested.vh", "Makefile"]
+    gl_names = [p.name for p in hdl_inputs(project, test, info, gl=True)]
+    assert "gate_level_netlist.v" in gl_names
+
+
+def test_fingerprint_ignores_python_testbench(tmp_path):
+    project, test, info = _project(tmp_path)
+
+    def fingerprint():
+        return inputs_fingerprint(hdl_inputs(project, test, info, gl=False), "rtl")
+
+    before = fingerprint()
+    (test / "test.py").write_text("import cocotb  # edited\n")
+    (test / "gate_level_netlist.v").write_text("// not part of RTL runs\n")
+    assert fingerprint() == before
+
+    (project / "src" / "nested.vh").write_text("`define N 2\n")
+    assert fingerprint() != before
+
+
+def test_build_stamp(tmp_path):
+    assert not build_is_current(tmp_path, "rtl", "abc")
+    record_build(tmp_path, "rtl", "abc")
+    assert build_is_current(tmp_path, "rtl", "abc")
+    assert not build_is_current(tmp_path, "rtl", "def")
+    assert not build_is_current(tmp_path, "gl", "abc")
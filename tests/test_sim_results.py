@@ -0,0 +1,61 @@
+import pytest
+
+from tinytapeout.cli.sim_results import (
+    ResultsError,
+    iter_testcases,
+    summarize,
+    summarize_results,
+)
+
+RESULTS_XML = """\
+<testsuites name="results">
+  <testsuite name="all" package="all">
+    <property name="random_seed" value="1" />
+    <testcase name="test_failure_recovery" classname="test" time="1.5" />
+    <testcase name="test_counter" classname="test" time="12.0">
+      <failure message="Test failed with RANDOM_SEED=1" />
+    </testcase>
+    <testcase name="test_later" classname="test" time="0.0">
+      <skipped />
+    </testcase>
+    <testcase name="test_reset" classname="test" time="3.25" />
+  </testsuite>
+</testsuites>
+"""
+
+
+def test_summarize_results(tmp_path):
+    path = tmp_path / "results.xml"
+    path.write_text(RESULTS_XML)
+    summary = summarize_results(path, slowest=2)
+
+    # A test named *failure* is not a failure
+    assert (summary.passed, summary.failed, summary.skipped) == (2, 1, 1)
+    assert [(c.name, c.message) for c in summary.failures] == [
+        ("test_counter", "Test failed with RANDOM_SEED=1")
+    ]
+    assert [c.name for c in summary.slowest] == ["test_counter", "test_reset"]
+    assert summary.to_json()["status"] == "fail"
+    assert summary.to_json()["duration"] == 16.75
+
+
+def test_large_results_keep_bounded_state(tmp_path):
+    path = tmp_path / "results.xml"
+    with open(path, "w") as f:
+        f.write("<testsuites><testsuite>")
+        for i in range(20000):
+            failure = '<failure message="x"/>' if i % 2 else ""
+            f.write(f'<testcase name="t{i}" time="{i / 1000}">{failure}</testcase>')
+        f.write("</testsuite></testsuites>")
+
+    summary = summarize(iter_testcases(path), slowest=3, max_failures=10)
+    assert (summary.passed, summary.failed) == (10000, 10000)
+    assert len(summary.failures) == 10
+    assert [c.name for c in summary.slowest] == ["t19999", "t19998", "t19997"]
+
+
+def test_malformed_results(tmp_path):
+    path = tmp_path / "results.xml"
+    path.write_text("<testsuites><testsuite><testcase name='a'>")
+    with pytest.raises(ResultsError):
+        summarize_results(path)
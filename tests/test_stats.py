@@ -0,0 +1,83 @@
+import json
+
+from tinytapeout.cli import stats as stats_module
+from tinytapeout.cli.stats import compute_design_stats, count_cells, find_netlist
+from tinytapeout.tech import tech_map
+
+
+def _make_run(tmp_path, cells, metrics=None):
+    final_dir = tmp_path / "runs" / "wokwi" / "final"
+    pnl_dir = final_dir / "pnl"
+    pnl_dir.mkdir(parents=True)
+    lines = ["module tt_um_test (VGND, VPWR);"]
+    for i, cell in enumerate(cells):
+        lines.append(f" sky130_fd_sc_hd__{cell} _{i}_ (.VGND(VGND),")
+        lines.append("    .VPWR(VPWR));")
+    lines.append("endmodule")
+    (pnl_dir / "tt_um_test.pnl.v").write_text("\n".join(lines) + "\n")
+    if metrics is not None:
+        (final_dir / "metrics.json").write_text(json.dumps(metrics))
+    return final_dir
+
+
+def test_count_cells(tmp_path):
+    final_dir = _make_run(tmp_path, ["and2_1", "and2_2", "dfxtp_1", "fill_1"])
+    counts = count_cells(
+        final_dir / "pnl" / "tt_um_test.pnl.v", tech_map["sky130A"].cell_regexp
+    )
+    assert counts == {"and2": 2, "dfxtp": 1, "fill": 1}
+
+
+def test_count_cells_across_chunk_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(stats_module, "_CHUNK_SIZE", 7)
+    final_dir = _make_run(tmp_path, ["and2_1"] * 50 + ["mux2_4"] * 25)
+    counts = count_cells(
+        final_dir / "pnl" / "tt_um_test.pnl.v", tech_map["sky130A"].cell_regexp
+    )
+    assert counts == {"and2": 50, "mux2": 25}
+
+
+def test_find_netlist_by_top_module(tmp_path):
+    final_dir = _make_run(tmp_path, ["and2_1"])
+    assert find_netlist(final_dir, "sky130A", "tt_um_test").name == "tt_um_test.pnl.v"
+    assert find_netlist(final_dir, "sky130A", "tt_um_other") is None
+    assert find_netlist(final_dir, "sky130A", None).name == "tt_um_test.pnl.v"
+
+
+def test_compute_design_stats(tmp_path):
+    _make_run(
+        tmp_path,
+        ["and2_1", "and2_1", "dfxtp_1"],
+        metrics={
+            "design__die__area": 17954.9,
+            "design__core__area": 15000.0,
+            "design__instance__area": 3000.0,
+            "route__wirelength": 1234,
+        },
+    )
+    tt_dir = tmp_path / "tt"
+    (tt_dir / "tech" / "sky130A").mkdir(parents=True)
+    (tt_dir / "tech" / "sky130A" / "cells.json").write_text(
+        json.dumps(
+            {
+                "and2": {"description": "2-input AND", "category": "logic"},
+                "dfxtp": {"description": "Flip-flop", "category": "flipflop"},
+            }
+        )
+    )
+
+    result = compute_design_stats(tmp_path, "sky130A", tt_tools_dir=tt_dir)
+    assert result.top_module == "tt_um_test"
+    assert result.total_cells == 3
+    assert result.cells == {"and2": 2, "dfxtp": 1}
+    assert result.categories == {"logic": 2, "flipflop": 1}
+    assert result.area == {"die": 17954.9, "core": 15000.0, "instance": 3000.0}
+    assert result.utilization == 0.2
+    assert json.loads(json.dumps(result.to_dict()))["metrics"]["wire_length"] == 1234
+
+
+def test_compute_design_stats_without_run(tmp_path):
+    result = compute_design_stats(tmp_path, "sky130A")
+    assert result.netlist is None
+    assert result.total_cells == 0
+    assert result.utilization is None
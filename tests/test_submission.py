@@ -0,0 +1,132 @@
+import json
+import shutil
+
+import pytest
+
+from tinytapeout.cli import submission as submission_module
+from tinytapeout.cli.submission import (
+    SubmissionError,
+    assemble_submission,
+    link_or_copy,
+    manifest_path,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("TT_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def _make_run(project_dir, gds=b"GDS v1", with_spef=True):
+    final_dir = project_dir / "runs" / "wokwi" / "final"
+    for sub in ("gds", "lef", "pnl", "spef/nom"):
+        (final_dir / sub).mkdir(parents=True, exist_ok=True)
+    (final_dir / "commit_id.json").write_text(json.dumps({"commit": "abc"}))
+    (final_dir / "gds" / "tt_um_test.gds").write_bytes(gds)
+    (final_dir / "lef" / "tt_um_test.lef").write_text("LEF")
+    (final_dir / "pnl" / "tt_um_test.pnl.v").write_text("module tt_um_test; endmodule")
+    (final_dir / "metrics.csv").write_text("a,b\n1,2\n")
+    if with_spef:
+        (final_dir / "spef" / "nom" / "tt_um_test.nom.spef").write_text("SPEF")
+    return final_dir
+
+
+def test_assemble_submission(tmp_path):
+    _make_run(tmp_path)
+    result = assemble_submission(tmp_path, "sky130A", "tt_um_test")
+    out = tmp_path / "tt_submission"
+    assert sorted(result.actions) == [
+        "commit_id.json",
+        "stats/metrics.csv",
+        "tt_um_test.gds",
+        "tt_um_test.lef",
+        "tt_um_test.spef",
+        "tt_um_test.v",
+    ]
+    assert "unchanged" not in result.actions.values()
+    assert (out / "tt_um_test.v").read_text() == "module tt_um_test; endmodule"
+    assert (out / "tt_um_test.gds").read_bytes() == b"GDS v1"
+    # The manifest is kept out of the deliverable
+    assert sorted(p.name for p in out.iterdir()) == [
+        "commit_id.json",
+        "stats",
+        "tt_um_test.gds",
+        "tt_um_test.lef",
+        "tt_um_test.spef",
+        "tt_um_test.v",
+    ]
+    manifest = json.loads(manifest_path(tmp_path).read_text())
+    assert set(manifest) == set(result.actions)
+
+
+def test_submission_ships_the_nominal_spef(tmp_path):
+    final_dir = _make_run(tmp_path, with_spef=False)
+    for corner in ("max_", "min_", "nom_"):
+        (final_dir / "spef" / corner).mkdir(parents=True)
+        spef = final_dir / "spef" / corner / f"tt_um_test.{corner}.spef"
+        spef.write_text(corner)
+    result = assemble_submission(tmp_path, "sky130A", "tt_um_test")
+    assert (tmp_path / "tt_submission" / "tt_um_test.spef").read_text() == "nom_"
+    assert not result.warnings
+
+    # Without a nominal corner, no other corner is shipped in its place
+    shutil.rmtree(final_dir / "spef" / "nom_")
+    result = assemble_submission(tmp_path, "sky130A", "tt_um_test")
+    assert not (tmp_path / "tt_submission" / "tt_um_test.spef").exists()
+    assert "no nominal-corner SPEF" in result.summary()
+
+
+def test_rebuild_only_touches_changed_files(tmp_path, monkeypatch):
+    _make_run(tmp_path)
+    assemble_submission(tmp_path, "sky130A", "tt_um_test")
+
+    # A fresh run directory: same content except for the GDS, and no SPEF
+    shutil.rmtree(tmp_path / "runs")
+    _make_run(tmp_path, gds=b"GDS v2", with_spef=False)
+    placed = []
+    original = submission_module.link_or_copy
+    monkeypatch.setattr(
+        submission_module,
+        "link_or_copy",
+        lambda src, dest: placed.append(dest.name) or original(src, dest),
+    )
+    result = assemble_submission(tmp_path, "sky130A", "tt_um_test")
+    assert placed == ["tt_um_test.gds"]
+    assert result.actions["tt_um_test.lef"] == "unchanged"
+    assert result.removed == ["tt_um_test.spef"]
+    out = tmp_path / "tt_submission"
+    assert (out / "tt_um_test.gds").read_bytes() == b"GDS v2"
+    assert not (out / "tt_um_test.spef").exists()
+
+
+def test_unchanged_sources_are_not_rehashed(tmp_path, monkeypatch):
+    _make_run(tmp_path)
+    assemble_submission(tmp_path, "sky130A", "tt_um_test")
+
+    def fail(path):
+        raise AssertionError(f"re-hashed {path}")
+
+    monkeypatch.setattr(submission_module, "hash_file", fail)
+    result = assemble_submission(tmp_path, "sky130A", "tt_um_test")
+    assert set(result.actions.values()) == {"unchanged"}
+
+
+def test_missing_required_artifact(tmp_path):
+    final_dir = _make_run(tmp_path)
+    (final_dir / "lef" / "tt_um_test.lef").unlink()
+    with pytest.raises(SubmissionError, match="tt_um_test.lef"):
+        assemble_submission(tmp_path, "sky130A", "tt_um_test")
+
+
+def test_link_or_copy_falls_back_to_copy(tmp_path, monkeypatch):
+    src = tmp_path / "src.txt"
+    src.write_text("data")
+    monkeypatch.setattr(submission_module, "_reflink", lambda s, d: False)
+
+    def no_link(*args):
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr(submission_module.os, "link", no_link)
+    assert link_or_copy(src, tmp_path / "out" / "dest.txt") == "copy"
+    assert (tmp_path / "out" / "dest.txt").read_text() == "data"
+    assert [p.name for p in (tmp_path / "out").iterdir()] == ["dest.txt"]
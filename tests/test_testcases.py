@@ -0,0 +1,179 @@
+import re
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from tinytapeout.cli.app import cli
+from tinytapeout.cli.commands.test import SimOptions, _run_tests
+from tinytapeout.cli.durations import DurationDB, durations_path
+from tinytapeout.cli.testcases import (
+    find_testcases,
+    merge_results,
+    run_testcases,
+    select_testcases,
+)
+
+TEST_PY = """\
+import cocotb
+from cocotb import test
+
+
+@cocotb.test()
+async def test_reset(dut):
+    pass
+
+
+@cocotb.test
+async def test_counter(dut):
+    pass
+
+
+@test(skip=True)
+async def test_skipped(dut):
+    pass
+
+
+async def helper(dut):
+    pass
+"""
+
+# Stands in for cocotb's Makefile.sim: writes results.xml for $(TESTCASE),
+# failing testcases whose name contains "bad"
+MAKEFILE = """\
+MODULE = test
+SRC = $(PWD)/../src/project.v
+
+all:
+\ttest -f $(SRC)
+\techo $(TESTCASE) > waves.vcd
+\tprintf '<testsuites><testsuite><testcase name="%s" time="0.5">%s</testcase></testsuite></testsuites>' \\
+\t\t$(TESTCASE) $(if $(findstring bad,$(TESTCASE)),'<failure message="boom"/>',) > results.xml
+
+clean:
+\trm -rf sim_build results.xml
+"""
+
+
+def test_find_testcases(tmp_path):
+    (tmp_path / "Makefile").write_text(MAKEFILE)
+    (tmp_path / "test.py").write_text(TEST_PY)
+    (tmp_path / "other.py").write_text(
+        "import cocotb\n\n@cocotb.test()\nasync def x(d): pass\n"
+    )
+    # Selecting a test by name would run it despite skip=True
+    assert find_testcases(tmp_path) == ["test_reset", "test_counter"]
+
+
+def _fake_cocotb(tmp_path, version):
+    bin_dir = tmp_path / f"cocotb-{version}"
+    bin_dir.mkdir()
+    config = bin_dir / "cocotb-config"
+    config.write_text(f"#!/bin/sh\necho {version}\n")
+    config.chmod(0o755)
+    return {"PATH": str(bin_dir)}
+
+
+def test_testcase_selection_follows_the_cocotb_version(tmp_path):
+    env = _fake_cocotb(tmp_path, "1.9.2")
+    assert select_testcases(["test_a", "test_b"], env) == {"TESTCASE": "test_a,test_b"}
+
+    env = _fake_cocotb(tmp_path, "2.0.1")
+    (selection,) = select_testcases(["test_a", "test_a.b"], env).items()
+    assert selection[0] == "COCOTB_TEST_FILTER"
+    pattern = re.compile(selection[1])
+    for name in ("test_a", "test.test_a", "test_a.b"):
+        assert pattern.search(name)
+    for name in ("test_ab", "test_axb", "test_a_slow", "my_test_a"):
+        assert not pattern.search(name)
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make not installed")
+def test_run_testcases_in_isolated_workers(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "project.v").write_text("module project; endmodule\n")
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+    (test_dir / "Makefile").write_text(MAKEFILE)
+
+    done = []
+    names = ["test_a", "test_bad", "test_c"]
+    runs = run_testcases(test_dir, names, jobs=2, on_done=lambda r: done.append(r.name))
+
+    assert sorted(done) == sorted(names)
+    assert [(r.name, r.passed) for r in runs] == [
+        ("test_a", True),
+        ("test_bad", False),
+        ("test_c", True),
+    ]
+    # Each worker has its own waveform dump; test/ itself is untouched
+    assert len(list((test_dir / "sim_build" / "jobs").glob("*/waves.vcd"))) == 2
+    assert not (test_dir / "waves.vcd").exists()
+
+    merge_results([r.results for r in runs], test_dir / "results.xml")
+    testcases = ET.parse(test_dir / "results.xml").getroot().findall(".//testcase")
+    assert [tc.get("name") for tc in testcases] == names
+    assert [tc.find("failure") is not None for tc in testcases] == [False, True, False]
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make not installed")
+def test_crashed_simulator_is_a_failure(tmp_path):
+    (tmp_path / "Makefile").write_text("all:\n\texit 2\n")
+    (run,) = run_testcases(tmp_path, ["test_a"], jobs=4)
+    assert not run.passed
+    failure = ET.parse(run.results).getroot().find(".//testcase/failure")
+    assert "status 2" in failure.get("message")
+
+
+def test_merge_results_command(tmp_path):
+    for shard, body in [(1, ""), (2, '<failure message="boom"/>')]:
+        (tmp_path / f"shard{shard}.xml").write_text(
+            f'<testsuites><testsuite><testcase name="t{shard}" time="1.0">{body}'
+            "</testcase></testsuite></testsuites>"
+        )
+    merged = tmp_path / "merged.xml"
+    runner = CliRunner()
+
+    merge = ["test", "merge-results", "-o", str(merged)]
+
+    result = runner.invoke(cli, [*merge, str(tmp_path / "shard1.xml")])
+    assert result.exit_code == 0, result.output
+
+    shards = [str(tmp_path / "shard1.xml"), str(tmp_path / "shard2.xml")]
+    result = runner.invoke(cli, [*merge, *shards])
+    assert result.exit_code == 1
+    testcases = ET.parse(merged).getroot().findall("testsuite/testcase")
+    assert [tc.get("name") for tc in testcases] == ["t1", "t2"]
+
+    # An unreadable shard fails the merge and leaves the output alone
+    (tmp_path / "shard2.xml").write_text("<testsuites>")
+    result = runner.invoke(cli, [*merge, *shards])
+    assert result.exit_code == 1
+    assert len(ET.parse(merged).getroot().findall("testsuite/testcase")) == 2
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make not installed")
+def test_durations_survive_clean_rebuild(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "project.v").write_text("module project; endmodule\n")
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+    (test_dir / "Makefile").write_text(MAKEFILE)
+    (test_dir / "test.py").write_text(TEST_PY)
+    ctx = SimpleNamespace(project_dir=tmp_path, info=None)
+
+    options = SimOptions(jobs=2, clean=True, slowest=0)
+    _run_tests(ctx, test_dir, "RTL", options)
+    db = DurationDB(durations_path(test_dir), "rtl")
+    assert db.durations == {"test_reset": 0.5, "test_counter": 0.5}
+    db.durations["test_reset"] = 10.5
+    db.save()
+
+    # The next rebuild runs 'make clean' (rm -rf sim_build) first; the
+    # history is still there to be averaged with the new measurement
+    _run_tests(ctx, test_dir, "RTL", options)
+    subprocess.run(["make", "clean"], cwd=test_dir, check=True, capture_output=True)
+    assert DurationDB(durations_path(test_dir), "rtl").durations["test_reset"] == 5.5
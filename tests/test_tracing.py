@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tinytapeout.cli.pipeline import Step, StepResult, run_pipeline
+from tinytapeout.cli.runner import run_command
+from tinytapeout.cli.tracing import disable_tracing, enable_tracing, trace_step
+
+
+@pytest.fixture
+def tracer():
+    tracer = enable_tracing()
+    yield tracer
+    disable_tracing()
+
+
+def _spans(tracer, category):
+    return [e for e in tracer.to_json()["traceEvents"] if e.get("cat") == category]
+
+
+def test_records_subprocess_usage(tracer):
+    with trace_step("build"):
+        result = run_command(
+            [sys.executable, "-c", "x = bytearray(32 << 20); print(sum(range(10**6)))"],
+            capture_output=True,
+            text=True,
+        )
+        # Only the CLI's own commands are traced; the stdlib is left alone
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    assert result.stdout == f"{sum(range(10**6))}\n"
+
+    (span,) = _spans(tracer, "subprocess")
+    assert span["name"].startswith("python")
+    assert span["ph"] == "X" and span["dur"] > 0
+    assert span["args"]["step"] == "build"
+    assert span["args"]["returncode"] == 0
+    if hasattr(os, "wait4"):
+        assert span["args"]["user_cpu_s"] > 0
+        assert span["args"]["max_rss_mb"] >= 32
+    assert [s["name"] for s in _spans(tracer, "step")] == ["build"]
+
+
+def test_pipeline_steps_are_parents_of_their_commands(tracer):
+    def run(code):
+        return lambda: StepResult(run_command([sys.executable, "-c", code]).returncode)
+
+    with trace_step("tt gds build"):
+        run_pipeline(
+            [Step("a", run("pass")), Step("b", run("raise SystemExit(3)"))],
+            report=lambda step, result: None,
+        )
+
+    spans = {s["args"]["step"]: s for s in _spans(tracer, "subprocess")}
+    assert spans["tt gds build > a"]["args"]["returncode"] == 0
+    assert spans["tt gds build > b"]["args"]["returncode"] == 3
+
+
+def test_trace_option_writes_chrome_trace(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+
+    from tinytapeout.cli import app
+
+    monkeypatch.setattr(app, "check_for_updates", lambda: None)
+
+    @app.cli.command("traced-test")
+    def traced():
+        run_command([sys.executable, "-c", "pass"])
+
+    trace = tmp_path / "trace.json"
+    try:
+        result = CliRunner().invoke(app.cli, ["--trace", str(trace), "traced-test"])
+    finally:
+        app.cli.commands.pop("traced-test")
+        disable_tracing()
+    assert result.exit_code == 0, result.output
+
+    events = json.loads(trace.read_text())["traceEvents"]
+    (command,) = [e for e in events if e.get("cat") == "subprocess"]
+    assert command["args"]["step"] == "tt traced-test"
+    assert any(e["name"] == "tt traced-test" for e in events if e.get("cat") == "step")
+
+
+def test_git_metadata_commands_are_traced(tracer, tmp_path, monkeypatch):
+    from tinytapeout.cli.harden import git_commit_hash
+    from tinytapeout.cli.precheck_cache import tt_tools_revision
+
+    monkeypatch.delenv("TT_GIT_COMMIT", raising=False)
+    run_command(["git", "init", "-q"], cwd=str(tmp_path))
+    # No commits yet, so both fall back without raising
+    assert git_commit_hash(tmp_path) == "unknown"
+    assert tt_tools_revision(tmp_path) is None
+
+    spans = _spans(tracer, "subprocess")
+    assert len(spans) == 3
+    assert all(s["name"].startswith("git") for s in spans)
+    assert [s["args"]["returncode"] for s in spans] == [0, 128, 128]
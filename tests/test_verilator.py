@@ -0,0 +1,47 @@
+import os
+
+from tinytapeout.cli.cache import ArtifactCache
+from tinytapeout.cli.verilator import (
+    default_threads,
+    restore_model,
+    store_model,
+    verilator_args,
+)
+
+
+def test_verilator_args():
+    assert verilator_args("5.030", 1) == "-Wno-fatal --timing"
+    assert verilator_args("4.228", 4) == "-Wno-fatal --threads 4"
+    assert verilator_args("unknown", 1) == "-Wno-fatal"
+
+
+def test_threads_only_for_large_serial_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    small = tmp_path / "small.v"
+    small.write_text("module small; endmodule\n")
+    large = tmp_path / "large.v"
+    large.write_bytes(b"// padding\n" * 50000)
+    assert default_threads(1, [small]) == 1
+    assert default_threads(1, [small, large]) == 4
+    assert default_threads(8, [large]) == 1
+
+
+def test_model_cache_round_trip(tmp_path):
+    cache = ArtifactCache("verilator-models", 1 << 20, root=tmp_path / "cache")
+    build = tmp_path / "sim_build" / "verilator-rtl"
+    (build / "obj").mkdir(parents=True)
+    (build / "Vtop").write_bytes(b"\x7fELF model")
+    (build / "obj" / "Vtop__ALL.o").write_bytes(b"object")
+
+    assert not restore_model(cache, "key", tmp_path / "restored")
+    store_model(cache, "key", build)
+    source = tmp_path / "tb.v"
+    source.write_text("module tb; endmodule\n")
+
+    restored = tmp_path / "restored"
+    assert restore_model(cache, "key", restored)
+    assert (restored / "Vtop").read_bytes() == b"\x7fELF model"
+    assert (restored / "obj" / "Vtop__ALL.o").read_bytes() == b"object"
+    # Newer than the sources, so make does not rebuild it
+    assert (restored / "Vtop").stat().st_mtime >= source.stat().st_mtime
+    assert not list(build.parent.glob(".*.tar"))
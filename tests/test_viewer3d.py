@@ -0,0 +1,113 @@
+import gzip
+import json
+import threading
+import urllib.request
+
+import pytest
+
+gdstk = pytest.importorskip("gdstk")
+np = pytest.importorskip("numpy")
+
+from tinytapeout.cli.cache import ArtifactCache  # noqa: E402
+from tinytapeout.cli.layout import geometry_from_polygons  # noqa: E402
+from tinytapeout.cli.render import render_layers  # noqa: E402
+from tinytapeout.cli.viewer3d import (  # noqa: E402
+    build_mesh,
+    create_server,
+    decimate,
+    load_mesh,
+)
+
+
+def _write_gds(path):
+    lib = gdstk.Library()
+    cell = lib.new_cell("cell")
+    cell.add(gdstk.rectangle((0, 0), (0.5, 0.5), layer=68, datatype=20))
+    top = lib.new_cell("tt_um_test")
+    top.add(gdstk.rectangle((0, 0), (1000, 200), layer=69, datatype=20))
+    top.add(gdstk.Reference(cell, (0, 0), columns=400, rows=40, spacing=(2.5, 5)))
+    lib.write_gds(str(path))
+
+
+def test_decimate_merges_small_boxes_per_grid_cell():
+    boxes = np.array(
+        [[0, 0, 100, 1], [1, 1, 2, 2], [3, 3, 4, 4], [15, 15, 16, 16]], dtype=float
+    )
+    result = decimate(boxes, 10.0, (0.0, 0.0))
+    assert result.tolist() == [[0, 0, 100, 1], [0, 0, 10, 10], [10, 10, 20, 20]]
+
+
+def test_full_detail_keeps_l_shapes():
+    l_shape = gdstk.Polygon(
+        [(0, 0), (10, 0), (10, 2), (2, 2), (2, 8), (0, 8)], layer=68, datatype=20
+    )
+    square = gdstk.rectangle((20, 0), (21, 1), layer=68, datatype=20)
+    geom = geometry_from_polygons("tt_um_test", [l_shape, square], [])
+
+    rects, polygons = geom.polygon_rectangles()
+    assert sorted(map(tuple, rects.tolist())) == [
+        (0, 0, 10, 2),
+        (0, 2, 2, 8),
+        (20, 0, 21, 1),
+    ]
+    assert sorted(polygons.tolist()) == [0, 0, 1]
+    areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+    assert areas.sum() == abs(geom.polygon_areas()).sum()
+
+    mesh = build_mesh(geom, render_layers("sky130A"), "sky130A")
+    level0 = np.frombuffer(gzip.decompress(mesh.levels[0]), np.float32)
+    assert sorted(map(tuple, level0.reshape(-1, 4).tolist())) == [
+        (0, 0, 10, 2),
+        (0, 2, 2, 8),
+        (20, 0, 21, 1),
+    ]
+
+
+def test_load_mesh_levels_and_cache(tmp_path):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    cache = ArtifactCache("meshes", 1 << 30, root=tmp_path / "cache")
+    mesh, cached = load_mesh(gds, "sky130A", cache=cache)
+    assert cached is False
+
+    levels = mesh.manifest["levels"]
+    assert levels[0]["boxes"] == 16001
+    assert [level["boxes"] for level in levels] == sorted(
+        (level["boxes"] for level in levels), reverse=True
+    )
+    assert len(levels) == len(mesh.levels) > 1
+    data = np.frombuffer(gzip.decompress(mesh.levels[0]), dtype=np.float32)
+    assert len(data) == 16001 * 4
+
+    layers = {layer["name"]: layer for layer in mesh.manifest["layers"]}
+    assert layers["met2"]["z"] > layers["met1"]["z"]
+
+    again, cached = load_mesh(gds, "sky130A", cache=cache)
+    assert cached is True
+    assert again.levels == mesh.levels
+
+
+def test_server_serves_manifest_and_gzipped_levels(tmp_path):
+    gds = tmp_path / "test.gds"
+    _write_gds(gds)
+    mesh, _ = load_mesh(gds, "sky130A", cache=ArtifactCache("m", 1 << 30, tmp_path))
+    server = create_server(mesh)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/") as response:
+            assert b"three" in response.read()
+        with urllib.request.urlopen(f"{base}/mesh/manifest.json") as response:
+            assert json.load(response) == mesh.manifest
+
+        request = urllib.request.Request(
+            f"{base}/mesh/lod0.bin", headers={"Accept-Encoding": "gzip"}
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert response.read() == mesh.levels[0]
+        with urllib.request.urlopen(f"{base}/mesh/lod0.bin") as response:
+            assert response.read() == gzip.decompress(mesh.levels[0])
+    finally:
+        server.shutdown()
+        server.server_close()